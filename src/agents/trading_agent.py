@@ -12,6 +12,44 @@ from src.strategies.moving_average_strategy import MovingAverageStrategy
 from src.strategies.kishoka_strategy import KishokaStrategy
 from src.utils.alpaca_order_executor import AlpacaOrderExecutor
 from src.utils.alpaca_position_manager import AlpacaPositionManager
+from src.utils.analysis_scheduler import AnalysisScheduler
+
+def combine_strategy_signals(strategies, pair, data):
+    """
+    Pick the highest-confidence signal across all strategies and timeframes
+    
+    Kept at module level so the analysis scheduler can run it in a worker process.
+    
+    Args:
+        strategies (dict): Strategy name -> strategy instance
+        pair (str): Instrument being analyzed
+        data (dict): Timeframe -> DataFrame with indicators
+        
+    Returns:
+        dict: Best signal, tagged with its timeframe and strategy
+    """
+    combined_signals = {
+        'direction': None,
+        'confidence': 0,
+        'entry_price': None,
+        'stop_loss': None,
+        'take_profit': None,
+        'timeframe': None,
+        'strategy': None
+    }
+    
+    # Process each strategy
+    for strategy_name, strategy in strategies.items():
+        for timeframe, df in data.items():
+            if df is not None and not df.empty:
+                signal = strategy.generate_signal(pair, df)
+                
+                if signal and signal.get('confidence', 0) > combined_signals['confidence']:
+                    combined_signals = signal
+                    combined_signals['timeframe'] = timeframe
+                    combined_signals['strategy'] = strategy_name
+                    
+    return combined_signals
 
 class ForexTradingAgent:
     def __init__(self):
@@ -22,6 +60,7 @@ class ForexTradingAgent:
             'kishoka_killswitch': KishokaStrategy()
         }
         self.recommendations = {}  # Store latest recommendations
+        self.scheduler = AnalysisScheduler()  # Concurrent fetch/evaluate cycle
         
         # Initialize Alpaca components for trade execution
         self.order_executor = AlpacaOrderExecutor()
@@ -29,9 +68,7 @@ class ForexTradingAgent:
         
     def run(self):
         """Main analysis cycle"""
-        for pair in FOREX_PAIRS:
-            cprint(f"\n📊 Analyzing {pair}...", "cyan")
-            self.analyze_pair(pair)
+        self.analyze_pairs(FOREX_PAIRS)
             
         # After analysis, display all recommendations
         self.display_all_recommendations()
@@ -40,6 +77,10 @@ class ForexTradingAgent:
         if EXECUTE_TRADES:
             self.display_current_positions()
             
+    def shutdown(self):
+        """Release the analysis scheduler's worker processes"""
+        self.scheduler.shutdown()
+        
     def analyze_pair(self, pair):
         """Analyze a specific trading instrument for opportunities"""
         try:
@@ -50,28 +91,86 @@ class ForexTradingAgent:
                 
             # Generate trading signals
             signals = self.generate_signals(pair, data)
-            
-            # Generate position recommendation
-            if signals and signals.get('confidence', 0) > 0:
-                recommendation = self.generate_recommendation(pair, signals, data[signals.get('timeframe', TIMEFRAMES[0])])
-                
-                # Execute trade if enabled in config
-                if EXECUTE_TRADES and recommendation["recommendation"] != "NEUTRAL":
-                    self.execute_recommendation(recommendation)
-            else:
-                cprint(f"⏳ No clear opportunity for {pair} at this time", "yellow")
+            self._act_on_signals(pair, signals, data)
                 
         except Exception as e:
             cprint(f"❌ Error analyzing {pair}: {str(e)}", "red")
             
+    def analyze_pairs(self, pairs):
+        """
+        Analyze several instruments in one concurrent cycle
+        
+        Market data for every (pair, timeframe) is fetched on the scheduler's
+        I/O pool, strategies are evaluated on its process pool, and the
+        recommendations are then produced in pair order so the output is the
+        same as analyzing each pair in turn.
+        
+        Args:
+            pairs (list): Instruments to analyze
+        """
+        scheduler = self.scheduler
+        scheduler.timings = {}
+        
+        # Fetch data and update indicators; the streaming indicator state lives
+        # in this process, so indicators are computed as part of the fetch
+        tasks = [(pair, timeframe) for pair in pairs for timeframe in TIMEFRAMES]
+        with scheduler.stage('fetch'):
+            frames = scheduler.map_io(self.get_market_data, tasks, return_exceptions=True)
+            
+        data_by_pair = {pair: {} for pair in pairs}
+        for (pair, timeframe), df in zip(tasks, frames):
+            if isinstance(df, Exception):
+                cprint(f"❌ Error fetching {timeframe} data for {pair}: {str(df)}", "red")
+                df = None
+            data_by_pair[pair][timeframe] = df
+            
+        # Evaluate strategies for every pair that has data
+        evaluable = [pair for pair in pairs if any(df is not None for df in data_by_pair[pair].values())]
+        with scheduler.stage('evaluate'):
+            combined = scheduler.map_cpu(
+                combine_strategy_signals,
+                [(self.strategies, pair, data_by_pair[pair]) for pair in evaluable],
+                return_exceptions=True
+            )
+        combined_by_pair = dict(zip(evaluable, combined))
+        
+        # Recommendations and execution stay sequential and in pair order
+        with scheduler.stage('recommend'):
+            for pair in pairs:
+                cprint(f"\n📊 Analyzing {pair}...", "cyan")
+                try:
+                    if pair not in combined_by_pair:
+                        cprint(f"⚠️ No data available for {pair}", "yellow")
+                        continue
+                    if isinstance(combined_by_pair[pair], Exception):
+                        raise combined_by_pair[pair]
+                    signals = self._finalize_signals(pair, combined_by_pair[pair])
+                    self._act_on_signals(pair, signals, data_by_pair[pair])
+                except Exception as e:
+                    cprint(f"❌ Error analyzing {pair}: {str(e)}", "red")
+                    
+        scheduler.report_timings()
+        
+    def _act_on_signals(self, pair, signals, data):
+        """Turn combined signals into a recommendation and optionally execute it"""
+        # Generate position recommendation
+        if signals and signals.get('confidence', 0) > 0:
+            recommendation = self.generate_recommendation(pair, signals, data[signals.get('timeframe', TIMEFRAMES[0])])
+            
+            # Execute trade if enabled in config
+            if EXECUTE_TRADES and recommendation["recommendation"] != "NEUTRAL":
+                self.execute_recommendation(recommendation)
+        else:
+            cprint(f"⏳ No clear opportunity for {pair} at this time", "yellow")
+            
     def get_market_data(self, pair, timeframe='1h', count=100):
         """Fetch market data for analysis"""
         cprint(f"📈 Fetching {timeframe} data for {pair}...", "blue")
         df = self.data_fetcher.get_price_data(pair, timeframe, count)
         
         if df is not None and not df.empty:
-            # Add technical indicators
-            df = TechnicalAnalysis.add_all_indicators(df)
+            # Add technical indicators (incrementally, over the bars seen in earlier polls too)
+            df = TechnicalAnalysis.add_all_indicators_incremental(df, pair, timeframe)
             return df
         
         return None
@@ -83,27 +182,11 @@ class ForexTradingAgent:
             return None
             
         # Combine signals from different strategies
-        combined_signals = {
-            'direction': None,
-            'confidence': 0,
-            'entry_price': None,
-            'stop_loss': None,
-            'take_profit': None,
-            'timeframe': None,
-            'strategy': None
-        }
-        
-        # Process each strategy
-        for strategy_name, strategy in self.strategies.items():
-            for timeframe, df in data.items():
-                if df is not None and not df.empty:
-                    signal = strategy.generate_signal(pair, df)
-                    
-                    if signal and signal.get('confidence', 0) > combined_signals['confidence']:
-                        combined_signals = signal
-                        combined_signals['timeframe'] = timeframe
-                        combined_signals['strategy'] = strategy_name
+        combined_signals = combine_strategy_signals(self.strategies, pair, data)
+        return self._finalize_signals(pair, combined_signals)
         
+    def _finalize_signals(self, pair, combined_signals):
+        """Apply the confidence threshold and fill in the entry price"""
         # Only recommend if confidence exceeds minimum threshold
         if combined_signals['confidence'] >= STRATEGY_MIN_CONFIDENCE:
             # Get current price if not provided
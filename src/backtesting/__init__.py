@@ -3,9 +3,18 @@ Backtesting package for evaluating trading strategies.
 """
 from .backtest_engine import BacktestEngine
 from .optimization import StrategyOptimizer, MonteCarloSimulator
+from .prefix_cache import PrefixSignalCache
+from .portfolio_backtest import PortfolioBacktester
+from .event_engine import EventDrivenBacktester
+from .costs import CostModel, InstrumentCostModel
 
 __all__ = [
     'BacktestEngine',
     'StrategyOptimizer',
-    'MonteCarloSimulator'
+    'MonteCarloSimulator',
+    'PrefixSignalCache',
+    'PortfolioBacktester',
+    'EventDrivenBacktester',
+    'CostModel',
+    'InstrumentCostModel'
 ] 
\ No newline at end of file
@@ -6,6 +6,9 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from ..strategies.base_strategy import BaseStrategy
 from ..data.historical_data_manager import HistoricalDataManager
+from .prefix_cache import PrefixSignalCache
+from .costs import CostModel
+from .metrics import performance_metrics, trade_list_pnl, trade_list_in_market
 
 class BacktestEngine:
     """
@@ -16,7 +19,8 @@ class BacktestEngine:
     def __init__(self, 
                  data_manager: HistoricalDataManager,
                  initial_capital: float = 10000.0,
-                 commission: float = 0.001):
+                 commission: float = 0.001,
+                 cost_model: Optional[CostModel] = None):
         """
         Initialize the backtesting engine.
         
@@ -24,10 +28,12 @@ class BacktestEngine:
             data_manager: HistoricalDataManager instance
             initial_capital: Initial capital for backtesting
             commission: Trading commission rate
+            cost_model: Default cost model for runs (a flat ``commission`` if not given)
         """
         self.data_manager = data_manager
         self.initial_capital = initial_capital
         self.commission = commission
+        self.cost_model = cost_model or CostModel(commission)
         self.results = {}
         self.trades = []
         
@@ -36,7 +42,11 @@ class BacktestEngine:
                     symbol: str,
                     start_date: Union[str, datetime],
                     end_date: Union[str, datetime],
-                    timeframe: str = '1d') -> Dict:
+                    timeframe: str = '1d',
+                    data: Optional[pd.DataFrame] = None,
+                    mode: str = 'auto',
+                    warm_start: bool = False,
+                    cost_model: Optional[CostModel] = None) -> Dict:
         """
         Run a backtest for a strategy.
         
@@ -46,17 +56,75 @@ class BacktestEngine:
             start_date: Start date
             end_date: End date
             timeframe: Data timeframe
+            data: Optional preprocessed data to use instead of loading it
+            mode: Execution mode - 'loop' (bar-by-bar recommendations),
+                  'vectorized' (single-pass signal array) or 'auto'
+                  (vectorized when the strategy supports it)
+            warm_start: In loop mode, precompute signals once over the full
+                        frame and serve each bar a point-in-time view of them.
+                        Opt-in, for strategies known to be causal: the
+                        lookahead check only samples a few prefixes, so it
+                        can miss a strategy that peeks at later bars
+            cost_model: Cost model for this run (the engine's by default)
             
         Returns:
             Dictionary containing backtest results
         """
+        if mode not in ('auto', 'loop', 'vectorized'):
+            raise ValueError(f"Unknown backtest mode: {mode}")
+        if mode == 'auto':
+            mode = 'vectorized' if strategy.supports_vectorized else 'loop'
+        
         # Load and preprocess data
-        data = self.data_manager.load_data(symbol, start_date, end_date, timeframe)
-        data = self.data_manager.preprocess_data(data)
+        if data is None:
+            data = self.data_manager.load_data(symbol, start_date, end_date, timeframe)
+            data = self.data_manager.preprocess_data(data)
+        
+        costs = self._bar_costs(cost_model, data, data.index, symbol)
+        if mode == 'vectorized':
+            trades, equity_curve = self._run_vectorized(strategy, data, costs)
+        else:
+            trades, equity_curve = self._run_loop(strategy, data, costs, warm_start)
+        
+        # Calculate performance metrics
+        equity_series = pd.Series(equity_curve, index=data.index)
+        returns = equity_series.pct_change().dropna()
+        
+        # Store results
+        self.results = {
+            'strategy': strategy.name,
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'start_date': start_date,
+            'end_date': end_date,
+            'initial_capital': self.initial_capital,
+            'final_capital': equity_curve[-1],
+            'total_return': (equity_curve[-1] / self.initial_capital) - 1,
+            'trades': trades,
+            'equity_curve': equity_curve,
+            'returns': returns,
+            'metrics': self._calculate_metrics(equity_curve, trades, data.index)
+        }
         
-        # Initialize backtest variables
+        return self.results
+    
+    def _bar_costs(self, cost_model: Optional[CostModel], prices, index: Optional[pd.Index], symbol: Optional[str]) -> Dict[str, np.ndarray]:
+        """Per-bar fill and carry rates from the run's (or else the engine's) cost model"""
+        return (cost_model or self.cost_model).bar_costs(prices, index, symbol)
+    
+    def _run_loop(self, strategy: BaseStrategy, data: pd.DataFrame, costs: Dict[str, np.ndarray], warm_start: bool = False):
+        """Run the strategy bar by bar on growing prefixes of the data"""
+        if warm_start and len(data) > 0:
+            cache = PrefixSignalCache(strategy, data)
+            if cache.verify():
+                with cache.attach():
+                    return self._run_loop(strategy, data, costs, warm_start=False)
+        
+        fill, carry = costs['fill'], costs['carry_long']
         capital = self.initial_capital
         position = 0
+        entry_notional = 0.0
+        entry_carry = 0.0
         trades = []
         equity_curve = []
         
@@ -75,7 +143,8 @@ class BacktestEngine:
                 if recommendation['action'] == 'buy' and position <= 0:
                     position_size = capital / price
                     position = position_size
-                    capital -= position_size * price * (1 + self.commission)
+                    capital -= position_size * price * (1 + fill[i])
+                    entry_notional, entry_carry = position_size * price, carry[i]
                     trades.append({
                         'timestamp': data.index[i],
                         'type': 'buy',
@@ -84,7 +153,7 @@ class BacktestEngine:
                         'capital': capital
                     })
                 elif recommendation['action'] == 'sell' and position > 0:
-                    capital += position * price * (1 - self.commission)
+                    capital += position * price * (1 - fill[i]) - entry_notional * (carry[i] - entry_carry)
                     trades.append({
                         'timestamp': data.index[i],
                         'type': 'sell',
@@ -95,73 +164,193 @@ class BacktestEngine:
                     position = 0
             
             # Update equity curve
-            current_equity = capital + (position * data['close'].iloc[i] if position > 0 else 0)
+            current_equity = capital + (
+                position * data['close'].iloc[i] - entry_notional * (carry[i] - entry_carry) if position > 0 else 0
+            )
             equity_curve.append(current_equity)
         
-        # Calculate performance metrics
-        equity_series = pd.Series(equity_curve, index=data.index)
-        returns = equity_series.pct_change().dropna()
+        return trades, equity_curve
+    
+    def _run_vectorized(self, strategy: BaseStrategy, data: pd.DataFrame, costs: Dict[str, np.ndarray]):
+        """
+        Run the strategy from a single-pass signal array.
         
-        # Store results
-        self.results = {
-            'strategy': strategy.name,
-            'symbol': symbol,
-            'timeframe': timeframe,
-            'start_date': start_date,
-            'end_date': end_date,
-            'initial_capital': self.initial_capital,
-            'final_capital': equity_curve[-1],
-            'total_return': (equity_curve[-1] / self.initial_capital) - 1,
-            'trades': trades,
-            'equity_curve': equity_curve,
-            'returns': returns,
-            'metrics': self._calculate_metrics(returns, trades)
-        }
+        Applies the same all-in, long-only fill rules as the bar loop: a buy
+        opens a position when flat, a sell closes it when long, everything
+        else is ignored. Fills, costs and equity are computed with array
+        operations; only the trade records are built per trade.
+        """
+        actions = np.asarray(strategy.generate_signal_array(data))
+        close = data['close'].to_numpy(dtype=float)
+        positions = np.arange(len(close))
         
-        return self.results
+        if len(close) == 0:
+            return [], []
+        
+        # Long after the latest buy/sell action was a buy, flat otherwise
+        last_action = np.maximum.accumulate(np.where(actions != 0, positions, 0))
+        is_long = actions[last_action] == 1
+        was_long = np.concatenate(([False], is_long[:-1]))
+        entry_mask = is_long & ~was_long
+        exit_mask = ~is_long & was_long
+        entries = np.flatnonzero(entry_mask)
+        exits = np.flatnonzero(exit_mask)
+        
+        if len(entries) == 0:
+            return [], [self.initial_capital] * len(close)
+        
+        fill, carry = costs['fill'], costs['carry_long']
+        entry_price = close[entries]
+        exit_price = close[exits]
+        n_closed = len(exits)
+        # Financing accrued over each closed round trip, per unit of entry notional
+        held_carry = carry[exits] - carry[entries[:n_closed]]
+        
+        # Capital compounds by each closed round trip's growth factor
+        growth = (exit_price / entry_price[:n_closed]) * (1 - fill[exits]) - fill[entries[:n_closed]] - held_carry
+        capital_before = self.initial_capital * np.concatenate(([1.0], np.cumprod(growth)))
+        
+        size = capital_before[:len(entries)] / entry_price
+        capital_after_entry = capital_before[:len(entries)] - size * entry_price * (1 + fill[entries])
+        capital_after_exit = (
+            capital_after_entry[:n_closed] + size[:n_closed] * exit_price * (1 - fill[exits])
+            - size[:n_closed] * entry_price[:n_closed] * held_carry
+        )
+        capital_flat = np.concatenate(([self.initial_capital], capital_after_exit))
+        
+        # Equity per bar: cash plus marked-to-market position (less accrued financing) while long
+        open_trade = np.maximum(np.cumsum(entry_mask) - 1, 0)
+        closed_trades = np.cumsum(exit_mask)
+        equity = np.where(
+            is_long,
+            capital_after_entry[open_trade] + size[open_trade] * close
+            - size[open_trade] * entry_price[open_trade] * (carry - carry[entries[open_trade]]),
+            capital_flat[closed_trades]
+        )
+        
+        trades = []
+        for k, i in enumerate(entries):
+            trades.append({
+                'timestamp': data.index[i],
+                'type': 'buy',
+                'price': entry_price[k],
+                'size': size[k],
+                'capital': capital_after_entry[k]
+            })
+            if k < n_closed:
+                trades.append({
+                    'timestamp': data.index[exits[k]],
+                    'type': 'sell',
+                    'price': exit_price[k],
+                    'size': size[k],
+                    'capital': capital_after_exit[k]
+                })
+        
+        return trades, equity.tolist()
     
-    def _calculate_metrics(self, returns: pd.Series, trades: List[Dict]) -> Dict:
-        """Calculate performance metrics"""
-        if len(trades) < 2:
-            return {
-                'sharpe_ratio': 0,
-                'sortino_ratio': 0,
-                'max_drawdown': 0,
-                'win_rate': 0,
-                'profit_factor': 0,
-                'avg_trade': 0
-            }
-        
-        # Calculate returns-based metrics
-        sharpe_ratio = np.sqrt(252) * returns.mean() / returns.std()
-        downside_returns = returns[returns < 0]
-        sortino_ratio = np.sqrt(252) * returns.mean() / downside_returns.std() if len(downside_returns) > 0 else 0
-        
-        # Calculate drawdown
-        cummax = returns.cumsum().expanding().max()
-        drawdown = (returns.cumsum() - cummax) / cummax
-        max_drawdown = drawdown.min()
-        
-        # Calculate trade-based metrics
-        winning_trades = [t for t in trades if t['type'] == 'sell' and t['capital'] > trades[trades.index(t)-1]['capital']]
-        losing_trades = [t for t in trades if t['type'] == 'sell' and t['capital'] <= trades[trades.index(t)-1]['capital']]
-        
-        win_rate = len(winning_trades) / len([t for t in trades if t['type'] == 'sell'])
-        
-        total_profit = sum(t['capital'] - trades[trades.index(t)-1]['capital'] for t in winning_trades)
-        total_loss = abs(sum(t['capital'] - trades[trades.index(t)-1]['capital'] for t in losing_trades))
-        profit_factor = total_profit / total_loss if total_loss > 0 else float('inf')
-        
-        avg_trade = (total_profit - total_loss) / len([t for t in trades if t['type'] == 'sell'])
+    def run_batch(self,
+                  strategy: BaseStrategy,
+                  prices: Dict[str, np.ndarray],
+                  symbol: Optional[str] = None,
+                  index: Optional[pd.Index] = None,
+                  cost_model: Optional[CostModel] = None) -> Dict[str, np.ndarray]:
+        """
+        Backtest many price paths at once from a strategy's signal matrix.
         
-        return {
-            'sharpe_ratio': sharpe_ratio,
-            'sortino_ratio': sortino_ratio,
-            'max_drawdown': max_drawdown,
-            'win_rate': win_rate,
-            'profit_factor': profit_factor,
-            'avg_trade': avg_trade
-        }
+        Args:
+            strategy: Strategy implementing generate_signal_matrix
+            prices: 'open', 'high', 'low', 'close' and 'volume' arrays of shape (n_paths, n_bars)
+            symbol: Trading symbol the paths simulate (for instrument costs)
+            index: Bar timestamps shared by the paths (for financing costs)
+            cost_model: Cost model for this run (the engine's by default)
+            
+        Returns:
+            Per-path results, see _run_action_matrix
+        """
+        actions = np.asarray(strategy.generate_signal_matrix(prices))
+        costs = self._bar_costs(cost_model, prices, index, symbol)
+        return self._run_action_matrix(actions, np.asarray(prices['close'], dtype=float), costs)
+    
+    def run_param_batch(self,
+                        strategy: BaseStrategy,
+                        data: pd.DataFrame,
+                        param_sets: List[Dict],
+                        symbol: Optional[str] = None,
+                        cost_model: Optional[CostModel] = None) -> Dict[str, np.ndarray]:
+        """
+        Backtest many parameter sets of a strategy on the same data at once.
+        
+        Costs are computed once from the data and shared by every parameter set.
+        
+        Args:
+            strategy: Strategy implementing generate_param_signal_matrix
+            data: Preprocessed data
+            param_sets: Parameter overrides, one dictionary per parameter set
+            symbol: Trading symbol (for instrument costs)
+            cost_model: Cost model for this run (the engine's by default)
+            
+        Returns:
+            Per-parameter-set results, see _run_action_matrix
+        """
+        actions = np.asarray(strategy.generate_param_signal_matrix(data, param_sets))
+        costs = {key: values[None, :] for key, values in self._bar_costs(cost_model, data, data.index, symbol).items()}
+        return self._run_action_matrix(actions, data['close'].to_numpy(dtype=float)[None, :], costs)
+    
+    def _run_action_matrix(self, actions: np.ndarray, close: np.ndarray, costs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Run one backtest per row of an action matrix.
+        
+        Uses the same all-in, long-only fill rules as the other modes. While
+        long, equity is the capital before the trade times
+        (close / entry price - entry fill rate - accrued carry); each closed
+        round trip multiplies the capital by its growth factor, so every row
+        is a cumulative product along the bar axis.
+        
+        Args:
+            actions: Actions of shape (n_rows, n_bars)
+            close: Close prices of shape (n_rows, n_bars), or (1, n_bars) shared by all rows
+            costs: Per-bar 'fill' and 'carry_long' rates, shaped like close
+            
+        Returns:
+            Dictionary of per-row arrays: 'equity' (n_rows, n_bars), and
+            'final_capital', 'n_trades' and every performance_metrics metric (n_rows,)
+        """
+        positions = np.arange(actions.shape[1])
+        
+        # Long after the latest buy/sell action was a buy, flat otherwise
+        last_action = np.maximum.accumulate(np.where(actions != 0, positions, 0), axis=1)
+        is_long = np.take_along_axis(actions, last_action, axis=1) == 1
+        was_long = np.zeros_like(is_long)
+        was_long[:, 1:] = is_long[:, :-1]
+        entry_mask = is_long & ~was_long
+        exit_mask = ~is_long & was_long
+        
+        # Entry price of the open (or just closed) trade at every bar
+        last_entry = np.maximum.accumulate(np.where(entry_mask, positions, 0), axis=1)
+        entry_price = np.take_along_axis(np.broadcast_to(close, actions.shape), last_entry, axis=1)
+        fill = np.broadcast_to(costs['fill'], actions.shape)
+        carry = np.broadcast_to(costs['carry_long'], actions.shape)
+        entry_fill = np.take_along_axis(fill, last_entry, axis=1)
+        held_carry = carry - np.take_along_axis(carry, last_entry, axis=1)
+        
+        growth = np.where(exit_mask, (close / entry_price) * (1 - fill) - entry_fill - held_carry, 1.0)
+        capital_before = self.initial_capital * np.cumprod(growth, axis=1)
+        equity = np.where(is_long, capital_before * (close / entry_price - entry_fill - held_carry), capital_before)
+        
+        # Each round trip's result against the capital before its entry
+        capital_at_entry = np.take_along_axis(capital_before, last_entry, axis=1)
+        n_trades = entry_mask.sum(axis=1) + exit_mask.sum(axis=1)
+        trade_pnl = np.where(exit_mask, equity - capital_at_entry, np.nan)
+        
+        results = performance_metrics(equity, trade_pnl, is_long)
+        results.update({'equity': equity, 'final_capital': equity[:, -1], 'n_trades': n_trades})
+        return results
+    
+    def _calculate_metrics(self, equity_curve: List[float], trades: List[Dict], index: pd.Index) -> Dict:
+        """Calculate performance metrics"""
+        return performance_metrics(
+            np.asarray(equity_curve, dtype=float), trade_list_pnl(trades, self.initial_capital), trade_list_in_market(trades, index)
+        )
     
     def plot_equity_curve(self):
         """Plot the equity curve"""
@@ -213,8 +402,11 @@ class BacktestEngine:
             'Sharpe Ratio': f"{self.results['metrics']['sharpe_ratio']:.2f}",
             'Sortino Ratio': f"{self.results['metrics']['sortino_ratio']:.2f}",
             'Max Drawdown': f"{self.results['metrics']['max_drawdown']*100:.2f}%",
+            'Max Drawdown Duration': f"{self.results['metrics']['max_drawdown_duration']} bars",
+            'Calmar Ratio': f"{self.results['metrics']['calmar_ratio']:.2f}",
             'Win Rate': f"{self.results['metrics']['win_rate']*100:.2f}%",
             'Profit Factor': f"{self.results['metrics']['profit_factor']:.2f}",
-            'Average Trade': f"${self.results['metrics']['avg_trade']:,.2f}",
+            'Average Trade': f"${self.results['metrics']['expectancy']:,.2f}",
+            'Exposure': f"{self.results['metrics']['exposure']*100:.2f}%",
             'Total Trades': len([t for t in self.results['trades'] if t['type'] == 'sell'])
         } 
\ No newline at end of file
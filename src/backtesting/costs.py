@@ -0,0 +1,165 @@
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from ..config import get_instrument_type
+
+# Typical quoted spreads in basis points of price
+SPREAD_BPS = {'forex': 1.0, 'commodity': 2.5, 'stock': 2.0}
+
+# Commission rate per fill (FX and metals are mostly spread-only)
+COMMISSIONS = {'forex': 0.0, 'commodity': 0.0, 'stock': 0.0005}
+
+# Annual financing rates (long, short) charged per rollover; negative rates are earned
+SWAP_RATES = {'forex': (0.01, 0.01), 'commodity': (0.03, 0.01), 'stock': (0.0, 0.02)}
+
+# Rollovers charged for the night starting on each weekday (Monday first). FX and
+# metals charge the weekend on Wednesday night; stock borrow accrues every night.
+ROLLOVER_WEIGHTS = {
+    'forex': (1, 1, 3, 1, 1, 0, 0),
+    'commodity': (1, 1, 3, 1, 1, 0, 0),
+    'stock': (1, 1, 1, 1, 1, 1, 1)
+}
+
+ATR_PERIOD = 14
+
+class CostModel:
+    """
+    Trading costs as per-bar rates, computed once for a whole price series.
+
+    Engines charge ``fill`` (a fraction of the notional) on every fill at a
+    bar, and a position held from bar i to bar j pays
+    ``carry[j] - carry[i]`` of its entry notional. Because the rates only
+    depend on the prices, one set of arrays serves any number of parameter
+    sets or signal variations.
+
+    The base model charges a flat commission and no carry, which is exactly
+    what the engines' ``commission`` argument does.
+    """
+
+    def __init__(self, commission: float = 0.001):
+        """
+        Initialize the cost model.
+
+        Args:
+            commission: Commission rate per fill
+        """
+        self.commission = commission
+
+    def bar_costs(self,
+                  prices: Dict[str, np.ndarray],
+                  index: Optional[pd.Index] = None,
+                  symbol: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Per-bar cost rates for a price series (or the rows of a 2-D array of paths).
+
+        Args:
+            prices: 'high', 'low' and 'close' arrays whose last axis is time
+            index: Bar timestamps, used to count rollovers
+            symbol: Trading symbol, used to look up instrument costs
+
+        Returns:
+            Dictionary with 'fill' (rate per fill) and 'carry_long' /
+            'carry_short' (cumulative financing rate since the first bar)
+        """
+        shape = np.shape(prices['close'])
+        return {
+            'fill': np.full(shape, float(self.commission)),
+            'carry_long': np.zeros(shape),
+            'carry_short': np.zeros(shape)
+        }
+
+class InstrumentCostModel(CostModel):
+    """
+    Spread, slippage, commission and swap by instrument type.
+
+    Every fill pays the commission, half the spread and a slippage of
+    ``slippage_atr`` times the ATR. Positions held over a rollover pay the
+    instrument's annual swap rate / 365 per rollover.
+    """
+
+    def __init__(self,
+                 slippage_atr: float = 0.05,
+                 spreads: Optional[Dict[str, float]] = None,
+                 commissions: Optional[Dict[str, float]] = None,
+                 swap_rates: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Initialize the instrument cost model.
+
+        Args:
+            slippage_atr: Slippage per fill as a multiple of the 14-bar ATR
+            spreads: Spread overrides in basis points, keyed by symbol or instrument type
+            commissions: Commission rate overrides, keyed by symbol or instrument type
+            swap_rates: Annual (long, short) swap rate overrides, keyed by symbol or instrument type
+        """
+        super().__init__(commission=0.0)
+        self.slippage_atr = slippage_atr
+        self.spreads = dict(SPREAD_BPS, **(spreads or {}))
+        self.commissions = dict(COMMISSIONS, **(commissions or {}))
+        self.swap_rates = dict(SWAP_RATES, **(swap_rates or {}))
+
+    def bar_costs(self,
+                  prices: Dict[str, np.ndarray],
+                  index: Optional[pd.Index] = None,
+                  symbol: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Per-bar cost rates for the symbol's instrument type, see CostModel.bar_costs"""
+        if symbol is None:
+            raise ValueError("InstrumentCostModel needs the symbol to look up its costs")
+        instrument = get_instrument_type(symbol)
+        close = np.asarray(prices['close'], dtype=float)
+
+        spread = self._lookup(self.spreads, symbol, instrument) / 10000
+        commission = self._lookup(self.commissions, symbol, instrument)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slippage = self.slippage_atr * average_true_range(prices) / close
+        fill = commission + spread / 2 + np.nan_to_num(slippage)
+
+        rollovers = rollover_counts(index, ROLLOVER_WEIGHTS[instrument]) if index is not None else np.zeros(close.shape[-1])
+        long_rate, short_rate = self._lookup(self.swap_rates, symbol, instrument)
+        return {
+            'fill': fill,
+            'carry_long': np.broadcast_to(rollovers * long_rate / 365, close.shape).copy(),
+            'carry_short': np.broadcast_to(rollovers * short_rate / 365, close.shape).copy()
+        }
+
+    @staticmethod
+    def _lookup(table: Dict, symbol: str, instrument: str):
+        """Symbol entry if there is one, else the instrument type's"""
+        return table[symbol] if symbol in table else table[instrument]
+
+def average_true_range(prices: Dict[str, np.ndarray], period: int = ATR_PERIOD) -> np.ndarray:
+    """
+    Mean true range along the last axis, over the bars so far until ``period`` are available.
+
+    The first bar's true range is its high - low.
+    """
+    high = np.asarray(prices['high'], dtype=float)
+    low = np.asarray(prices['low'], dtype=float)
+    close = np.asarray(prices['close'], dtype=float)
+    true_range = high - low
+    prev_close = close[..., :-1]
+    true_range[..., 1:] = np.maximum(
+        true_range[..., 1:], np.maximum(np.abs(high[..., 1:] - prev_close), np.abs(low[..., 1:] - prev_close))
+    )
+    cumsum = np.cumsum(true_range, axis=-1)
+    sums = cumsum.copy()
+    sums[..., period:] = cumsum[..., period:] - cumsum[..., :-period]
+    counts = np.minimum(np.arange(1, true_range.shape[-1] + 1), period)
+    return sums / counts
+
+def rollover_counts(index: pd.Index, weights: Tuple[int, ...]) -> np.ndarray:
+    """
+    Weighted rollovers between the first bar and every bar.
+
+    A rollover happens at each midnight crossed; the night starting on
+    weekday d counts weights[d] times (Monday = 0). Indexes without
+    timestamps have no rollovers.
+    """
+    if not isinstance(index, pd.DatetimeIndex) or len(index) == 0:
+        return np.zeros(len(index))
+    days = index.tz_localize(None) if index.tz is not None else index
+    days = days.values.astype('datetime64[D]').astype(np.int64)
+    # Day 0 (1970-01-01) was a Thursday, so the weekly pattern starts at weekday 3
+    pattern = np.roll(np.asarray(weights, dtype=float), -3)
+    prefix = np.concatenate(([0.0], np.cumsum(pattern)))
+    nights = (days // 7) * pattern.sum() + prefix[days % 7]
+    return nights - nights[0]
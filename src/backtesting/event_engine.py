@@ -0,0 +1,352 @@
+from typing import Dict, Optional, Tuple, Union
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from ..strategies.base_strategy import BaseStrategy
+from ..data.historical_data_manager import HistoricalDataManager
+from .costs import CostModel
+from .metrics import performance_metrics
+
+# Order kinds
+STOP, LIMIT = 0, 1
+
+# Which bracket fills when a bar reaches both the stop and the target
+TIE_BREAKS = ('stop', 'target', 'nearest')
+
+class OrderBook:
+    """
+    Pending stop and limit orders held in parallel arrays.
+
+    Every order closes the whole position it protects. Orders sharing a
+    group are one-cancels-other: filling one cancels the rest.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.side = np.zeros(capacity, dtype=np.int8)   # 1 buy, -1 sell
+        self.kind = np.zeros(capacity, dtype=np.int8)   # STOP or LIMIT
+        self.price = np.zeros(capacity)
+        self.group = np.zeros(capacity, dtype=np.int64)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.count = 0
+        self.n_active = 0
+
+    def add(self, side: int, kind: int, price: float, group: int) -> int:
+        """Place an order and return its id"""
+        if self.n_active == 0:
+            # Nothing pending, so the slots can be reused from the start
+            self.count = 0
+        if self.count == len(self.side):
+            for name in ('side', 'kind', 'price', 'group', 'active'):
+                values = getattr(self, name)
+                setattr(self, name, np.concatenate((values, np.zeros_like(values))))
+        order = self.count
+        self.side[order] = side
+        self.kind[order] = kind
+        self.price[order] = price
+        self.group[order] = group
+        self.active[order] = True
+        self.count += 1
+        self.n_active += 1
+        return order
+
+    def cancel_group(self, group: int):
+        """Cancel every pending order of a group"""
+        cancelled = self.active[:self.count] & (self.group[:self.count] == group)
+        self.active[:self.count][cancelled] = False
+        self.n_active -= int(cancelled.sum())
+
+    def pending(self) -> np.ndarray:
+        """Ids of the pending orders"""
+        return np.flatnonzero(self.active[:self.count])
+
+def triggers_on_high(side: int, kind: int) -> bool:
+    """Buy stops and sell limits trigger when the high reaches them; the others on the low"""
+    return (kind == STOP) == (side == 1)
+
+def fill_price(side: int, kind: int, price: float, bar_open: float) -> float:
+    """Order price, or the open when the bar gaps through it"""
+    if triggers_on_high(side, kind):
+        return max(bar_open, price)
+    return min(bar_open, price)
+
+class EventDrivenBacktester:
+    """
+    Event-driven backtester with intrabar stop loss and take profit fills.
+
+    A strategy's signals are acted on at the close of the bar they fire on:
+    a buy opens a long (closing any short), a sell closes a long and, when
+    shorting is allowed, opens a short. Each new position places its
+    stop_loss as a stop order and its take_profit as a limit order, one
+    cancelling the other. From the next bar on, those orders fill intrabar
+    from the bar's high and low (at the open when the bar gaps through them).
+    """
+
+    def __init__(self,
+                 data_manager: HistoricalDataManager,
+                 initial_capital: float = 10000.0,
+                 commission: float = 0.001,
+                 position_size: float = 1.0,
+                 allow_short: bool = True,
+                 tie_break: str = 'stop',
+                 cost_model: Optional[CostModel] = None):
+        """
+        Initialize the event-driven backtester.
+
+        Args:
+            data_manager: HistoricalDataManager instance
+            initial_capital: Initial capital for backtesting
+            commission: Trading commission rate
+            position_size: Fraction of equity committed to each position
+            allow_short: Open shorts on sell signals (otherwise sells only close longs)
+            tie_break: Bracket that fills when one bar reaches both levels -
+                       'stop' (pessimistic), 'target' (optimistic) or 'nearest'
+                       (the level closer to the bar's open)
+            cost_model: Default cost model for runs (a flat ``commission`` if not given)
+        """
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"Unknown tie break {tie_break!r}; expected one of {TIE_BREAKS}")
+        self.data_manager = data_manager
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.position_size = position_size
+        self.allow_short = allow_short
+        self.tie_break = tie_break
+        self.cost_model = cost_model or CostModel(commission)
+        self.results = {}
+
+    def run_backtest(self,
+                     strategy: BaseStrategy,
+                     symbol: str,
+                     start_date: Union[str, datetime],
+                     end_date: Union[str, datetime],
+                     timeframe: str = '1d',
+                     data: Optional[pd.DataFrame] = None,
+                     cost_model: Optional[CostModel] = None) -> Dict:
+        """
+        Run an event-driven backtest for a strategy.
+
+        Strategies implementing generate_order_arrays trade their signals
+        with bracket orders; others trade their recommendation actions
+        without stops.
+
+        Args:
+            strategy: Strategy instance to backtest
+            symbol: Trading symbol
+            start_date: Start date
+            end_date: End date
+            timeframe: Data timeframe
+            data: Optional preprocessed data to use instead of loading it
+            cost_model: Cost model for this run (the engine's by default)
+
+        Returns:
+            Dictionary containing backtest results
+        """
+        if data is None:
+            data = self.data_manager.load_data(symbol, start_date, end_date, timeframe)
+            data = self.data_manager.preprocess_data(data)
+
+        if strategy.supports_orders:
+            signals, stop_loss, take_profit = strategy.generate_order_arrays(data, symbol)
+        else:
+            signals = strategy.generate_signal_array(data)
+            stop_loss = take_profit = np.full(len(data), np.nan)
+
+        prices = {field: data[field].to_numpy(dtype=float) for field in ('open', 'high', 'low', 'close')}
+        costs = (cost_model or self.cost_model).bar_costs(prices, data.index, symbol)
+        simulation = self.run_orders(prices, signals, stop_loss, take_profit, costs)
+        trades = []
+        for trade in simulation['trades']:
+            bar = trade.pop('bar')
+            trades.append({'timestamp': data.index[bar], **trade})
+
+        equity_curve = simulation['equity']
+        returns = pd.Series(equity_curve, index=data.index).pct_change().dropna()
+        final_capital = equity_curve[-1] if len(equity_curve) else self.initial_capital
+
+        self.results = {
+            'strategy': strategy.name,
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'start_date': start_date,
+            'end_date': end_date,
+            'initial_capital': self.initial_capital,
+            'final_capital': final_capital,
+            'total_return': (final_capital / self.initial_capital) - 1,
+            'trades': trades,
+            'equity_curve': equity_curve.tolist(),
+            'position': simulation['position'],
+            'returns': returns,
+            'metrics': performance_metrics(equity_curve, simulation['trade_pnl'], simulation['position'] != 0)
+        }
+        return self.results
+
+    def run_orders(self,
+                   prices: Dict[str, np.ndarray],
+                   signals: np.ndarray,
+                   stop_loss: np.ndarray,
+                   take_profit: np.ndarray,
+                   costs: Optional[Dict[str, np.ndarray]] = None) -> Dict:
+        """
+        Simulate the fills of per-bar signals and their bracket orders.
+
+        Only bars where something can happen are visited: the next signal
+        that would change the position, and the first bar whose high or low
+        reaches a pending order (found with one array scan per order).
+
+        Args:
+            prices: 'open', 'high', 'low' and 'close' arrays
+            signals: 1 (buy), -1 (sell) or 0 per bar
+            stop_loss: Stop level of each bar's signal (NaN for none)
+            take_profit: Target level of each bar's signal (NaN for none)
+            costs: Per-bar 'fill', 'carry_long' and 'carry_short' rates
+                   (from the engine's cost model if not given)
+
+        Returns:
+            Dictionary with 'equity' and 'position' (signed units) per bar,
+            'trades' (one record per fill, with its bar) and 'trade_pnl'
+            (cash gained by every closed round trip)
+        """
+        open_, high, low, close = (np.asarray(prices[field], dtype=float) for field in ('open', 'high', 'low', 'close'))
+        signals = np.asarray(signals)
+        n = len(close)
+        next_buy = _next_true(signals == 1)
+        next_sell = _next_true(signals == -1)
+        if costs is None:
+            costs = self.cost_model.bar_costs(prices)
+        fill_rate, carry_long, carry_short = costs['fill'], costs['carry_long'], costs['carry_short']
+
+        book = OrderBook()
+        cash = self.initial_capital
+        units = 0.0
+        entry_cash = cash
+        entry_notional = 0.0
+        entry_carry = 0.0
+        group = 0
+        fill_bars, fill_units, fill_cash, fill_notional, fill_carry, trades, trade_pnl = [], [], [], [], [], [], []
+
+        def fill(bar, quantity, price, reason):
+            nonlocal cash, units, entry_notional, entry_carry
+            cash -= quantity * price + abs(quantity) * price * fill_rate[bar]
+            if units != 0:
+                # Closing: pay the financing accrued since the entry
+                cash -= entry_notional * ((carry_long if units > 0 else carry_short)[bar] - entry_carry)
+                entry_notional = 0.0
+            else:
+                entry_notional = abs(quantity) * price
+                entry_carry = (carry_long if quantity > 0 else carry_short)[bar]
+            units += quantity
+            fill_bars.append(bar)
+            fill_units.append(units)
+            fill_cash.append(cash)
+            fill_notional.append(entry_notional)
+            fill_carry.append(entry_carry)
+            trades.append({
+                'bar': bar,
+                'type': 'buy' if quantity > 0 else 'sell',
+                'price': price,
+                'size': abs(quantity),
+                'capital': cash,
+                'reason': reason
+            })
+
+        bar = 0       # first bar whose close is still to be processed
+        scan_from = 0  # first bar whose range has not been checked against the book
+        while bar < n:
+            # Next signal that changes the position
+            if units > 0:
+                signal_bar = next_sell[bar]
+            elif units < 0:
+                signal_bar = next_buy[bar]
+            else:
+                signal_bar = min(next_buy[bar], next_sell[bar]) if self.allow_short else next_buy[bar]
+
+            if book.n_active:
+                last = min(signal_bar, n - 1)
+                hit_bar, order = self._first_fill(book, open_, high, low, scan_from, last + 1)
+                if order is not None:
+                    price = fill_price(book.side[order], book.kind[order], book.price[order], open_[hit_bar])
+                    fill(hit_bar, -units, price, 'stop_loss' if book.kind[order] == STOP else 'take_profit')
+                    trade_pnl.append(cash - entry_cash)
+                    book.cancel_group(book.group[order])
+                    bar, scan_from = hit_bar, hit_bar + 1
+                    continue
+
+            if signal_bar >= n:
+                break
+            direction = int(signals[signal_bar])
+            price = close[signal_bar]
+            if units != 0:
+                fill(signal_bar, -units, price, 'signal')
+                trade_pnl.append(cash - entry_cash)
+                book.cancel_group(group)
+            if direction == 1 or self.allow_short:
+                entry_cash = cash
+                fill(signal_bar, direction * self.position_size * cash / price, price, 'signal')
+                group += 1
+                if not np.isnan(stop_loss[signal_bar]):
+                    book.add(-direction, STOP, stop_loss[signal_bar], group)
+                if not np.isnan(take_profit[signal_bar]):
+                    book.add(-direction, LIMIT, take_profit[signal_bar], group)
+            bar = scan_from = signal_bar + 1
+
+        # Units, cash and the open notional only change at fills; carry them forward to every bar
+        last_fill = np.searchsorted(np.asarray(fill_bars, dtype=np.int64), np.arange(n), side='right') - 1
+        position = np.where(last_fill >= 0, np.append(fill_units, 0.0)[last_fill], 0.0)
+        cash_held = np.where(last_fill >= 0, np.append(fill_cash, 0.0)[last_fill], self.initial_capital)
+        notional = np.where(last_fill >= 0, np.append(fill_notional, 0.0)[last_fill], 0.0)
+        accrued = notional * (np.where(position > 0, carry_long, carry_short) - np.append(fill_carry, 0.0)[last_fill])
+        return {
+            'equity': cash_held + position * close - accrued,
+            'position': position,
+            'trades': trades,
+            'trade_pnl': np.asarray(trade_pnl)
+        }
+
+    def _first_fill(self,
+                    book: OrderBook,
+                    open_: np.ndarray,
+                    high: np.ndarray,
+                    low: np.ndarray,
+                    start: int,
+                    stop: int) -> Tuple[int, Optional[int]]:
+        """
+        First bar in [start, stop) that reaches a pending order, and the order that fills.
+
+        Returns:
+            (bar, order id), or (stop, None) when no order is reached
+        """
+        first_bar, candidates = stop, []
+        for order in book.pending():
+            side, kind, price = book.side[order], book.kind[order], book.price[order]
+            if triggers_on_high(side, kind):
+                reached = np.flatnonzero(high[start:stop] >= price)
+            else:
+                reached = np.flatnonzero(low[start:stop] <= price)
+            if len(reached) == 0:
+                continue
+            hit = start + reached[0]
+            if hit < first_bar:
+                first_bar, candidates = hit, [order]
+            elif hit == first_bar:
+                candidates.append(order)
+
+        if not candidates:
+            return stop, None
+        if len(candidates) == 1 or self.tie_break != 'nearest':
+            preferred = LIMIT if self.tie_break == 'target' else STOP
+            return first_bar, next((order for order in candidates if book.kind[order] == preferred), candidates[0])
+
+        # The level closer to the open is assumed to trade first; a gap through a level fills it at the open
+        bar_open = open_[first_bar]
+        distance = []
+        for order in candidates:
+            side, kind, price = book.side[order], book.kind[order], book.price[order]
+            gapped = fill_price(side, kind, price, bar_open) != price
+            distance.append(0.0 if gapped else abs(bar_open - price))
+        return first_bar, candidates[int(np.argmin(distance))]
+
+def _next_true(mask: np.ndarray) -> np.ndarray:
+    """Position of the first True at or after every index (len(mask) if none), with one extra slot"""
+    n = len(mask)
+    positions = np.where(mask, np.arange(n), n)
+    return np.append(np.minimum.accumulate(positions[::-1])[::-1], n)
@@ -0,0 +1,126 @@
+from typing import Dict, List, Union
+import numpy as np
+import pandas as pd
+
+PERIODS_PER_YEAR = 252
+
+def performance_metrics(equity: np.ndarray,
+                        trade_pnl: np.ndarray,
+                        in_market: np.ndarray,
+                        periods_per_year: int = PERIODS_PER_YEAR) -> Dict[str, Union[float, np.ndarray]]:
+    """
+    Performance metrics of one equity curve, or of every row of a batch of curves.
+
+    Everything is reduced along the last axis, so a 2-D batch from a
+    parameter sweep or a Monte Carlo run costs a handful of array passes.
+    Drawdowns are measured on the equity itself. Metrics that are undefined
+    (a flat curve, no closed trades) are 0, except a profit factor without
+    losing trades, which is infinite.
+
+    Args:
+        equity: Equity at every bar, shape (n_bars,) or (n_rows, n_bars)
+        trade_pnl: Cash result of every closed trade, shape (n_trades,) or
+                   (n_rows, n_trades); NaN entries are padding, not trades
+        in_market: Whether a position was held at every bar (or the fraction
+                   of equity invested), shaped like equity
+        periods_per_year: Bars per year, used to annualize
+
+    Returns:
+        Dictionary with 'sharpe_ratio', 'sortino_ratio', 'max_drawdown' (a
+        negative fraction), 'max_drawdown_duration' (bars), 'calmar_ratio',
+        'win_rate', 'profit_factor', 'expectancy' (mean P&L per trade) and
+        'exposure'; floats for one curve, (n_rows,) arrays for a batch
+    """
+    single = np.ndim(equity) == 1
+    equity = np.atleast_2d(np.asarray(equity, dtype=float))
+    trade_pnl = np.atleast_2d(np.asarray(trade_pnl, dtype=float))
+    in_market = np.atleast_2d(np.asarray(in_market, dtype=float))
+    n_rows, n_bars = equity.shape
+    annualize = np.sqrt(periods_per_year)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        returns = equity[:, 1:] / equity[:, :-1] - 1
+        n_returns = returns.shape[1]
+        mean_return = returns.mean(axis=1) if n_returns else np.zeros(n_rows)
+        volatility = returns.std(axis=1, ddof=1) if n_returns > 1 else np.zeros(n_rows)
+        sharpe_ratio = np.where(volatility > 0, annualize * mean_return / volatility, 0.0)
+
+        # Sample deviation of the losing bars' returns
+        losing = returns < 0
+        n_losing = losing.sum(axis=1)
+        losing_mean = np.where(losing, returns, 0.0).sum(axis=1) / n_losing
+        downside = np.sqrt(np.where(losing, (returns - losing_mean[:, None]) ** 2, 0.0).sum(axis=1) / (n_losing - 1))
+        sortino_ratio = np.where((n_losing > 1) & (downside > 0), annualize * mean_return / downside, 0.0)
+
+        # Drawdown from the running peak, and the longest stretch spent below one
+        running_max = np.maximum.accumulate(equity, axis=1)
+        drawdown = np.where(running_max > 0, equity / running_max - 1, 0.0)
+        max_drawdown = drawdown.min(axis=1) if n_bars else np.zeros(n_rows)
+        positions = np.arange(n_bars)
+        last_peak = np.maximum.accumulate(np.where(equity >= running_max, positions, 0), axis=1)
+        max_drawdown_duration = (positions - last_peak).max(axis=1) if n_bars else np.zeros(n_rows, dtype=int)
+
+        growth = equity[:, -1] / equity[:, 0] if n_bars else np.ones(n_rows)
+        annual_return = np.where(
+            (growth > 0) & (n_returns > 0), growth ** (periods_per_year / max(n_returns, 1)) - 1, -1.0
+        )
+        calmar_ratio = np.where(
+            max_drawdown < 0, annual_return / -max_drawdown, np.where(annual_return > 0, np.inf, 0.0)
+        )
+
+        is_trade = ~np.isnan(trade_pnl)
+        n_trades = is_trade.sum(axis=1)
+        pnl = np.where(is_trade, trade_pnl, 0.0)
+        total_profit = np.where(pnl > 0, pnl, 0.0).sum(axis=1)
+        total_loss = -np.where(pnl < 0, pnl, 0.0).sum(axis=1)
+        win_rate = np.where(n_trades > 0, (pnl > 0).sum(axis=1) / n_trades, 0.0)
+        profit_factor = np.where(
+            total_loss > 0, total_profit / total_loss, np.where(n_trades > 0, np.inf, 0.0)
+        )
+        expectancy = np.where(n_trades > 0, pnl.sum(axis=1) / n_trades, 0.0)
+
+    exposure = in_market.mean(axis=1) if n_bars else np.zeros(n_rows)
+    metrics = {
+        'sharpe_ratio': sharpe_ratio,
+        'sortino_ratio': sortino_ratio,
+        'max_drawdown': max_drawdown,
+        'max_drawdown_duration': max_drawdown_duration,
+        'calmar_ratio': calmar_ratio,
+        'win_rate': win_rate,
+        'profit_factor': profit_factor,
+        'expectancy': expectancy,
+        'exposure': exposure
+    }
+    if single:
+        return {key: values[0].item() for key, values in metrics.items()}
+    return metrics
+
+def trade_list_pnl(trades: List[Dict], initial_capital: float) -> np.ndarray:
+    """
+    Cash result of every closed trade in an alternating buy/sell trade list.
+
+    A sell's result is its capital minus the capital before the buy that
+    opened it (the previous sell's capital, or initial_capital for the
+    first trade); trades are expected to carry a 'capital' entry.
+    """
+    if not trades:
+        return np.zeros(0)
+    capital = np.array([trade['capital'] for trade in trades], dtype=float)
+    capital_before = np.concatenate(([initial_capital], capital[:-1]))
+    is_exit = np.array([trade['type'] == 'sell' for trade in trades])
+    is_exit[0] = False
+    exits = np.flatnonzero(is_exit)
+    return capital[exits] - capital_before[exits - 1]
+
+def trade_list_in_market(trades: List[Dict], index: pd.Index) -> np.ndarray:
+    """
+    Whether the alternating buy/sell trade list held a position at every bar of index.
+
+    A position opened at a bar's close is held from that bar up to, but
+    not including, the bar it is closed on.
+    """
+    changes = np.zeros(len(index), dtype=int)
+    if trades:
+        bars = index.get_indexer([trade['timestamp'] for trade in trades])
+        np.add.at(changes, bars, [1 if trade['type'] == 'buy' else -1 for trade in trades])
+    return np.cumsum(changes) > 0
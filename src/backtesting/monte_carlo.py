@@ -0,0 +1,342 @@
+from typing import Dict, Optional, Sequence
+import math
+import numpy as np
+
+RESAMPLING_METHODS = ('iid', 'block', 'stationary', 'garch')
+
+def iid_indices(n_returns: int, n_paths: int, n_steps: int, rng: np.random.Generator) -> np.ndarray:
+    """Indices of an i.i.d. bootstrap, shape (n_paths, n_steps)"""
+    return rng.integers(0, n_returns, size=(n_paths, n_steps))
+
+def block_indices(n_returns: int,
+                  n_paths: int,
+                  n_steps: int,
+                  block_length: int,
+                  rng: np.random.Generator) -> np.ndarray:
+    """
+    Indices of a moving-block bootstrap, shape (n_paths, n_steps).
+
+    Each path is a concatenation of contiguous blocks of ``block_length``
+    returns starting at uniformly drawn offsets, so dependence within a
+    block (e.g. volatility clustering) is preserved.
+    """
+    block_length = max(1, min(block_length, n_returns))
+    n_blocks = -(-n_steps // block_length)
+    starts = rng.integers(0, n_returns - block_length + 1, size=(n_paths, n_blocks, 1))
+    indices = (starts + np.arange(block_length)).reshape(n_paths, n_blocks * block_length)
+    return indices[:, :n_steps]
+
+def stationary_indices(n_returns: int,
+                       n_paths: int,
+                       n_steps: int,
+                       mean_block_length: float,
+                       rng: np.random.Generator) -> np.ndarray:
+    """
+    Indices of a stationary bootstrap (Politis & Romano), shape (n_paths, n_steps).
+
+    Blocks have geometrically distributed lengths with the given mean and
+    wrap around the end of the sample, so resampled series stay stationary.
+    """
+    positions = np.arange(n_steps)
+    new_block = rng.random((n_paths, n_steps)) < 1.0 / max(mean_block_length, 1.0)
+    new_block[:, 0] = True
+    starts = rng.integers(0, n_returns, size=(n_paths, n_steps))
+    # Every step continues the block opened at the latest new-block position
+    block_start = np.maximum.accumulate(np.where(new_block, positions, 0), axis=1)
+    return (np.take_along_axis(starts, block_start, axis=1) + (positions - block_start)) % n_returns
+
+def fit_garch(returns: np.ndarray, n_alpha: int = 30, n_beta: int = 50) -> Dict[str, float]:
+    """
+    Fit a GARCH(1,1) model with variance targeting.
+
+    omega is tied to the sample variance, and (alpha, beta) are chosen by
+    Gaussian likelihood over a grid, evaluated for all grid points in one
+    pass over the returns.
+
+    Args:
+        returns: Historical returns without NaNs
+        n_alpha: Grid size for alpha
+        n_beta: Grid size for beta
+
+    Returns:
+        Dictionary with 'mu', 'omega', 'alpha' and 'beta'
+    """
+    mu = returns.mean()
+    shocks = returns - mu
+    variance = shocks.var()
+    alpha, beta = np.meshgrid(np.linspace(0.01, 0.3, n_alpha), np.linspace(0.5, 0.99, n_beta))
+    valid = alpha + beta < 0.999
+    alpha, beta = alpha[valid], beta[valid]
+    omega = variance * (1 - alpha - beta)
+
+    h = np.full(len(alpha), variance)
+    log_likelihood = np.zeros(len(alpha))
+    for shock in shocks:
+        log_likelihood -= np.log(h) + shock ** 2 / h
+        h = omega + alpha * shock ** 2 + beta * h
+
+    best = np.argmax(log_likelihood)
+    return {'mu': mu, 'omega': omega[best], 'alpha': alpha[best], 'beta': beta[best]}
+
+def garch_residuals(returns: np.ndarray, params: Dict[str, float]) -> np.ndarray:
+    """Standardized residuals of returns under fitted GARCH(1,1) parameters"""
+    shocks = returns - params['mu']
+    h = np.empty(len(shocks))
+    h[0] = params['omega'] / max(1 - params['alpha'] - params['beta'], 1e-12)
+    for t in range(1, len(shocks)):
+        h[t] = params['omega'] + params['alpha'] * shocks[t - 1] ** 2 + params['beta'] * h[t - 1]
+    return shocks / np.sqrt(h)
+
+class ReturnSampler:
+    """
+    Generates synthetic return paths from historical returns.
+
+    Methods:
+        'iid': bootstrap single returns with replacement
+        'block': moving-block bootstrap with fixed block length
+        'stationary': stationary bootstrap with geometric block lengths
+        'garch': GARCH(1,1) paths driven by bootstrapped standardized
+                 residuals (filtered historical simulation)
+
+    Samplers hold no random state; every call draws from the generator it is
+    given, so paths are reproducible per seed however they are split up.
+    """
+
+    def __init__(self,
+                 returns: np.ndarray,
+                 method: str = 'iid',
+                 block_length: Optional[float] = None,
+                 garch_params: Optional[Dict[str, float]] = None):
+        """
+        Initialize the sampler.
+
+        Args:
+            returns: Historical simple returns (NaNs are dropped)
+            method: One of RESAMPLING_METHODS
+            block_length: Block length ('block') or mean block length
+                          ('stationary'); defaults to n ** (1/3)
+            garch_params: Parameters for 'garch' (fitted when omitted)
+        """
+        if method not in RESAMPLING_METHODS:
+            raise ValueError(f"Unknown resampling method: {method}")
+        returns = np.asarray(returns, dtype=float)
+        self.returns = returns[~np.isnan(returns)]
+        if len(self.returns) == 0:
+            raise ValueError("No returns to resample")
+        self.method = method
+        self.block_length = block_length or max(1, round(len(self.returns) ** (1 / 3)))
+
+        if method == 'garch':
+            self.garch_params = garch_params or fit_garch(self.returns)
+            self.residuals = garch_residuals(self.returns, self.garch_params)
+
+    def sample(self, n_paths: int, n_steps: int, rng: np.random.Generator) -> np.ndarray:
+        """Draw returns of shape (n_paths, n_steps)"""
+        n = len(self.returns)
+        if self.method == 'block':
+            return self.returns[block_indices(n, n_paths, n_steps, int(self.block_length), rng)]
+        if self.method == 'stationary':
+            return self.returns[stationary_indices(n, n_paths, n_steps, self.block_length, rng)]
+        if self.method == 'garch':
+            return self._garch_paths(n_paths, n_steps, rng)
+        return self.returns[iid_indices(n, n_paths, n_steps, rng)]
+
+    def _garch_paths(self, n_paths: int, n_steps: int, rng: np.random.Generator) -> np.ndarray:
+        params = self.garch_params
+        z = self.residuals[iid_indices(len(self.residuals), n_paths, n_steps, rng)]
+        returns = np.empty((n_paths, n_steps))
+        # Recursion runs over bars, vectorized across paths
+        h = np.full(n_paths, params['omega'] / max(1 - params['alpha'] - params['beta'], 1e-12))
+        for t in range(n_steps):
+            shock = np.sqrt(h) * z[:, t]
+            returns[:, t] = params['mu'] + shock
+            h = params['omega'] + params['alpha'] * shock ** 2 + params['beta'] * h
+        return returns
+
+    def paths(self, initial_price: float, n_paths: int, n_bars: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Draw close price paths as one 2-D array.
+
+        Args:
+            initial_price: Close of the first bar, shared by every path
+            n_paths: Number of paths
+            n_bars: Bars per path, including the first one
+            rng: Random generator to draw from
+
+        Returns:
+            Close prices of shape (n_paths, n_bars)
+        """
+        close = np.empty((n_paths, n_bars))
+        close[:, 0] = initial_price
+        if n_bars > 1:
+            close[:, 1:] = initial_price * np.cumprod(1 + self.sample(n_paths, n_bars - 1, rng), axis=1)
+        return close
+
+def simulate_ohlcv(close: np.ndarray, volume: np.ndarray, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """
+    Build noisy OHLCV arrays around simulated closes.
+
+    Args:
+        close: Close prices of shape (n_paths, n_bars)
+        volume: Historical volume per bar, shape (n_bars,)
+        rng: Random generator to draw from
+
+    Returns:
+        Dictionary of 'open', 'high', 'low', 'close' and 'volume' arrays of shape (n_paths, n_bars)
+    """
+    shape = close.shape
+    return {
+        'open': close * (1 + rng.normal(0, 0.001, shape)),
+        'high': close * (1 + np.abs(rng.normal(0, 0.002, shape))),
+        'low': close * (1 - np.abs(rng.normal(0, 0.002, shape))),
+        'close': close,
+        'volume': np.asarray(volume, dtype=float) * (1 + rng.normal(0, 0.1, shape))
+    }
+
+class EquityBands:
+    """
+    Streaming percentile bands of equity curves.
+
+    Keeps a fixed log-equity histogram at up to ``max_points`` evenly spaced
+    bars instead of every curve, so memory does not grow with the number of
+    paths. Histograms from separate chunks (or processes) can be merged.
+    Percentiles are interpolated within bins; with the defaults a bin spans
+    about 0.5% of equity.
+    """
+
+    def __init__(self,
+                 n_bars: int,
+                 initial_capital: float,
+                 max_points: int = 200,
+                 n_bins: int = 2000,
+                 log_range: float = math.log(100)):
+        """
+        Initialize empty bands.
+
+        Args:
+            n_bars: Bars per equity curve
+            initial_capital: Reference equity (bins are centred on it)
+            max_points: Maximum number of bars to track
+            n_bins: Histogram bins per tracked bar
+            log_range: Bins cover initial_capital * exp(+-log_range); values
+                       outside fall into under/overflow bins
+        """
+        self.initial_capital = initial_capital
+        self.bars = np.unique(np.linspace(0, n_bars - 1, min(n_bars, max_points)).round().astype(int))
+        self.edges = np.linspace(-log_range, log_range, n_bins + 1)
+        # Bin 0 is underflow and bin n_bins + 1 overflow
+        self.counts = np.zeros((len(self.bars), n_bins + 2), dtype=np.int64)
+
+    @property
+    def n_paths(self) -> int:
+        return int(self.counts[0].sum()) if len(self.bars) else 0
+
+    def update(self, equity: np.ndarray):
+        """Add equity curves of shape (n_paths, n_bars)"""
+        sampled = np.asarray(equity, dtype=float)[:, self.bars]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_equity = np.log(np.maximum(sampled, 0) / self.initial_capital)
+        bins = np.searchsorted(self.edges, log_equity, side='right')
+        n_cells = self.counts.shape[1]
+        flat = (bins + np.arange(len(self.bars)) * n_cells).ravel()
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+
+    def merge(self, other: 'EquityBands'):
+        """Add the counts of bands built with the same settings"""
+        if not (np.array_equal(self.bars, other.bars) and np.array_equal(self.edges, other.edges)):
+            raise ValueError("Cannot merge equity bands with different bars or bins")
+        self.counts += other.counts
+
+    def percentiles(self, qs: Sequence[float]) -> np.ndarray:
+        """
+        Interpolated equity percentiles at each tracked bar.
+
+        Args:
+            qs: Percentiles in [0, 100]
+
+        Returns:
+            Array of shape (len(qs), len(bars))
+        """
+        cumulative = np.cumsum(self.counts, axis=1)
+        total = cumulative[:, -1]
+        rows = np.arange(len(self.bars))
+        n_bins = len(self.edges) - 1
+        bands = np.empty((len(qs), len(self.bars)))
+
+        for k, q in enumerate(qs):
+            rank = np.maximum(q / 100 * total, np.finfo(float).tiny)
+            # First bin whose cumulative count reaches the rank
+            b = np.minimum((cumulative < rank[:, None]).sum(axis=1), n_bins + 1)
+            in_bin = self.counts[rows, b]
+            fraction = (rank - (cumulative[rows, b] - in_bin)) / np.maximum(in_bin, 1)
+            lower = self.edges[np.clip(b - 1, 0, n_bins)]
+            upper = self.edges[np.clip(b, 0, n_bins)]
+            bands[k] = self.initial_capital * np.exp(lower + fraction * (upper - lower))
+
+        return bands
+
+class SimulationStats:
+    """
+    Mergeable running statistics of simulated backtests.
+
+    Final equity mean and variance are combined with Chan's parallel update,
+    so chunk results can be merged instead of kept. Merging chunks in a
+    fixed order gives bit-identical totals however the chunks were computed.
+    """
+
+    METRICS = ('sharpe_ratio', 'max_drawdown', 'win_rate')
+
+    def __init__(self, initial_capital: float):
+        self.initial_capital = initial_capital
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.losses = 0
+        self.metric_sums = {key: 0.0 for key in self.METRICS}
+
+    def update(self, results: Dict[str, np.ndarray]):
+        """Add per-path results ('final_capital' and METRICS arrays) of one chunk"""
+        final_capital = np.asarray(results['final_capital'], dtype=float)
+        if len(final_capital) == 0:
+            return
+        chunk = SimulationStats(self.initial_capital)
+        chunk.count = len(final_capital)
+        chunk.mean = final_capital.mean()
+        chunk.m2 = ((final_capital - chunk.mean) ** 2).sum()
+        chunk.min = final_capital.min()
+        chunk.max = final_capital.max()
+        chunk.losses = int((final_capital < self.initial_capital).sum())
+        chunk.metric_sums = {key: float(np.sum(results[key])) for key in self.METRICS}
+        self.merge(chunk)
+
+    def merge(self, other: 'SimulationStats'):
+        """Add the statistics of another set of paths"""
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.losses += other.losses
+        for key in self.METRICS:
+            self.metric_sums[key] += other.metric_sums[key]
+
+    def summary(self) -> Dict[str, float]:
+        """Statistics in the format reported by MonteCarloSimulator"""
+        if self.count == 0:
+            raise ValueError("No simulations recorded")
+        return {
+            'mean_final_equity': self.mean,
+            'std_final_equity': np.sqrt(self.m2 / self.count),
+            'min_final_equity': self.min,
+            'max_final_equity': self.max,
+            'probability_of_loss': self.losses / self.count,
+            'mean_sharpe_ratio': self.metric_sums['sharpe_ratio'] / self.count,
+            'mean_max_drawdown': self.metric_sums['max_drawdown'] / self.count,
+            'mean_win_rate': self.metric_sums['win_rate'] / self.count
+        }
@@ -1,15 +1,28 @@
-from typing import Dict, List, Optional, Union, Any, Callable
+from typing import Dict, List, Optional, Sequence, Union, Any, Callable
 import pandas as pd
 import numpy as np
+import matplotlib.pyplot as plt
 from datetime import datetime
+import copy
+import heapq
+import inspect
 import itertools
-from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from ..strategies.base_strategy import BaseStrategy
 from .backtest_engine import BacktestEngine
+from .metrics import performance_metrics, trade_list_pnl, trade_list_in_market
+from ..data.historical_data_manager import HistoricalDataManager
+from .monte_carlo import EquityBands, ReturnSampler, SimulationStats, simulate_ohlcv
+from .shared_data import SharedFrame
 
 class StrategyOptimizer:
     """
-    Optimizes strategy parameters using grid search or genetic algorithms.
+    Optimizes strategy parameters using grid search, walk-forward analysis,
+    successive halving or genetic algorithms.
     """
     
     def __init__(self, 
@@ -27,6 +40,8 @@ class StrategyOptimizer:
         self.best_params = None
         self.best_score = float('-inf')
         self.results = []
+        self.top_results = []  # Kept by grid_search_streaming
+        self.summaries = []
     
     def grid_search(self,
                    strategy_class: type,
@@ -39,6 +54,10 @@ class StrategyOptimizer:
         """
         Perform grid search optimization.
         
+        The price data is loaded and preprocessed once, then published to the
+        worker processes through shared memory; each task only carries its
+        parameter dictionary.
+        
         Args:
             strategy_class: Strategy class to optimize
             param_grid: Dictionary of parameters and their possible values
@@ -46,7 +65,7 @@ class StrategyOptimizer:
             start_date: Start date
             end_date: End date
             timeframe: Data timeframe
-            n_jobs: Number of parallel jobs (-1 for all cores)
+            n_jobs: Number of parallel jobs (-1 for all cores, 1 to run in-process)
             
         Returns:
             Dictionary containing optimization results
@@ -56,46 +75,578 @@ class StrategyOptimizer:
         param_values = list(param_grid.values())
         param_combinations = list(itertools.product(*param_values))
         
-        # Run optimization in parallel
-        with ProcessPoolExecutor(max_workers=n_jobs if n_jobs > 0 else None) as executor:
-            futures = []
+        # Load and preprocess the data once for every evaluation
+        data = self._load_data(symbol, start_date, end_date, timeframe)
+        
+        if n_jobs == 1:
             for params in param_combinations:
-                param_dict = dict(zip(param_names, params))
-                futures.append(
-                    executor.submit(
-                        self._evaluate_params,
-                        strategy_class,
-                        param_dict,
-                        symbol,
-                        start_date,
-                        end_date,
-                        timeframe
+                result = self._evaluate_params(
+                    strategy_class, dict(zip(param_names, params)), symbol, start_date, end_date, timeframe, data
+                )
+                self._record_result(result)
+        else:
+            # Run optimization in parallel
+            with self._worker_pool(data, n_jobs) as executor:
+                futures = []
+                for params in param_combinations:
+                    param_dict = dict(zip(param_names, params))
+                    futures.append(
+                        executor.submit(
+                            _evaluate_in_worker,
+                            strategy_class,
+                            param_dict,
+                            symbol,
+                            start_date,
+                            end_date,
+                            timeframe
+                        )
                     )
+                
+                # Collect results
+                for future in futures:
+                    self._record_result(future.result())
+        
+        return {
+            'best_params': self.best_params,
+            'best_score': self.best_score,
+            'all_results': self.results
+        }
+    
+    def grid_search_streaming(self,
+                              strategy_class: type,
+                              param_grid: Dict[str, List[Any]],
+                              symbol: str,
+                              start_date: Union[str, datetime],
+                              end_date: Union[str, datetime],
+                              timeframe: str = '1d',
+                              n_jobs: int = -1,
+                              top_k: int = 10,
+                              max_evaluations: Optional[int] = None,
+                              time_budget: Optional[float] = None,
+                              progress_callback: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Grid search in bounded memory, for grids too large to hold in full.
+        
+        Combinations are generated lazily and only a small window of tasks is
+        in flight at a time. Results are consumed as they complete; only the
+        top_k full results are kept, plus a compact (params, score) summary
+        of every evaluation. The search stops early once max_evaluations
+        combinations have been evaluated or time_budget seconds have passed.
+        
+        Args:
+            strategy_class: Strategy class to optimize
+            param_grid: Dictionary of parameters and their possible values
+            symbol: Trading symbol
+            start_date: Start date
+            end_date: End date
+            timeframe: Data timeframe
+            n_jobs: Number of parallel jobs (-1 for all cores, 1 to run in-process)
+            top_k: Number of full results to keep
+            max_evaluations: Stop after this many evaluations
+            time_budget: Stop submitting new evaluations after this many seconds
+            progress_callback: Called after every evaluation with a progress dictionary
+                               ('evaluated', 'total', 'elapsed', 'best_score', 'best_params')
+            
+        Returns:
+            Dictionary containing optimization results
+        """
+        param_names = list(param_grid.keys())
+        total = math.prod(len(values) for values in param_grid.values())
+        combinations = (dict(zip(param_names, params)) for params in itertools.product(*param_grid.values()))
+        if max_evaluations is not None:
+            combinations = itertools.islice(combinations, max_evaluations)
+            
+        data = self._load_data(symbol, start_date, end_date, timeframe)
+        start_time = time.monotonic()
+        top = []  # Min-heap of (score, sequence, result)
+        summaries = []
+        
+        def out_of_time():
+            return time_budget is not None and time.monotonic() - start_time >= time_budget
+            
+        def consume(result):
+            score = _sortable_score(result['score'])
+            summaries.append({'params': result['params'], 'score': result['score']})
+            entry = (score, len(summaries), result)
+            if len(top) < top_k:
+                heapq.heappush(top, entry)
+            elif top_k > 0 and score > top[0][0]:
+                heapq.heapreplace(top, entry)
+            if score > _sortable_score(self.best_score):
+                self.best_score = result['score']
+                self.best_params = result['params']
+            if progress_callback is not None:
+                progress_callback({
+                    'evaluated': len(summaries),
+                    'total': total,
+                    'elapsed': time.monotonic() - start_time,
+                    'best_score': self.best_score,
+                    'best_params': self.best_params
+                })
+                
+        if n_jobs == 1:
+            for params in combinations:
+                if out_of_time():
+                    break
+                consume(self._evaluate_params(
+                    strategy_class, params, symbol, start_date, end_date, timeframe, data
+                ))
+        else:
+            workers = n_jobs if n_jobs > 0 else (os.cpu_count() or 1)
+            with self._worker_pool(data, n_jobs) as executor:
+                pending = set()
+                exhausted = False
+                while True:
+                    # Keep a small window of tasks in flight
+                    while not exhausted and len(pending) < 2 * workers and not out_of_time():
+                        params = next(combinations, None)
+                        if params is None:
+                            exhausted = True
+                            break
+                        pending.add(executor.submit(
+                            _evaluate_in_worker, strategy_class, params, symbol, start_date, end_date, timeframe
+                        ))
+                    if not pending:
+                        break
+                    if out_of_time():
+                        # Drop queued tasks; tasks already running still finish
+                        pending = {future for future in pending if not future.cancel()}
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        consume(future.result())
+                        
+        top_results = [result for _, _, result in sorted(top, key=lambda entry: (-entry[0], entry[1]))]
+        self.top_results = top_results
+        self.summaries = summaries
+        
+        return {
+            'best_params': self.best_params,
+            'best_score': self.best_score,
+            'top_results': top_results,
+            'summaries': summaries,
+            'evaluated': len(summaries),
+            'total': total,
+            'stopped_early': len(summaries) < total,
+            'elapsed': time.monotonic() - start_time
+        }
+    
+    def grid_search_batch(self,
+                          strategy_class: type,
+                          param_grid: Dict[str, List[Any]],
+                          symbol: str,
+                          start_date: Union[str, datetime],
+                          end_date: Union[str, datetime],
+                          timeframe: str = '1d',
+                          batch_size: int = 256) -> Dict:
+        """
+        Grid search that backtests many parameter sets in one vectorized pass.
+        
+        For strategies implementing generate_param_signal_matrix: indicators
+        shared between grid points are computed once per batch, and each
+        batch of parameter sets is backtested as the rows of one 2-D action
+        matrix. Only metrics are produced (no trade lists); use grid_search
+        to inspect individual backtests.
+        
+        Args:
+            strategy_class: Strategy class to optimize
+            param_grid: Dictionary of parameters and their possible values
+            symbol: Trading symbol
+            start_date: Start date
+            end_date: End date
+            timeframe: Data timeframe
+            batch_size: Parameter sets per pass (bounds memory at batch_size x bars)
+            
+        Returns:
+            Dictionary with 'best_params', 'best_score' and one summary per
+            grid point ('params', 'score', 'final_capital', 'metrics')
+        """
+        param_names = list(param_grid.keys())
+        param_combinations = [dict(zip(param_names, params)) for params in itertools.product(*param_grid.values())]
+        if not param_combinations:
+            raise ValueError("Empty parameter grid")
+        strategy = build_strategy(strategy_class, param_combinations[0])
+        if not strategy.supports_param_batch:
+            raise ValueError(f"{strategy.name} does not support batched parameter evaluation")
+        
+        data = self._load_data(symbol, start_date, end_date, timeframe)
+        summaries = []
+        for start in range(0, len(param_combinations), batch_size):
+            param_sets = param_combinations[start:start + batch_size]
+            batch = self.backtest_engine.run_param_batch(strategy, data, param_sets, symbol=symbol)
+            metric_names = [key for key in batch if key not in ('equity', 'final_capital', 'n_trades')]
+            for k, params in enumerate(param_sets):
+                metrics = {key: batch[key][k].item() for key in metric_names}
+                summaries.append({
+                    'params': params,
+                    'score': metrics[self.objective_function],
+                    'final_capital': batch['final_capital'][k].item(),
+                    'metrics': metrics
+                })
+        
+        best = max(summaries, key=lambda summary: _sortable_score(summary['score']))
+        self.best_params = best['params']
+        self.best_score = best['score']
+        self.summaries = summaries
+        return {
+            'best_params': self.best_params,
+            'best_score': self.best_score,
+            'summaries': summaries
+        }
+    
+    def walk_forward(self,
+                     strategy_class: type,
+                     param_grid: Dict[str, List[Any]],
+                     symbol: str,
+                     start_date: Union[str, datetime],
+                     end_date: Union[str, datetime],
+                     timeframe: str = '1d',
+                     n_folds: int = 5,
+                     train_bars: Optional[int] = None,
+                     test_bars: Optional[int] = None,
+                     anchored: bool = False,
+                     n_jobs: int = -1) -> Dict:
+        """
+        Walk-forward optimization.
+        
+        Each fold grid-searches a train window and evaluates the best
+        parameters on the test window that follows it. The test backtest
+        runs over the train window too, so indicators are warmed up when the
+        test window starts, but only the test bars are scored. Test windows are
+        consecutive, so their equity curves are stitched (compounding) into
+        one out-of-sample curve. The data is loaded once for the full span
+        and folds work on row slices of it; with n_jobs != 1 the train
+        evaluations of all folds share one process pool, so the folds run
+        in parallel rather than one after another.
+        
+        Args:
+            strategy_class: Strategy class to optimize
+            param_grid: Dictionary of parameters and their possible values
+            symbol: Trading symbol
+            start_date: Start date of the full span
+            end_date: End date of the full span
+            timeframe: Data timeframe
+            n_folds: Number of train/test folds
+            train_bars: Bars per train window (default: what is left before the first test window)
+            test_bars: Bars per test window (default: an equal share of n_folds + 1 segments)
+            anchored: Grow every train window from the first bar instead of rolling it
+            n_jobs: Number of parallel jobs (-1 for all cores, 1 to run in-process)
+            
+        Returns:
+            Dictionary with per-fold results ('folds'), the stitched
+            out-of-sample equity curve ('oos_equity_curve'), its total return
+            ('oos_return') and the mean test score ('mean_test_score')
+        """
+        param_names = list(param_grid.keys())
+        param_combinations = [dict(zip(param_names, params)) for params in itertools.product(*param_grid.values())]
+        
+        data = self._load_data(symbol, start_date, end_date, timeframe)
+        folds = walk_forward_folds(len(data), n_folds, train_bars, test_bars, anchored)
+        
+        with self._executor(data, n_jobs) as executor:
+            train_scores = self._evaluate_many(
+                executor, strategy_class, [(params, train) for train, _ in folds for params in param_combinations],
+                symbol, timeframe, data
+            )
+            best = self._best_per_fold(train_scores, len(param_combinations))
+            test_results = self._evaluate_many(
+                executor, strategy_class, [(result['params'], test) for result, (_, test) in zip(best, folds)],
+                symbol, timeframe, data, keep_results=True,
+                warmups=[train.stop - train.start for train, _ in folds]
+            )
+        
+        fold_results = []
+        segments = []
+        capital = self.backtest_engine.initial_capital
+        for k, ((train, test), train_best, test_result) in enumerate(zip(folds, best, test_results)):
+            fold_results.append({
+                'fold': k,
+                'train_start': data.index[train.start],
+                'train_end': data.index[train.stop - 1],
+                'test_start': data.index[test.start],
+                'test_end': data.index[test.stop - 1],
+                'best_params': train_best['params'],
+                'train_score': train_best['score'],
+                'test_score': test_result['score'],
+                'test_results': test_result['results']
+            })
+            # Each test fold starts from initial capital; rescale to chain them
+            equity = np.asarray(test_result['results']['equity_curve'], dtype=float)
+            segments.append(pd.Series(equity * (capital / self.backtest_engine.initial_capital), index=data.index[test]))
+            capital = segments[-1].iloc[-1]
+        
+        test_scores = [fold['test_score'] for fold in fold_results]
+        return {
+            'folds': fold_results,
+            'oos_equity_curve': pd.concat(segments),
+            'oos_return': capital / self.backtest_engine.initial_capital - 1,
+            'mean_test_score': float(np.mean(test_scores)) if test_scores else float('nan')
+        }
+    
+    def successive_halving(self,
+                           strategy_class: type,
+                           param_grid: Dict[str, List[Any]],
+                           symbol: str,
+                           start_date: Union[str, datetime],
+                           end_date: Union[str, datetime],
+                           timeframe: str = '1d',
+                           n_candidates: Optional[int] = None,
+                           eta: int = 3,
+                           min_bars: int = 200,
+                           random_seed: Optional[int] = None,
+                           n_jobs: int = -1) -> Dict:
+        """
+        Successive halving over growing data prefixes.
+        
+        A random sample of n_candidates grid points is first backtested on a
+        short prefix of the data; only the best survive each round, and the
+        prefix grows by eta until the last few candidates are scored on the
+        full span. With the default sample of 1/eta of the grid, about
+        1/(eta - 1) as many backtests run as a grid search would, and since
+        most of them only see a small fraction of the bars, the bar-weighted
+        cost (returned as 'cost') drops much further.
+        
+        Args:
+            strategy_class: Strategy class to optimize
+            param_grid: Dictionary of parameters and their possible values
+            symbol: Trading symbol
+            start_date: Start date
+            end_date: End date
+            timeframe: Data timeframe
+            n_candidates: Number of grid points to sample (default: 1/eta of
+                          the grid; the grid size searches all of it)
+            eta: Reduction factor per round
+            min_bars: Shortest prefix to score candidates on (should cover the
+                      strategy's longest indicator warm-up)
+            random_seed: Seed for sampling candidates
+            n_jobs: Number of parallel jobs (-1 for all cores, 1 to run in-process)
+            
+        Returns:
+            Dictionary with 'best_params', 'best_score', per-round summaries
+            ('rounds'), the number of backtests run ('evaluations') and their
+            cost in full-span backtests ('cost')
+        """
+        if eta < 2:
+            raise ValueError("eta must be at least 2")
+        if n_candidates is None:
+            n_candidates = math.ceil(math.prod(len(values) for values in param_grid.values()) / eta)
+        candidates = _sample_grid(param_grid, n_candidates, np.random.default_rng(random_seed))
+        data = self._load_data(symbol, start_date, end_date, timeframe)
+        n_bars = len(data)
+        
+        # As many rounds as halving needs, limited by how often the prefix can shrink by eta
+        n_rounds = 1
+        while eta ** n_rounds < len(candidates) and n_bars // eta ** n_rounds >= min_bars:
+            n_rounds += 1
+        # Cut harder when fewer rounds fit, so about eta candidates reach the full span
+        cut = max(eta, (len(candidates) / eta) ** (1 / (n_rounds - 1))) if n_rounds > 1 else 1
+        
+        rounds = []
+        with self._executor(data, n_jobs) as executor:
+            for k in range(n_rounds):
+                bars = n_bars // eta ** (n_rounds - 1 - k)
+                results = self._evaluate_many(
+                    executor, strategy_class, [(params, slice(0, bars)) for params in candidates],
+                    symbol, timeframe, data
                 )
+                rounds.append({'bars': bars, 'results': results})
+                # Stable sort keeps grid order among equal scores
+                ranked = sorted(results, key=lambda result: -_sortable_score(result['score']))
+                candidates = [result['params'] for result in ranked[:max(1, math.ceil(len(ranked) / cut))]]
+        
+        best = ranked[0]
+        self.best_params = best['params']
+        self.best_score = best['score']
+        self.summaries = [result for round_ in rounds for result in round_['results']]
+        return {
+            'best_params': self.best_params,
+            'best_score': self.best_score,
+            'rounds': rounds,
+            'evaluations': len(self.summaries),
+            'cost': sum(round_['bars'] * len(round_['results']) for round_ in rounds) / n_bars
+        }
+    
+    def evolutionary_search(self,
+                            strategy_class: type,
+                            param_grid: Dict[str, List[Any]],
+                            symbol: str,
+                            start_date: Union[str, datetime],
+                            end_date: Union[str, datetime],
+                            timeframe: str = '1d',
+                            population_size: int = 12,
+                            generations: int = 10,
+                            max_evaluations: Optional[int] = None,
+                            mutation_rate: float = 0.2,
+                            n_elite: int = 2,
+                            random_seed: Optional[int] = None,
+                            n_jobs: int = -1) -> Dict:
+        """
+        Genetic algorithm over the parameter grid.
+        
+        Individuals are grid points. Each generation keeps the n_elite best
+        individuals and breeds the rest by tournament selection, uniform
+        crossover and mutation to a neighbouring grid value. Scores are
+        memoized, so revisiting a grid point costs no backtest; the search
+        stops after the given generations or max_evaluations backtests.
+        
+        Args:
+            strategy_class: Strategy class to optimize
+            param_grid: Dictionary of parameters and their possible values
+            symbol: Trading symbol
+            start_date: Start date
+            end_date: End date
+            timeframe: Data timeframe
+            population_size: Individuals per generation
+            generations: Maximum number of generations
+            max_evaluations: Maximum number of backtests
+            mutation_rate: Probability of mutating each parameter of a child
+            n_elite: Best individuals copied unchanged to the next generation
+            random_seed: Seed for the search
+            n_jobs: Number of parallel jobs (-1 for all cores, 1 to run in-process)
             
-            # Collect results
-            for future in futures:
-                result = future.result()
-                self.results.append(result)
+        Returns:
+            Dictionary with 'best_params', 'best_score', the number of
+            backtests run ('evaluations') and every evaluation ('summaries')
+        """
+        rng = np.random.default_rng(random_seed)
+        names = list(param_grid.keys())
+        sizes = np.array([len(values) for values in param_grid.values()])
+        total = int(np.prod(sizes))
+        budget = total if max_evaluations is None else min(max_evaluations, total)
+        if budget < 1:
+            raise ValueError("evolutionary_search needs at least one evaluation")
+        data = self._load_data(symbol, start_date, end_date, timeframe)
+        window = slice(0, len(data))
+        
+        def to_params(genome):
+            return {name: param_grid[name][i] for name, i in zip(names, genome)}
+        
+        scores = {}  # genome -> sortable score
+        summaries = []
+        population = [tuple(int(i) for i in _grid_indices(sizes, point))
+                      for point in rng.choice(total, size=min(population_size, total), replace=False)]
+        
+        with self._executor(data, n_jobs) as executor:
+            for _ in range(generations):
+                new = list(dict.fromkeys(genome for genome in population if genome not in scores))
+                new = new[:budget - len(scores)]
+                for genome, result in zip(new, self._evaluate_many(
+                    executor, strategy_class, [(to_params(genome), window) for genome in new], symbol, timeframe, data
+                )):
+                    scores[genome] = _sortable_score(result['score'])
+                    summaries.append(result)
+                if len(scores) >= budget:
+                    break
                 
-                # Update best parameters
-                if result['score'] > self.best_score:
-                    self.best_score = result['score']
-                    self.best_params = result['params']
+                # Rank evaluated individuals (unevaluated ones only exist once the budget is spent)
+                ranked = sorted((g for g in set(population) if g in scores), key=lambda g: -scores[g])
+                children = ranked[:n_elite]
+                while len(children) < population_size:
+                    mother, father = (self._tournament(ranked, scores, rng) for _ in range(2))
+                    child = np.where(rng.random(len(sizes)) < 0.5, mother, father)
+                    mutate = rng.random(len(sizes)) < mutation_rate
+                    child = np.clip(child + mutate * rng.choice([-1, 1], size=len(sizes)), 0, sizes - 1)
+                    children.append(tuple(int(i) for i in child))
+                population = children
         
+        best = max(summaries, key=lambda result: _sortable_score(result['score']))
+        self.best_params = best['params']
+        self.best_score = best['score']
+        self.summaries = summaries
         return {
             'best_params': self.best_params,
             'best_score': self.best_score,
-            'all_results': self.results
+            'evaluations': len(summaries),
+            'summaries': summaries
         }
     
+    @staticmethod
+    def _tournament(ranked: List[tuple], scores: Dict[tuple, float], rng: np.random.Generator, size: int = 3) -> tuple:
+        """Best of a few randomly drawn individuals"""
+        entrants = rng.choice(len(ranked), size=min(size, len(ranked)), replace=False)
+        return max((ranked[i] for i in entrants), key=lambda genome: scores[genome])
+    
+    @contextmanager
+    def _executor(self, data: pd.DataFrame, n_jobs: int):
+        """Shared-memory worker pool, or None to evaluate in-process when n_jobs is 1"""
+        if n_jobs == 1:
+            yield None
+        else:
+            with self._worker_pool(data, n_jobs) as executor:
+                yield executor
+    
+    def _evaluate_many(self,
+                       executor: Optional[ProcessPoolExecutor],
+                       strategy_class: type,
+                       tasks: List[tuple],
+                       symbol: str,
+                       timeframe: str,
+                       data: pd.DataFrame,
+                       keep_results: bool = False,
+                       warmups: Optional[List[int]] = None) -> List[Dict]:
+        """
+        Evaluate (params, window) tasks on row slices of the data, returning results in task order.
+        
+        warmups optionally gives, per task, how many bars before the window
+        the backtest starts at to warm up indicators (see _evaluate_window).
+        """
+        warmups = warmups or [0] * len(tasks)
+        if executor is None:
+            return [
+                _evaluate_window(self.backtest_engine, self.objective_function, strategy_class,
+                                 params, symbol, timeframe, data, window, keep_results, warmup)
+                for (params, window), warmup in zip(tasks, warmups)
+            ]
+        futures = [
+            executor.submit(
+                _evaluate_window_in_worker, strategy_class, params, symbol, timeframe, window, keep_results, warmup
+            )
+            for (params, window), warmup in zip(tasks, warmups)
+        ]
+        return [future.result() for future in futures]
+    
+    @staticmethod
+    def _best_per_fold(scores: List[Dict], n_combinations: int) -> List[Dict]:
+        """Best-scoring evaluation of each fold (the first one on ties, as in grid_search)"""
+        best = []
+        for start in range(0, len(scores), n_combinations):
+            fold_scores = scores[start:start + n_combinations]
+            best.append(max(fold_scores, key=lambda result: _sortable_score(result['score'])))
+        return best
+    
+    def _load_data(self,
+                   symbol: str,
+                   start_date: Union[str, datetime],
+                   end_date: Union[str, datetime],
+                   timeframe: str) -> pd.DataFrame:
+        """Load and preprocess the data shared by every evaluation"""
+        data = self.backtest_engine.data_manager.load_data(symbol, start_date, end_date, timeframe)
+        return self.backtest_engine.data_manager.preprocess_data(data)
+    
+    @contextmanager
+    def _worker_pool(self, data: pd.DataFrame, n_jobs: int):
+        """Process pool whose workers attach to the data through shared memory"""
+        with SharedFrame(data) as shared_data, ProcessPoolExecutor(
+            max_workers=n_jobs if n_jobs > 0 else None,
+            initializer=_init_grid_worker,
+            initargs=(shared_data.descriptor, _worker_engine(self.backtest_engine), self.objective_function)
+        ) as executor:
+            yield executor
+    
+    def _record_result(self, result: Dict):
+        """Store an evaluation and update the best parameters"""
+        self.results.append(result)
+        if result['score'] > self.best_score:
+            self.best_score = result['score']
+            self.best_params = result['params']
+    
     def _evaluate_params(self,
                         strategy_class: type,
                         params: Dict[str, Any],
                         symbol: str,
                         start_date: Union[str, datetime],
                         end_date: Union[str, datetime],
-                        timeframe: str) -> Dict:
+                        timeframe: str,
+                        data: Optional[pd.DataFrame] = None) -> Dict:
         """
         Evaluate a set of parameters.
         
@@ -106,30 +657,279 @@ class StrategyOptimizer:
             start_date: Start date
             end_date: End date
             timeframe: Data timeframe
+            data: Optional preprocessed data to use instead of loading it
             
         Returns:
             Dictionary containing evaluation results
         """
-        # Create strategy instance with parameters
-        strategy = strategy_class(**params)
+        return _evaluate(
+            self.backtest_engine, self.objective_function,
+            strategy_class, params, symbol, start_date, end_date, timeframe, data
+        )
+
+def _worker_engine(engine: BacktestEngine) -> BacktestEngine:
+    """Copy of the engine settings without the data manager, cheap to send to workers"""
+    worker_engine = copy.copy(engine)
+    worker_engine.data_manager = None
+    worker_engine.results = {}
+    worker_engine.trades = []
+    return worker_engine
+
+def walk_forward_folds(n_bars: int,
+                       n_folds: int,
+                       train_bars: Optional[int] = None,
+                       test_bars: Optional[int] = None,
+                       anchored: bool = False) -> List[tuple]:
+    """
+    Split bar positions into walk-forward (train, test) slices.
+    
+    Test windows are consecutive and end at the last bar; each train window
+    ends where its test window starts.
+    
+    Args:
+        n_bars: Number of bars in the full span
+        n_folds: Number of folds
+        train_bars: Bars per train window (default: all bars before the first test window)
+        test_bars: Bars per test window (default: n_bars // (n_folds + 1))
+        anchored: Start every train window at bar 0
         
-        # Run backtest
-        results = self.backtest_engine.run_backtest(
+    Returns:
+        List of (train, test) slices
+    """
+    if n_folds < 1:
+        raise ValueError("n_folds must be at least 1")
+    if test_bars is None:
+        test_bars = n_bars // (n_folds + 1)
+    first_test = n_bars - n_folds * test_bars
+    if train_bars is None:
+        train_bars = first_test
+    if test_bars < 1 or train_bars < 1 or train_bars > first_test:
+        raise ValueError(
+            f"Cannot fit {n_folds} folds of {train_bars} train and {test_bars} test bars into {n_bars} bars"
+        )
+    
+    folds = []
+    for k in range(n_folds):
+        test_start = first_test + k * test_bars
+        train_start = 0 if anchored else test_start - train_bars
+        folds.append((slice(train_start, test_start), slice(test_start, test_start + test_bars)))
+    return folds
+
+def _grid_indices(sizes: np.ndarray, point: int) -> np.ndarray:
+    """Per-parameter value indices of the point-th grid combination (itertools.product order)"""
+    return np.array(np.unravel_index(point, tuple(sizes)))
+
+def _sample_grid(param_grid: Dict[str, List[Any]], n: Optional[int], rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """Distinct grid points in grid order: all of them, or a random sample of n"""
+    names = list(param_grid.keys())
+    sizes = np.array([len(values) for values in param_grid.values()])
+    total = int(np.prod(sizes))
+    points = range(total) if n is None or n >= total else np.sort(rng.choice(total, size=n, replace=False))
+    return [
+        {name: param_grid[name][i] for name, i in zip(names, _grid_indices(sizes, point))}
+        for point in points
+    ]
+
+def _sortable_score(score) -> float:
+    """Score used for ranking; missing or NaN scores rank last"""
+    if score is None or (isinstance(score, float) and math.isnan(score)):
+        return float('-inf')
+    return float(score)
+
+def build_strategy(strategy_class: type, params: Dict[str, Any]) -> BaseStrategy:
+    """
+    Instantiate a strategy with a parameter set.
+    
+    Strategies either take their parameters as keyword arguments or as a
+    single ``params`` dictionary; both conventions are supported.
+    """
+    signature = inspect.signature(strategy_class)
+    accepts_kwargs = any(p.kind == p.VAR_KEYWORD for p in signature.parameters.values())
+    if accepts_kwargs or all(name in signature.parameters for name in params):
+        return strategy_class(**params)
+    return strategy_class(params=params)
+
+def _evaluate(engine: BacktestEngine,
+              objective_function: str,
+              strategy_class: type,
+              params: Dict[str, Any],
+              symbol: str,
+              start_date: Union[str, datetime],
+              end_date: Union[str, datetime],
+              timeframe: str,
+              data: Optional[pd.DataFrame]) -> Dict:
+    # Create strategy instance with parameters
+    strategy = build_strategy(strategy_class, params)
+    
+    # Run backtest
+    results = engine.run_backtest(
+        strategy,
+        symbol,
+        start_date,
+        end_date,
+        timeframe,
+        data=data
+    )
+    
+    # Calculate score
+    score = results['metrics'][objective_function]
+    
+    return {
+        'params': params,
+        'score': score,
+        'results': results
+    }
+
+def _evaluate_window(engine: BacktestEngine,
+                     objective_function: str,
+                     strategy_class: type,
+                     params: Dict[str, Any],
+                     symbol: str,
+                     timeframe: str,
+                     data: pd.DataFrame,
+                     window: slice,
+                     keep_results: bool,
+                     warmup: int = 0) -> Dict:
+    """
+    Backtest params on a row window of the data.
+    
+    With warmup, the backtest starts that many bars earlier so indicators
+    are warmed up, and its results are cut back to the window (see
+    _window_results) before scoring.
+    """
+    warmup = min(warmup, window.start)
+    # Row slices of the frame are views, not copies
+    window_data = data.iloc[window.start - warmup:window.stop]
+    result = _evaluate(
+        engine, objective_function, strategy_class, params,
+        symbol, window_data.index[0], window_data.index[-1], timeframe, window_data
+    )
+    if warmup:
+        result['results'] = _window_results(engine, result['results'], window_data.index, warmup)
+        result['score'] = result['results']['metrics'][objective_function]
+    if not keep_results:
+        del result['results']
+    return result
+
+def _window_results(engine: BacktestEngine, results: Dict, index: pd.Index, warmup: int) -> Dict:
+    """
+    Cut backtest results down to the bars after the first warmup bars.
+    
+    Equity and trade capital are rescaled so the window starts from the
+    engine's initial capital; a position still open from the warm-up is
+    carried into the window at its value there. Metrics are recomputed over
+    the window alone, counting every trade closed in it, including a carried
+    position's, whose result is taken from its warm-up entry.
+    """
+    equity = np.asarray(results['equity_curve'], dtype=float)
+    scale = engine.initial_capital / equity[warmup - 1]
+    window_start = index[warmup]
+    trades = [
+        dict(trade, capital=trade['capital'] * scale)
+        for trade in results['trades'] if trade['timestamp'] >= window_start
+    ]
+    equity_curve = equity[warmup:] * scale
+    in_market = trade_list_in_market(results['trades'], index)[warmup:]
+    # Results of the trades closed in the window are the last ones of the full run
+    n_exits = sum(trade['type'] == 'sell' for trade in trades)
+    trade_pnl = trade_list_pnl(results['trades'], engine.initial_capital) * scale
+    trade_pnl = trade_pnl[len(trade_pnl) - n_exits:]
+    return dict(
+        results,
+        start_date=window_start,
+        final_capital=equity_curve[-1],
+        total_return=equity_curve[-1] / engine.initial_capital - 1,
+        trades=trades,
+        equity_curve=equity_curve.tolist(),
+        returns=pd.Series(equity_curve, index=index[warmup:]).pct_change().dropna(),
+        metrics=performance_metrics(equity_curve, trade_pnl, in_market)
+    )
+
+# Per-process state of grid search workers, set once by _init_grid_worker
+_worker_state = {}
+
+def _init_grid_worker(descriptor: Dict, engine: BacktestEngine, objective_function: str):
+    """Attach the shared price data once per worker process"""
+    data, shm = SharedFrame.attach(descriptor)
+    _worker_state.update({'data': data, 'shm': shm, 'engine': engine, 'objective_function': objective_function})
+
+def _evaluate_in_worker(strategy_class: type,
+                        params: Dict[str, Any],
+                        symbol: str,
+                        start_date: Union[str, datetime],
+                        end_date: Union[str, datetime],
+                        timeframe: str) -> Dict:
+    return _evaluate(
+        _worker_state['engine'], _worker_state['objective_function'],
+        strategy_class, params, symbol, start_date, end_date, timeframe, _worker_state['data']
+    )
+
+def _evaluate_window_in_worker(strategy_class: type,
+                               params: Dict[str, Any],
+                               symbol: str,
+                               timeframe: str,
+                               window: slice,
+                               keep_results: bool,
+                               warmup: int = 0) -> Dict:
+    return _evaluate_window(
+        _worker_state['engine'], _worker_state['objective_function'],
+        strategy_class, params, symbol, timeframe, _worker_state['data'], window, keep_results, warmup
+    )
+
+def _simulate_chunk(context: Dict, n_paths: int, seed: np.random.SeedSequence) -> Dict:
+    """Simulate and backtest one chunk of paths, returning mergeable summaries"""
+    rng = np.random.default_rng(seed)
+    engine = context['engine']
+    index = context['index']
+    close = context['sampler'].paths(context['initial_price'], n_paths, len(index), rng)
+    prices = simulate_ohlcv(close, context['volume'], rng)
+    batch = _run_paths(engine, context['strategy'], prices, index, *context['run_args'])
+    
+    stats = SimulationStats(engine.initial_capital)
+    stats.update(batch)
+    bands = EquityBands(len(index), engine.initial_capital)
+    bands.update(batch['equity'])
+    return {'stats': stats, 'bands': bands, 'final_equities': batch['final_capital']}
+
+def _run_paths(engine: BacktestEngine,
+               strategy: BaseStrategy,
+               prices: Dict[str, np.ndarray],
+               index: pd.Index,
+               symbol: str,
+               start_date: Union[str, datetime],
+               end_date: Union[str, datetime],
+               timeframe: str) -> Dict[str, np.ndarray]:
+    """Backtest a chunk of simulated paths, in one batch when the strategy supports it"""
+    if strategy.supports_batch:
+        return engine.run_batch(strategy, prices, symbol=symbol, index=index)
+    
+    n_paths = len(prices['close'])
+    equity = np.empty(prices['close'].shape)
+    metrics = {key: np.empty(n_paths) for key in SimulationStats.METRICS}
+    for i in range(n_paths):
+        simulated_data = pd.DataFrame({column: values[i] for column, values in prices.items()}, index=index)
+        results = engine.run_backtest(
             strategy,
             symbol,
             start_date,
             end_date,
-            timeframe
+            timeframe,
+            data=HistoricalDataManager.preprocess_data(simulated_data)
         )
-        
-        # Calculate score
-        score = results['metrics'][self.objective_function]
-        
-        return {
-            'params': params,
-            'score': score,
-            'results': results
-        }
+        equity[i] = results['equity_curve']
+        for key, values in metrics.items():
+            values[i] = results['metrics'][key]
+    
+    return dict(metrics, equity=equity, final_capital=equity[:, -1])
+
+# Per-process state of Monte Carlo workers, set once by _init_simulation_worker
+_simulation_state = {}
+
+def _init_simulation_worker(context: Dict):
+    _simulation_state.update(context)
+
+def _simulate_chunk_in_worker(n_paths: int, seed: np.random.SeedSequence) -> Dict:
+    return _simulate_chunk(_simulation_state, n_paths, seed)
 
 class MonteCarloSimulator:
     """
@@ -153,10 +953,22 @@ class MonteCarloSimulator:
                       end_date: Union[str, datetime],
                       timeframe: str = '1d',
                       n_simulations: int = 1000,
-                      random_seed: Optional[int] = None) -> Dict:
+                      random_seed: Optional[int] = None,
+                      chunk_size: int = 250,
+                      percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+                      method: str = 'iid',
+                      block_length: Optional[float] = None,
+                      n_jobs: int = 1) -> Dict:
         """
         Run Monte Carlo simulations.
         
+        Paths are resampled from the historical returns and simulated in
+        chunks of 2-D arrays, each chunk drawing from its own child of the
+        seed. Strategies that support batch evaluation are backtested on a
+        whole chunk at once; others run one backtest per path. Only summary
+        statistics, per-path final equity and percentile bands of the equity
+        curves are kept.
+        
         Args:
             strategy: Strategy instance
             symbol: Trading symbol
@@ -165,91 +977,78 @@ class MonteCarloSimulator:
             timeframe: Data timeframe
             n_simulations: Number of simulations to run
             random_seed: Random seed for reproducibility
+            chunk_size: Number of paths simulated per chunk (bounds memory)
+            percentiles: Equity percentiles to report as bands
+            method: Return resampling method - 'iid', 'block', 'stationary'
+                    or 'garch' (see ReturnSampler)
+            block_length: (Mean) block length for 'block' and 'stationary'
+            n_jobs: Number of worker processes for chunks (-1 for all cores);
+                    results are identical for any value
             
         Returns:
             Dictionary containing simulation results
         """
-        if random_seed is not None:
-            np.random.seed(random_seed)
-        
         # Load original data
         data = self.backtest_engine.data_manager.load_data(
             symbol, start_date, end_date, timeframe
         )
         data = self.backtest_engine.data_manager.preprocess_data(data)
         
-        # Store simulation results
-        equity_curves = []
-        metrics = []
-        
-        for _ in range(n_simulations):
-            # Generate random walk returns
-            random_returns = self._generate_random_returns(data['returns'])
-            
-            # Create simulated price series
-            simulated_prices = self._create_simulated_prices(data['close'].iloc[0], random_returns)
-            
-            # Create simulated data
-            simulated_data = data.copy()
-            simulated_data['close'] = simulated_prices
-            simulated_data['open'] = simulated_prices * (1 + np.random.normal(0, 0.001, len(simulated_prices)))
-            simulated_data['high'] = simulated_prices * (1 + np.abs(np.random.normal(0, 0.002, len(simulated_prices))))
-            simulated_data['low'] = simulated_prices * (1 - np.abs(np.random.normal(0, 0.002, len(simulated_prices))))
-            simulated_data['volume'] = data['volume'] * (1 + np.random.normal(0, 0.1, len(simulated_prices)))
-            
-            # Run backtest on simulated data
-            results = self.backtest_engine.run_backtest(
-                strategy,
-                symbol,
-                start_date,
-                end_date,
-                timeframe,
-                data=simulated_data
-            )
-            
-            equity_curves.append(results['equity_curve'])
-            metrics.append(results['metrics'])
-        
-        # Calculate statistics
-        equity_curves = np.array(equity_curves)
-        final_equities = equity_curves[:, -1]
-        
-        stats = {
-            'mean_final_equity': np.mean(final_equities),
-            'std_final_equity': np.std(final_equities),
-            'min_final_equity': np.min(final_equities),
-            'max_final_equity': np.max(final_equities),
-            'probability_of_loss': np.mean(final_equities < self.backtest_engine.initial_capital),
-            'mean_sharpe_ratio': np.mean([m['sharpe_ratio'] for m in metrics]),
-            'mean_max_drawdown': np.mean([m['max_drawdown'] for m in metrics]),
-            'mean_win_rate': np.mean([m['win_rate'] for m in metrics])
+        initial_capital = self.backtest_engine.initial_capital
+        context = {
+            'engine': _worker_engine(self.backtest_engine),
+            'strategy': strategy,
+            'sampler': ReturnSampler(data['returns'].to_numpy(dtype=float), method, block_length),
+            'initial_price': data['close'].iloc[0],
+            'volume': data['volume'].to_numpy(dtype=float),
+            'index': data.index,
+            'run_args': (symbol, start_date, end_date, timeframe)
         }
         
+        starts = range(0, n_simulations, chunk_size)
+        chunks = [(min(chunk_size, n_simulations - start), seed) for start, seed in
+                  zip(starts, np.random.SeedSequence(random_seed).spawn(len(starts)))]
+        
+        stats = SimulationStats(initial_capital)
+        bands = EquityBands(len(data), initial_capital)
+        final_equities = []
+        # Chunks are merged in order, so the totals do not depend on n_jobs
+        for chunk in self._simulate_chunks(context, chunks, n_jobs):
+            stats.merge(chunk['stats'])
+            bands.merge(chunk['bands'])
+            final_equities.append(chunk['final_equities'])
+        
         self.simulation_results.append({
             'strategy': strategy.name,
             'symbol': symbol,
             'timeframe': timeframe,
             'n_simulations': n_simulations,
-            'equity_curves': equity_curves,
-            'metrics': metrics,
-            'statistics': stats
+            'method': method,
+            'final_equities': np.concatenate(final_equities),
+            'percentile_bands': {
+                'bars': bands.bars,
+                'timestamps': data.index[bands.bars],
+                'percentiles': list(percentiles),
+                'values': bands.percentiles(percentiles)
+            },
+            'statistics': stats.summary()
         })
         
         return self.simulation_results[-1]
     
-    def _generate_random_returns(self, original_returns: pd.Series) -> np.ndarray:
-        """Generate random returns with similar statistical properties"""
-        # Bootstrap returns with replacement
-        return np.random.choice(original_returns, size=len(original_returns), replace=True)
-    
-    def _create_simulated_prices(self, 
-                               initial_price: float, 
-                               random_returns: np.ndarray) -> np.ndarray:
-        """Create simulated price series from random returns"""
-        prices = [initial_price]
-        for ret in random_returns:
-            prices.append(prices[-1] * (1 + ret))
-        return np.array(prices)
+    def _simulate_chunks(self, context: Dict, chunks: List, n_jobs: int):
+        """Yield chunk results in chunk order, computed inline or in a process pool"""
+        if n_jobs == 1 or len(chunks) <= 1:
+            for n_paths, seed in chunks:
+                yield _simulate_chunk(context, n_paths, seed)
+            return
+        
+        with ProcessPoolExecutor(
+            max_workers=n_jobs if n_jobs > 0 else None,
+            initializer=_init_simulation_worker,
+            initargs=(context,)
+        ) as executor:
+            yield from executor.map(_simulate_chunk_in_worker, *zip(*chunks))
     
     def plot_simulation_results(self, simulation_index: int = -1):
         """Plot Monte Carlo simulation results"""
@@ -257,15 +1056,19 @@ class MonteCarloSimulator:
             raise ValueError("No simulation results available")
         
         results = self.simulation_results[simulation_index]
+        bands = results['percentile_bands']
         
-        # Plot equity curves
+        # Plot equity percentile bands, shading between symmetric pairs
         plt.figure(figsize=(12, 6))
-        for curve in results['equity_curves']:
-            plt.plot(curve, alpha=0.1, color='blue')
-        
-        # Plot mean equity curve
-        mean_curve = np.mean(results['equity_curves'], axis=0)
-        plt.plot(mean_curve, color='red', linewidth=2, label='Mean')
+        values = bands['values']
+        n_bands = len(bands['percentiles'])
+        for k in range(n_bands // 2):
+            low, high = bands['percentiles'][k], bands['percentiles'][n_bands - 1 - k]
+            plt.fill_between(bands['timestamps'], values[k], values[n_bands - 1 - k],
+                             alpha=0.15 + 0.15 * k, color='blue', label=f'{low:g}-{high:g}th percentile')
+        if n_bands % 2:
+            plt.plot(bands['timestamps'], values[n_bands // 2], color='red', linewidth=2,
+                     label=f"{bands['percentiles'][n_bands // 2]:g}th percentile")
         
         plt.title(f"Monte Carlo Simulation - {results['strategy']}")
         plt.xlabel("Time")
@@ -276,11 +1079,11 @@ class MonteCarloSimulator:
         
         # Plot distribution of final equity
         plt.figure(figsize=(12, 6))
-        plt.hist(results['equity_curves'][:, -1], bins=50)
+        plt.hist(results['final_equities'], bins=50)
         plt.axvline(self.backtest_engine.initial_capital, color='red', linestyle='--', label='Initial Capital')
         plt.title(f"Final Equity Distribution - {results['strategy']}")
         plt.xlabel("Final Equity")
         plt.ylabel("Frequency")
         plt.grid(True)
         plt.legend()
-        plt.show() 
\ No newline at end of file
+        plt.show()
@@ -0,0 +1,378 @@
+from typing import Dict, List, Optional, Tuple, Union
+from datetime import datetime
+import heapq
+import numpy as np
+import pandas as pd
+from ..strategies.base_strategy import BaseStrategy
+from ..data.historical_data_manager import HistoricalDataManager
+from ..config import MAX_OPEN_POSITIONS
+from .costs import CostModel
+from .metrics import performance_metrics
+
+PRICE_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+class PortfolioBacktester:
+    """
+    Backtests one strategy across many symbols as a single portfolio.
+
+    Every symbol is aligned onto a common timestamp grid, so prices and
+    actions are (n_symbols, n_bars) arrays. Signals follow the long-only
+    rules of BacktestEngine per symbol; the portfolio then limits how many
+    positions are open at once and sizes each entry as a fraction of
+    portfolio equity.
+    """
+
+    def __init__(self,
+                 data_manager: HistoricalDataManager,
+                 initial_capital: float = 10000.0,
+                 commission: float = 0.001,
+                 max_open_positions: Optional[int] = None,
+                 position_fraction: Optional[float] = None,
+                 cost_model: Optional[CostModel] = None):
+        """
+        Initialize the portfolio backtester.
+
+        Args:
+            data_manager: HistoricalDataManager instance
+            initial_capital: Initial capital of the whole portfolio
+            commission: Trading commission rate
+            max_open_positions: Most positions held at once (MAX_OPEN_POSITIONS by default)
+            position_fraction: Fraction of portfolio equity put into each new
+                               position (an equal share of the slots,
+                               1 / max_open_positions, by default)
+            cost_model: Default cost model for runs (a flat ``commission`` if not given)
+        """
+        self.data_manager = data_manager
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.max_open_positions = MAX_OPEN_POSITIONS if max_open_positions is None else max_open_positions
+        self.position_fraction = 1 / self.max_open_positions if position_fraction is None else position_fraction
+        self.cost_model = cost_model or CostModel(commission)
+        self.results = {}
+
+    def run_backtest(self,
+                     strategy: BaseStrategy,
+                     symbols: List[str],
+                     start_date: Union[str, datetime],
+                     end_date: Union[str, datetime],
+                     timeframe: str = '1d',
+                     data: Optional[Dict[str, pd.DataFrame]] = None,
+                     cost_model: Optional[CostModel] = None) -> Dict:
+        """
+        Run a portfolio backtest.
+
+        Args:
+            strategy: Strategy implementing generate_signal_array
+            symbols: Trading symbols, in priority order when more entries
+                     arrive on one bar than there are free position slots
+            start_date: Start date
+            end_date: End date
+            timeframe: Data timeframe
+            data: Optional symbol -> preprocessed data to use instead of loading it
+            cost_model: Cost model for this run (the engine's by default), applied
+                        to every symbol with its own instrument costs
+
+        Returns:
+            Dictionary containing backtest results
+        """
+        if not strategy.supports_vectorized:
+            raise ValueError(f"{strategy.name} does not support vectorized signal generation")
+
+        frames = {}
+        for symbol in symbols:
+            if data is not None and symbol in data:
+                frames[symbol] = data[symbol]
+            else:
+                frames[symbol] = self.data_manager.preprocess_data(
+                    self.data_manager.load_data(symbol, start_date, end_date, timeframe)
+                )
+
+        timestamps, prices, bar_positions = align_frames(frames)
+        actions = self._signal_matrix(strategy, frames, prices, bar_positions, len(timestamps))
+        costs = self._grid_costs(cost_model or self.cost_model, frames, bar_positions, len(timestamps))
+        results = self.run_actions(actions, prices['close'], costs)
+
+        trades = [
+            {
+                'timestamp': timestamps[trade['bar']],
+                'symbol': symbols[trade['symbol']],
+                **{key: value for key, value in trade.items() if key not in ('bar', 'symbol')}
+            }
+            for trade in results.pop('trades')
+        ]
+        equity_series = pd.Series(results['equity'], index=timestamps)
+        returns = equity_series.pct_change().dropna()
+
+        self.results = {
+            'strategy': strategy.name,
+            'symbols': list(symbols),
+            'timeframe': timeframe,
+            'start_date': start_date,
+            'end_date': end_date,
+            'initial_capital': self.initial_capital,
+            'final_capital': results['equity'][-1] if len(timestamps) else self.initial_capital,
+            'total_return': (results['equity'][-1] / self.initial_capital) - 1 if len(timestamps) else 0.0,
+            'trades': trades,
+            'skipped_entries': results['skipped_entries'],
+            'equity_curve': equity_series,
+            'returns': returns,
+            'exposure': pd.Series(results['exposure'], index=timestamps),
+            'open_positions': pd.Series(results['open_positions'], index=timestamps),
+            'attribution': pd.Series(results['attribution'][:, -1] if len(timestamps) else 0.0, index=list(symbols)),
+            'attribution_curve': pd.DataFrame(results['attribution'].T, index=timestamps, columns=list(symbols)),
+            'metrics': performance_metrics(results['equity'], results['trade_pnl'], np.nan_to_num(results['exposure']))
+        }
+        return self.results
+
+    @staticmethod
+    def _signal_matrix(strategy: BaseStrategy,
+                       frames: Dict[str, pd.DataFrame],
+                       prices: Dict[str, np.ndarray],
+                       bar_positions: List[np.ndarray],
+                       n_bars: int) -> np.ndarray:
+        """
+        Per-symbol actions on the common grid (hold where a symbol has no bar).
+
+        Symbols sharing the full grid are stacked into one generate_signal_matrix
+        call when the strategy supports it; otherwise each symbol's own frame
+        goes through generate_signal_array.
+        """
+        actions = np.zeros((len(frames), n_bars), dtype=np.int8)
+        full = [k for k, positions in enumerate(bar_positions) if len(positions) == n_bars]
+        if strategy.supports_batch and len(full) > 1:
+            actions[full] = strategy.generate_signal_matrix(
+                {field: values[full] for field, values in prices.items()}
+            )
+            batched = set(full)
+        else:
+            batched = set()
+        for k, (frame, positions) in enumerate(zip(frames.values(), bar_positions)):
+            if k not in batched and len(frame):
+                actions[k, positions] = strategy.generate_signal_array(frame)
+        return actions
+
+    @staticmethod
+    def _grid_costs(cost_model: CostModel,
+                    frames: Dict[str, pd.DataFrame],
+                    bar_positions: List[np.ndarray],
+                    n_bars: int) -> Dict[str, np.ndarray]:
+        """Each symbol's cost rates from its own bars, spread over the common grid"""
+        costs = {'fill': np.zeros((len(frames), n_bars)), 'carry_long': np.full((len(frames), n_bars), np.nan)}
+        for k, (symbol, frame) in enumerate(frames.items()):
+            if len(frame) == 0:
+                continue
+            prices = {field: frame[field].to_numpy(dtype=float) for field in ('high', 'low', 'close')}
+            symbol_costs = cost_model.bar_costs(prices, frame.index, symbol)
+            costs['fill'][k, bar_positions[k]] = symbol_costs['fill']
+            costs['carry_long'][k, bar_positions[k]] = symbol_costs['carry_long']
+        # Financing only changes on a symbol's own bars
+        costs['carry_long'] = np.nan_to_num(forward_fill(costs['carry_long']))
+        return costs
+
+    def run_actions(self, actions: np.ndarray, close: np.ndarray, costs: Optional[Dict[str, np.ndarray]] = None) -> Dict:
+        """
+        Simulate the portfolio from an action matrix.
+
+        Each symbol is long from a buy until the next sell, as in
+        BacktestEngine. Such a holding period is only taken if a slot is free
+        when it starts (exits on a bar free their slot before entries on the
+        same bar, ties go to the lower row); its size is position_fraction of
+        the portfolio equity at the entry close, capped by the cash left.
+        Fills pay the cost model's fill rate, and closing a position pays the
+        financing accrued on its entry notional.
+        Only the entries and exits are stepped through in order; holdings,
+        equity, exposure and attribution are then array operations.
+
+        Args:
+            actions: Actions of shape (n_symbols, n_bars), 0 where a symbol has no bar
+            close: Close prices of shape (n_symbols, n_bars), NaN where a symbol has no bar
+            costs: Per-bar 'fill' and 'carry_long' rates of shape (n_symbols, n_bars)
+                   (a flat commission from the engine's cost model if not given)
+
+        Returns:
+            Dictionary with 'equity', 'cash', 'exposure' and 'open_positions'
+            per bar, 'attribution' (cumulative P&L per symbol and bar, summing
+            to equity minus initial capital), 'trades', 'trade_pnl' (cash result
+            of every closed position, in exit order) and 'skipped_entries'
+        """
+        actions = np.asarray(actions)
+        n_symbols, n_bars = actions.shape
+        close = forward_fill(np.asarray(close, dtype=float))
+        starts, ends, rows = holding_periods(actions)
+        taken = limit_open_positions(starts, ends, self.max_open_positions)
+        starts, ends, rows = starts[taken], ends[taken], rows[taken]
+        if costs is None:
+            costs = self.cost_model.bar_costs({'close': close})
+        fill, carry = costs['fill'], costs['carry_long']
+
+        units = np.zeros(len(starts))
+        entry_cost = np.zeros(len(starts))
+        cash_flow = np.zeros(n_bars + 1)
+        trades, trade_pnl = [], []
+        cash = self.initial_capital
+        held = {}
+        # Exits sort before entries on the same bar, then by row
+        events = sorted(
+            [(ends[k], 0, rows[k], k) for k in range(len(starts)) if ends[k] < n_bars] +
+            [(starts[k], 1, rows[k], k) for k in range(len(starts))]
+        )
+        for bar, is_entry, row, k in events:
+            price = close[row, bar]
+            if is_entry:
+                equity = cash + sum(
+                    units[j] * (close[rows[j], bar] - close[rows[j], starts[j]] * (carry[rows[j], bar] - carry[rows[j], starts[j]]))
+                    for j in held
+                )
+                amount = min(self.position_fraction * equity, cash / (1 + fill[row, bar]))
+                units[k] = max(amount, 0.0) / price
+                flow = -units[k] * price * (1 + fill[row, bar])
+                entry_cost[k] = -flow
+                held[k] = None
+            else:
+                held_carry = carry[row, bar] - carry[row, starts[k]]
+                flow = units[k] * price * (1 - fill[row, bar]) - units[k] * close[row, starts[k]] * held_carry
+                trade_pnl.append(flow - entry_cost[k])
+                del held[k]
+            cash += flow
+            cash_flow[bar] += flow
+            trades.append({
+                'bar': bar,
+                'symbol': row,
+                'type': 'buy' if is_entry else 'sell',
+                'price': price,
+                'size': units[k],
+                'capital': cash
+            })
+
+        # Units held at the end of every bar, from the latest period started on each row
+        period = np.zeros((n_symbols, n_bars), dtype=np.intp)
+        period[rows, starts] = np.arange(1, len(starts) + 1)
+        period = np.maximum.accumulate(period, axis=1)
+        in_period = (period > 0) & (np.arange(n_bars) < np.append(ends, 0)[period - 1])
+        holdings = np.where(in_period, np.append(units, 0.0)[period - 1], 0.0)
+        entry_notional = units * close[rows, starts]
+        notional = np.where(in_period, np.append(entry_notional, 0.0)[period - 1], 0.0)
+        entry_carry = np.take_along_axis(carry, np.append(starts, 0)[period - 1], axis=1)
+
+        is_held = holdings != 0
+        value = np.where(is_held, holdings * np.nan_to_num(close), 0.0)
+        accrued = np.where(is_held, notional * (carry - entry_carry), 0.0)
+        cash_curve = self.initial_capital + np.cumsum(cash_flow[:n_bars])
+        equity = cash_curve + value.sum(axis=0) - accrued.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            exposure = np.where(equity > 0, value.sum(axis=0) / equity, np.nan)
+
+        # P&L per symbol: price moves on the units held since the previous bar, less
+        # the financing accrued over the bar and the fill costs
+        pnl = np.zeros((n_symbols, n_bars))
+        pnl[:, 1:] = np.where(
+            is_held[:, :-1],
+            holdings[:, :-1] * np.diff(np.nan_to_num(close), axis=1) - notional[:, :-1] * np.diff(carry, axis=1),
+            0.0
+        )
+        np.add.at(pnl, (rows, starts), -fill[rows, starts] * entry_notional)
+        closed = ends < n_bars
+        np.add.at(pnl, (rows[closed], ends[closed]), -fill[rows[closed], ends[closed]] * units[closed] * close[rows[closed], ends[closed]])
+
+        return {
+            'equity': equity,
+            'cash': cash_curve,
+            'exposure': exposure,
+            'open_positions': is_held.sum(axis=0),
+            'attribution': np.cumsum(pnl, axis=1),
+            'trades': trades,
+            'trade_pnl': np.asarray(trade_pnl),
+            'skipped_entries': int((~taken).sum())
+        }
+
+    def get_summary(self) -> Dict:
+        """Get a summary of the portfolio backtest results"""
+        if not self.results:
+            raise ValueError("No backtest results available")
+
+        return {
+            'Strategy': self.results['strategy'],
+            'Symbols': len(self.results['symbols']),
+            'Timeframe': self.results['timeframe'],
+            'Period': f"{self.results['start_date']} to {self.results['end_date']}",
+            'Initial Capital': f"${self.results['initial_capital']:,.2f}",
+            'Final Capital': f"${self.results['final_capital']:,.2f}",
+            'Total Return': f"{self.results['total_return']*100:.2f}%",
+            'Average Exposure': f"{self.results['metrics']['exposure']*100:.2f}%",
+            'Sharpe Ratio': f"{self.results['metrics']['sharpe_ratio']:.2f}",
+            'Max Drawdown': f"{self.results['metrics']['max_drawdown']*100:.2f}%",
+            'Win Rate': f"{self.results['metrics']['win_rate']*100:.2f}%",
+            'Total Trades': len([t for t in self.results['trades'] if t['type'] == 'sell']),
+            'Skipped Entries': self.results['skipped_entries']
+        }
+
+def align_frames(frames: Dict[str, pd.DataFrame],
+                 fields: List[str] = PRICE_FIELDS) -> Tuple[pd.Index, Dict[str, np.ndarray], List[np.ndarray]]:
+    """
+    Put every symbol's bars on the sorted union of their timestamps.
+
+    Args:
+        frames: symbol -> price data
+        fields: Columns to align
+
+    Returns:
+        (timestamps, field -> (n_symbols, n_bars) array with NaN where a
+        symbol has no bar, grid position of every symbol's bars)
+    """
+    indexes = [frame.index for frame in frames.values()]
+    timestamps = indexes[0] if indexes else pd.DatetimeIndex([])
+    if any(not index.equals(timestamps) for index in indexes[1:]):
+        timestamps = indexes[0].append(indexes[1:]).unique().sort_values()
+
+    prices = {field: np.full((len(frames), len(timestamps)), np.nan) for field in fields}
+    bar_positions = []
+    for k, frame in enumerate(frames.values()):
+        positions = timestamps.get_indexer(frame.index)
+        bar_positions.append(positions)
+        for field in fields:
+            prices[field][k, positions] = frame[field].to_numpy(dtype=float)
+    return timestamps, prices, bar_positions
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """Carry the last non-NaN value forward along each row"""
+    positions = np.where(np.isnan(values), 0, np.arange(values.shape[1]))
+    return np.take_along_axis(values, np.maximum.accumulate(positions, axis=1), axis=1)
+
+def holding_periods(actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Long holding periods of every row: from a buy until the next sell.
+
+    Returns:
+        (start bar, exit bar or n_bars if still open, row) per holding period,
+        sorted by start bar and then row
+    """
+    n_bars = actions.shape[1]
+    positions = np.arange(n_bars)
+    last_action = np.maximum.accumulate(np.where(actions != 0, positions, 0), axis=1)
+    is_long = np.take_along_axis(actions, last_action, axis=1) == 1
+    edges = np.diff(is_long.astype(np.int8), axis=1, prepend=0, append=0)
+    # Row-major order pairs every row's entries with its exits
+    entry_rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    order = np.lexsort((entry_rows, starts))
+    return starts[order], ends[order], entry_rows[order]
+
+def limit_open_positions(starts: np.ndarray, ends: np.ndarray, max_open: int) -> np.ndarray:
+    """
+    Which holding periods fit under a limit on simultaneous positions.
+
+    Periods are considered in the given order (by start bar); one is taken
+    if fewer than max_open taken periods are still open at its start bar.
+
+    Returns:
+        Boolean mask of taken periods
+    """
+    taken = np.zeros(len(starts), dtype=bool)
+    open_ends = []
+    for k in range(len(starts)):
+        while open_ends and open_ends[0] <= starts[k]:
+            heapq.heappop(open_ends)
+        if len(open_ends) < max_open:
+            heapq.heappush(open_ends, ends[k])
+            taken[k] = True
+    return taken
@@ -0,0 +1,121 @@
+from typing import Dict, List
+from contextlib import contextmanager
+import bisect
+import logging
+import numpy as np
+import pandas as pd
+from ..strategies.base_strategy import BaseStrategy
+
+class PrefixSignalCache:
+    """
+    Warm-start cache that lets bar-by-bar backtests reuse one full-frame analysis.
+
+    The strategy's signals are generated once over the full frame. While the
+    cache is attached, calls to ``strategy.generate_signals(prefix)`` return a
+    point-in-time view containing only signals stamped at or before the last
+    bar of the prefix, so ``get_recommendation`` runs unchanged in O(log n).
+
+    Point-in-time views are only valid for strategies whose past signals do
+    not change when future bars arrive. ``verify`` guards against lookahead by
+    recomputing a sample of prefixes from scratch and comparing them with the
+    cached view. A sample cannot prove a strategy causal, so backtests only
+    warm-start when asked to.
+    """
+
+    def __init__(self, strategy: BaseStrategy, data: pd.DataFrame):
+        """
+        Precompute the strategy's signals over the full frame.
+
+        Args:
+            strategy: Strategy instance to warm-start
+            data: Full preprocessed data the backtest will iterate over
+        """
+        self.strategy = strategy
+        self.data = data
+        self.logger = logging.getLogger(__name__)
+        self._generate_signals = strategy.generate_signals
+        self.signals = self._generate_signals(data)
+        self.timestamps = [signal['timestamp'] for signal in self.signals]
+
+    def signals_until(self, timestamp) -> List[Dict]:
+        """Signals that were known at the given bar timestamp"""
+        return self.signals[:bisect.bisect_right(self.timestamps, timestamp)]
+
+    def _is_prefix(self, data: pd.DataFrame) -> bool:
+        """Whether data is a leading slice of the cached frame"""
+        n = len(data)
+        return 0 < n <= len(self.data) and data.index[-1] == self.data.index[n - 1]
+
+    def _cached_generate_signals(self, data: pd.DataFrame) -> List[Dict]:
+        if not self._is_prefix(data):
+            return self._generate_signals(data)
+        return self.signals_until(data.index[-1])
+
+    def verify(self, n_checks: int = 5, min_bars: int = 2) -> bool:
+        """
+        Check that cached views match signals recomputed on sample prefixes.
+
+        Args:
+            n_checks: Number of prefixes to recompute
+            min_bars: Shortest prefix to check
+
+        Returns:
+            True if every sampled prefix matches, False if the strategy looks
+            ahead (or its signals are not in chronological order)
+        """
+        if self.timestamps != sorted(self.timestamps):
+            self.logger.warning(f"{self.strategy.name}: signals are not chronological, prefix cache disabled")
+            return False
+
+        n = len(self.data)
+        if n < min_bars:
+            return True
+
+        # Evenly spaced prefixes, plus prefixes ending exactly on signal bars:
+        # a signal that needs future bars to confirm is missing at its own bar
+        checkpoints = np.linspace(min_bars - 1, n - 1, n_checks).astype(int)
+        if self.timestamps:
+            sampled = np.linspace(0, len(self.timestamps) - 1, n_checks).astype(int)
+            signal_bars = self.data.index.get_indexer([self.timestamps[k] for k in sampled])
+            checkpoints = np.concatenate((checkpoints, signal_bars[signal_bars >= min_bars - 1]))
+        checkpoints = np.unique(checkpoints)
+        for end in checkpoints:
+            try:
+                expected = self._generate_signals(self.data.iloc[:end + 1])
+            except Exception as e:
+                self.logger.warning(f"{self.strategy.name}: prefix check failed ({e}), prefix cache disabled")
+                return False
+            if not _signals_equal(expected, self.signals_until(self.data.index[end])):
+                self.logger.warning(
+                    f"{self.strategy.name}: signals change with future bars (lookahead), prefix cache disabled"
+                )
+                return False
+        return True
+
+    @contextmanager
+    def attach(self):
+        """Route the strategy's generate_signals through the cache while active"""
+        self.strategy.generate_signals = self._cached_generate_signals
+        try:
+            yield self
+        finally:
+            del self.strategy.generate_signals
+
+def _values_equal(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and np.isnan(a) and np.isnan(b):
+        return True
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+def _signals_equal(left: List[Dict], right: List[Dict]) -> bool:
+    """Compare two signal lists, treating NaN fields as equal"""
+    if len(left) != len(right):
+        return False
+    for a, b in zip(left, right):
+        if a.keys() != b.keys():
+            return False
+        if not all(_values_equal(a[key], b[key]) for key in a):
+            return False
+    return True
@@ -0,0 +1,125 @@
+from typing import Dict, List, Tuple
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pandas as pd
+
+class SharedFrame:
+    """
+    Read-only DataFrame published once through shared memory.
+
+    The owning process copies the index and each run of same-dtype columns
+    into a single shared memory segment, laid out as 2-D blocks. Worker
+    processes attach by name and rebuild the frame as views of those blocks,
+    so attaching costs nothing per task and no price data is pickled.
+    Only numeric (or boolean) columns and a DatetimeIndex or numeric index
+    can be shared. Attaching processes must be children of the owner so they
+    share its resource tracker; the owner alone unlinks the segment.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        """
+        Publish a DataFrame.
+
+        Args:
+            data: Frame to share (copied once into shared memory)
+        """
+        n = len(data)
+        blocks = _column_runs(data)
+        index_values, index_kind = _index_values(data.index)
+
+        layout = []
+        offset = _aligned(index_values.nbytes)
+        for columns, dtype in blocks:
+            layout.append({'columns': columns, 'dtype': dtype.str, 'offset': offset})
+            offset += _aligned(len(columns) * n * dtype.itemsize)
+
+        self.shm = SharedMemory(create=True, size=max(offset, 1))
+        np.ndarray(index_values.shape, dtype=index_values.dtype, buffer=self.shm.buf)[:] = index_values
+        for block in layout:
+            target = np.ndarray(
+                (len(block['columns']), n), dtype=block['dtype'], buffer=self.shm.buf, offset=block['offset']
+            )
+            target[:] = data[block['columns']].to_numpy(dtype=block['dtype']).T
+
+        self.descriptor = {
+            'name': self.shm.name,
+            'length': n,
+            'index_kind': index_kind,
+            'index_dtype': index_values.dtype.str,
+            'index_name': data.index.name,
+            'tz': str(data.index.tz) if getattr(data.index, 'tz', None) is not None else None,
+            'blocks': layout
+        }
+
+    @staticmethod
+    def attach(descriptor: Dict) -> Tuple[pd.DataFrame, SharedMemory]:
+        """
+        Rebuild a published frame in another process without copying its data.
+
+        Args:
+            descriptor: SharedFrame.descriptor from the owning process
+
+        Returns:
+            (frame, segment) - keep the segment referenced while the frame is in use
+        """
+        shm = SharedMemory(name=descriptor['name'])
+        n = descriptor['length']
+
+        index_values = np.ndarray((n,), dtype=descriptor['index_dtype'], buffer=shm.buf)
+        if descriptor['index_kind'] == 'datetime':
+            index = pd.DatetimeIndex(index_values.view('datetime64[ns]'), name=descriptor['index_name'])
+            if descriptor['tz']:
+                index = index.tz_localize('UTC').tz_convert(descriptor['tz'])
+        else:
+            index = pd.Index(index_values, name=descriptor['index_name'])
+
+        columns = {}
+        for block in descriptor['blocks']:
+            values = np.ndarray(
+                (len(block['columns']), n), dtype=block['dtype'], buffer=shm.buf, offset=block['offset']
+            )
+            values.flags.writeable = False
+            columns.update(zip(block['columns'], values))
+
+        # A dict of 1-D views with copy=False keeps one block per column, each
+        # backed by the segment (concatenating 2-D blocks would consolidate them)
+        frame = pd.DataFrame(columns, index=index, copy=False)
+        return frame, shm
+
+    def close(self):
+        """Release the segment (call once, from the owning process)"""
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def _aligned(nbytes: int) -> int:
+    """Round up to a 64-byte boundary so every block starts aligned"""
+    return (nbytes + 63) // 64 * 64
+
+def _column_runs(data: pd.DataFrame) -> List[Tuple[List[str], np.dtype]]:
+    """Group consecutive columns sharing a dtype, preserving column order"""
+    runs = []
+    for column, dtype in data.dtypes.items():
+        if not isinstance(dtype, np.dtype) or dtype.kind not in 'biuf':
+            raise ValueError(f"Column {column!r} has dtype {dtype}; only numeric columns can be shared")
+        if runs and runs[-1][1] == dtype:
+            runs[-1][0].append(column)
+        else:
+            runs.append(([column], dtype))
+    return runs
+
+def _index_values(index: pd.Index) -> Tuple[np.ndarray, str]:
+    if isinstance(index, pd.DatetimeIndex):
+        # .values is UTC for timezone-aware indexes
+        return np.asarray(index.values).astype('datetime64[ns]').view(np.int64), 'datetime'
+    values = np.asarray(index)
+    if values.dtype.kind not in 'biuf':
+        raise ValueError(f"Index of dtype {values.dtype} cannot be shared")
+    return values, 'numeric'
@@ -51,6 +51,17 @@ AI_TEMPERATURE = 0.7
 SLEEP_BETWEEN_RUNS_MINUTES = int(os.getenv('SLEEP_BETWEEN_RUNS_MINUTES', 5))
 DEBUG_MODE = os.getenv('DEBUG_MODE', 'True').lower() in ('true', '1', 't')
 
+# Concurrent analysis cycle settings
+ANALYSIS_FETCH_CONCURRENCY = int(os.getenv('ANALYSIS_FETCH_CONCURRENCY', 8))  # Parallel data fetches
+ANALYSIS_PROCESS_WORKERS = int(os.getenv('ANALYSIS_PROCESS_WORKERS', -1))  # -1 for all cores, 0 to evaluate inline
+PROVIDER_RATE_LIMITS = {  # Maximum requests per second for each data provider
+    'yfinance': float(os.getenv('YFINANCE_MAX_REQUESTS_PER_SECOND', 2)),
+    'forex_com': float(os.getenv('FOREX_COM_MAX_REQUESTS_PER_SECOND', 5))
+}
+
+# Historical data settings
+DATA_CACHE_MAX_MB = float(os.getenv('DATA_CACHE_MAX_MB', 512))  # In-memory budget for loaded price data
+
 # Alpaca Markets Trade Execution settings
 EXECUTE_TRADES = os.getenv('EXECUTE_TRADES', 'False').lower() in ('true', '1', 't')
 ALPACA_API_KEY = os.getenv('ALPACA_API_KEY', '')
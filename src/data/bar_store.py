@@ -0,0 +1,477 @@
+from typing import Dict, List, Optional, Tuple, Union
+from datetime import datetime
+import json
+import os
+import shutil
+import threading
+import logging
+import numpy as np
+import pandas as pd
+
+class BarStore:
+    """
+    Append-only columnar store for price bars, one series per (symbol, timeframe).
+
+    Each series is partitioned by calendar month::
+
+        <root>/<symbol>/<timeframe>/schema.json
+        <root>/<symbol>/<timeframe>/<YYYY-MM>/timestamp.i8
+        <root>/<symbol>/<timeframe>/<YYYY-MM>/<column>.f8 | <column>.i8
+
+    Every column is a raw float64/int64 file and timestamps are int64
+    nanoseconds (UTC for timezone-aware series), sorted within and across
+    partitions. Range reads memory-map only the partitions they overlap and
+    slice them with a binary search. Bars newer than a partition's last bar are
+    appended to its files in place; only a month that receives out-of-order or
+    revised bars is rewritten.
+
+    The schema also keeps a coverage index: the merged time ranges that have
+    been fetched for the series, including stretches that contain no bars
+    (weekends, holidays). ``missing_ranges`` uses it so callers only fetch
+    what has never been requested before.
+    """
+
+    TIMESTAMP = 'timestamp'
+    EXTENSIONS = {'float64': '.f8', 'int64': '.i8'}
+    SCHEMA_FILE = 'schema.json'
+
+    def __init__(self, root_dir: str):
+        """
+        Initialize the bar store.
+
+        Args:
+            root_dir: Directory holding all stored series
+        """
+        self.root_dir = str(root_dir)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def read(self,
+             symbol: str,
+             timeframe: str,
+             start: Optional[Union[str, datetime]] = None,
+             end: Optional[Union[str, datetime]] = None) -> pd.DataFrame:
+        """
+        Read the bars of a series between start and end (both inclusive).
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Data timeframe
+            start: First timestamp to include, or None for the beginning
+            end: Last timestamp to include, or None for the latest bar
+
+        Returns:
+            DataFrame indexed by timestamp (empty if the series does not exist)
+        """
+        series_dir = self._series_dir(symbol, timeframe)
+        schema = self._load_schema(series_dir)
+        if schema is None:
+            return pd.DataFrame()
+
+        start_ns = self._to_ns(start, schema) if start is not None else None
+        end_ns = self._to_ns(end, schema) if end is not None else None
+
+        pieces = []
+        for name in self._partitions(series_dir):
+            if start_ns is not None and name < _month_of(start_ns):
+                continue
+            if end_ns is not None and name > _month_of(end_ns):
+                break
+            arrays = self._open_partition(os.path.join(series_dir, name), schema)
+            timestamps = arrays[self.TIMESTAMP]
+            lo = 0 if start_ns is None else np.searchsorted(timestamps, start_ns, side='left')
+            hi = len(timestamps) if end_ns is None else np.searchsorted(timestamps, end_ns, side='right')
+            if hi > lo:
+                pieces.append({column: values[lo:hi] for column, values in arrays.items()})
+
+        return self._to_frame(pieces, schema)
+
+    def tail(self, symbol: str, timeframe: str, count: int) -> pd.DataFrame:
+        """
+        Read the most recent bars of a series.
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Data timeframe
+            count: Number of bars to return
+
+        Returns:
+            DataFrame with at most count bars
+        """
+        series_dir = self._series_dir(symbol, timeframe)
+        schema = self._load_schema(series_dir)
+        if schema is None:
+            return pd.DataFrame()
+
+        pieces = []
+        remaining = count
+        for name in reversed(self._partitions(series_dir)):
+            if remaining <= 0:
+                break
+            arrays = self._open_partition(os.path.join(series_dir, name), schema)
+            n = len(arrays[self.TIMESTAMP])
+            take = min(n, remaining)
+            if take:
+                pieces.append({column: values[n - take:] for column, values in arrays.items()})
+                remaining -= take
+
+        return self._to_frame(pieces[::-1], schema)
+
+    def write(self,
+              symbol: str,
+              timeframe: str,
+              data: Optional[pd.DataFrame],
+              covered: Optional[Tuple[Union[str, datetime], Union[str, datetime]]] = None) -> int:
+        """
+        Add bars to a series.
+
+        Bars newer than the stored history are appended. Bars with a stored
+        timestamp replace the stored bar, so a revised candle overwrites the
+        previous version. Only numeric columns are stored; the set of columns
+        is fixed by the first write that contains bars.
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Data timeframe
+            data: Bars indexed by a DatetimeIndex (may be empty)
+            covered: (start, end) range the bars were fetched for, recorded in
+                     the coverage index even if it contains no bars
+
+        Returns:
+            Number of bars written
+        """
+        has_bars = data is not None and len(data) > 0
+        if has_bars and not isinstance(data.index, pd.DatetimeIndex):
+            raise ValueError("BarStore can only store data with a DatetimeIndex")
+        if not has_bars and covered is None:
+            return 0
+
+        with self._lock:
+            series_dir = self._series_dir(symbol, timeframe)
+            schema = self._load_schema(series_dir)
+            if schema is None:
+                schema = self._create_schema(data if has_bars else None)
+                os.makedirs(series_dir, exist_ok=True)
+            elif has_bars and not schema['columns'] and not self._partitions(series_dir):
+                # Only coverage has been recorded so far: adopt this data's layout
+                schema.update({k: v for k, v in self._create_schema(data).items() if k != 'coverage'})
+
+            if covered is not None:
+                start_ns, end_ns = (self._to_ns(value, schema) for value in covered)
+                if start_ns <= end_ns:
+                    schema['coverage'] = _merge_intervals(schema['coverage'] + [[start_ns, end_ns]])
+
+            if not has_bars:
+                self._save_schema(series_dir, schema)
+                return 0
+
+            timestamps, columns = self._normalize(data, schema)
+            if len(timestamps):
+                months = timestamps.view('datetime64[ns]').astype('datetime64[M]')
+                bounds = np.flatnonzero(months[1:] != months[:-1]) + 1
+                for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(timestamps)]):
+                    self._write_partition(
+                        os.path.join(series_dir, str(months[lo])),
+                        schema,
+                        timestamps[lo:hi],
+                        {column: values[lo:hi] for column, values in columns.items()}
+                    )
+
+            # Rewriting the schema also marks when the series was last updated
+            self._save_schema(series_dir, schema)
+            return len(timestamps)
+
+    def bounds(self, symbol: str, timeframe: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """First and last stored timestamps of a series, or None if it is empty"""
+        series_dir = self._series_dir(symbol, timeframe)
+        schema = self._load_schema(series_dir)
+        if schema is None:
+            return None
+
+        first = last = None
+        partitions = self._partitions(series_dir)
+        for name in partitions:
+            timestamps = self._open_partition(os.path.join(series_dir, name), schema)[self.TIMESTAMP]
+            if len(timestamps):
+                first = timestamps[0]
+                break
+        for name in reversed(partitions):
+            timestamps = self._open_partition(os.path.join(series_dir, name), schema)[self.TIMESTAMP]
+            if len(timestamps):
+                last = timestamps[-1]
+                break
+        if first is None:
+            return None
+
+        index = self._to_index(np.array([first, last], dtype=np.int64), schema)
+        return index[0], index[1]
+
+    def coverage(self, symbol: str, timeframe: str) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Merged (start, end) ranges that have been fetched for a series"""
+        schema = self._load_schema(self._series_dir(symbol, timeframe))
+        if schema is None or not schema['coverage']:
+            return []
+        bounds = self._to_index(np.array(schema['coverage'], dtype=np.int64).ravel(), schema)
+        return list(zip(bounds[0::2], bounds[1::2]))
+
+    def missing_ranges(self,
+                       symbol: str,
+                       timeframe: str,
+                       start: Union[str, datetime],
+                       end: Union[str, datetime]) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Sub-ranges of [start, end] that are not in the coverage index.
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Data timeframe
+            start: Start of the requested range
+            end: End of the requested range (inclusive)
+
+        Returns:
+            List of (start, end) ranges to fetch, in chronological order. The
+            timestamps are naive if start is naive, timezone-aware otherwise.
+        """
+        schema = self._load_schema(self._series_dir(symbol, timeframe))
+        if schema is None:
+            return [(pd.Timestamp(start), pd.Timestamp(end))]
+
+        start_ns, end_ns = self._to_ns(start, schema), self._to_ns(end, schema)
+        gaps = _subtract_intervals(start_ns, end_ns, schema['coverage'])
+        if not gaps:
+            return []
+
+        bounds = self._to_index(np.array(gaps, dtype=np.int64).ravel(), schema)
+        naive = pd.Timestamp(start).tzinfo is None
+        if naive and bounds.tz is not None:
+            bounds = bounds.tz_localize(None)
+        elif not naive and bounds.tz is None:
+            bounds = bounds.tz_localize('UTC')
+        return list(zip(bounds[0::2], bounds[1::2]))
+
+    def last_modified(self, symbol: str, timeframe: str) -> Optional[datetime]:
+        """When the series was last written to, or None if it does not exist"""
+        path = os.path.join(self._series_dir(symbol, timeframe), self.SCHEMA_FILE)
+        if not os.path.exists(path):
+            return None
+        return datetime.fromtimestamp(os.path.getmtime(path))
+
+    def delete(self, symbol: str, timeframe: str):
+        """Remove a series"""
+        with self._lock:
+            shutil.rmtree(self._series_dir(symbol, timeframe), ignore_errors=True)
+
+    def clear(self):
+        """Remove every stored series"""
+        with self._lock:
+            for name in os.listdir(self.root_dir):
+                path = os.path.join(self.root_dir, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+
+    def _series_dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root_dir, _safe_name(symbol), _safe_name(timeframe))
+
+    def _partitions(self, series_dir: str) -> List[str]:
+        """Partition names in chronological order"""
+        if not os.path.isdir(series_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(series_dir)
+            if os.path.isdir(os.path.join(series_dir, name))
+        )
+
+    def _column_path(self, partition_dir: str, column: str, dtype: str) -> str:
+        return os.path.join(partition_dir, column + self.EXTENSIONS[dtype])
+
+    def _partition_files(self, partition_dir: str, schema: Dict) -> Dict[str, Tuple[str, str]]:
+        """Column name -> (file path, dtype) for a partition, timestamps first"""
+        files = {self.TIMESTAMP: (self._column_path(partition_dir, self.TIMESTAMP, 'int64'), 'int64')}
+        for column, dtype in schema['columns'].items():
+            files[column] = (self._column_path(partition_dir, column, dtype), dtype)
+        return files
+
+    def _open_partition(self, partition_dir: str, schema: Dict) -> Dict[str, np.ndarray]:
+        """Memory-map every column of a partition"""
+        arrays = {
+            column: _memmap(path, dtype)
+            for column, (path, dtype) in self._partition_files(partition_dir, schema).items()
+        }
+        # A write interrupted between column files leaves them at different lengths
+        n = min(len(values) for values in arrays.values())
+        return {column: values[:n] for column, values in arrays.items()}
+
+    def _write_partition(self,
+                         partition_dir: str,
+                         schema: Dict,
+                         timestamps: np.ndarray,
+                         columns: Dict[str, np.ndarray]):
+        os.makedirs(partition_dir, exist_ok=True)
+        files = self._partition_files(partition_dir, schema)
+        new = {self.TIMESTAMP: timestamps, **columns}
+
+        stored = self._open_partition(partition_dir, schema)
+        n_stored = len(stored[self.TIMESTAMP])
+        consistent = all(
+            (os.path.getsize(path) if os.path.exists(path) else 0) == n_stored * 8
+            for path, _ in files.values()
+        )
+
+        if consistent and (n_stored == 0 or timestamps[0] > stored[self.TIMESTAMP][-1]):
+            # New bars only: append without touching the stored history
+            del stored
+            for column, (path, dtype) in files.items():
+                with open(path, 'ab') as f:
+                    f.write(np.ascontiguousarray(new[column], dtype=dtype).tobytes())
+            return
+
+        # Out-of-order or revised bars: merge and rewrite this month only
+        keep = ~np.isin(stored[self.TIMESTAMP], timestamps)
+        merged = {
+            column: np.concatenate((np.asarray(stored[column])[keep], new[column]))
+            for column in files
+        }
+        del stored
+        order = np.argsort(merged[self.TIMESTAMP], kind='stable')
+        for column, (path, dtype) in files.items():
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(np.ascontiguousarray(merged[column][order], dtype=dtype).tobytes())
+            os.replace(tmp_path, path)
+
+    def _create_schema(self, data: Optional[pd.DataFrame]) -> Dict:
+        if data is None:
+            return {'columns': {}, 'tz': None, 'index_name': None, 'coverage': []}
+
+        columns = {}
+        for column in data.columns:
+            if not isinstance(column, str) or column == self.TIMESTAMP or os.sep in column:
+                continue
+            dtype = data[column].dtype
+            if pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+                continue
+            columns[column] = 'int64' if pd.api.types.is_integer_dtype(dtype) else 'float64'
+        return {
+            'columns': columns,
+            'tz': str(data.index.tz) if data.index.tz is not None else None,
+            'index_name': data.index.name,
+            'coverage': []
+        }
+
+    def _load_schema(self, series_dir: str) -> Optional[Dict]:
+        path = os.path.join(series_dir, self.SCHEMA_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            schema = json.load(f)
+        schema.setdefault('coverage', [])
+        return schema
+
+    def _save_schema(self, series_dir: str, schema: Dict):
+        path = os.path.join(series_dir, self.SCHEMA_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(schema, f)
+        os.replace(tmp_path, path)
+
+    def _normalize(self, data: pd.DataFrame, schema: Dict) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Convert bars to sorted, de-duplicated column arrays in the series' layout"""
+        index = data.index
+        if schema['tz']:
+            if index.tz is None:
+                index = index.tz_localize(schema['tz'])
+        elif index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+
+        # .values is UTC for timezone-aware indexes
+        values = np.asarray(index.values).astype('datetime64[ns]')
+        valid = ~np.isnat(values)
+        timestamps = values.view(np.int64)[valid]
+
+        columns = {}
+        for column, dtype in schema['columns'].items():
+            if column in data.columns:
+                series = pd.to_numeric(data[column], errors='coerce')
+                if dtype == 'int64':
+                    series = series.fillna(0)
+                columns[column] = series.to_numpy(dtype=dtype)[valid]
+            else:
+                fill = 0 if dtype == 'int64' else np.nan
+                columns[column] = np.full(len(timestamps), fill, dtype=dtype)
+
+        # Sort, keeping the last of any duplicated timestamps
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        last = np.r_[timestamps[1:] != timestamps[:-1], True] if len(timestamps) else np.zeros(0, dtype=bool)
+        timestamps = timestamps[last]
+        columns = {column: values[order][last] for column, values in columns.items()}
+        return timestamps, columns
+
+    def _to_ns(self, value: Union[str, datetime], schema: Dict) -> int:
+        timestamp = pd.Timestamp(value)
+        if schema['tz']:
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.tz_localize(schema['tz'])
+        elif timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+        return int(timestamp.to_datetime64().astype('datetime64[ns]').view(np.int64))
+
+    def _to_index(self, timestamps: np.ndarray, schema: Dict) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(timestamps.view('datetime64[ns]'), name=schema.get('index_name'))
+        if schema['tz']:
+            index = index.tz_localize('UTC').tz_convert(schema['tz'])
+        return index
+
+    def _to_frame(self, pieces: List[Dict[str, np.ndarray]], schema: Dict) -> pd.DataFrame:
+        columns = list(schema['columns'])
+        if pieces:
+            timestamps = np.concatenate([piece[self.TIMESTAMP] for piece in pieces])
+            data = {column: np.concatenate([piece[column] for piece in pieces]) for column in columns}
+        else:
+            timestamps = np.zeros(0, dtype=np.int64)
+            data = {column: np.zeros(0, dtype=dtype) for column, dtype in schema['columns'].items()}
+        return pd.DataFrame(data, index=self._to_index(timestamps, schema), columns=columns)
+
+def _safe_name(name) -> str:
+    return str(name).replace('/', '_').replace('\\', '_')
+
+def _month_of(timestamp_ns: int) -> str:
+    """Partition name (YYYY-MM) of a nanosecond timestamp"""
+    return str(np.datetime64(int(timestamp_ns), 'ns').astype('datetime64[M]'))
+
+def _merge_intervals(intervals: List[List[int]]) -> List[List[int]]:
+    """Merge overlapping or touching inclusive [start, end] nanosecond intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def _subtract_intervals(start: int, end: int, covered: List[List[int]]) -> List[List[int]]:
+    """Parts of the inclusive interval [start, end] not inside the merged covered intervals"""
+    gaps = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end < cursor:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            gaps.append([cursor, covered_start - 1])
+        cursor = max(cursor, covered_end + 1)
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append([cursor, end])
+    return gaps
+
+def _memmap(path: str, dtype: str) -> np.ndarray:
+    """Map a column file read-only, ignoring any trailing partial value"""
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    n = size // np.dtype(dtype).itemsize
+    if n == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(n,))
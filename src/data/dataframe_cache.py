@@ -0,0 +1,114 @@
+from typing import Any, Dict, Hashable
+from collections import OrderedDict
+import threading
+import logging
+import numpy as np
+import pandas as pd
+from ..config import DATA_CACHE_MAX_MB
+
+class DataFrameCache:
+    """
+    Least-recently-used cache for DataFrames bounded by a byte budget.
+
+    Entry sizes are measured with ``memory_usage(deep=True)`` (index
+    included). Adding an entry evicts the least recently used ones until the
+    total fits the budget; an entry larger than the whole budget is not
+    cached. All operations are thread-safe.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total size of cached entries in bytes
+        """
+        self.max_bytes = int(max_bytes)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get an entry and mark it as most recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        """Add or replace an entry, evicting least recently used entries as needed"""
+        size = self.size_of(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                self.logger.debug(f"Not caching {key}: {size} bytes exceeds the {self.max_bytes} byte budget")
+                return
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+
+    def clear(self):
+        """Remove every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters and current usage"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    @staticmethod
+    def size_of(value: Any) -> int:
+        """Memory footprint of a cached value in bytes"""
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return int(np.sum(value.memory_usage(index=True, deep=True)))
+        return int(getattr(value, 'nbytes', 0))
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self.put(key, value)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+_MISSING = object()
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+def get_shared_cache() -> DataFrameCache:
+    """Process-wide cache used by every HistoricalDataManager that isn't given its own"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = DataFrameCache(int(DATA_CACHE_MAX_MB * 1024 * 1024))
+        return _shared_cache
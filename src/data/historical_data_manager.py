@@ -2,9 +2,20 @@ from typing import Dict, List, Optional, Union
 import pandas as pd
 import numpy as np
 import os
-import pickle
 from datetime import datetime, timedelta
 import logging
+from .bar_store import BarStore
+from .dataframe_cache import DataFrameCache, get_shared_cache
+
+def _bar_interval(timeframe: str) -> pd.Timedelta:
+    """Length of one bar of a timeframe such as '15m', '1h', '1d', '1wk' or '1mo' (1 day if unknown)"""
+    for suffix, days in (('wk', 7), ('mo', 31)):
+        if timeframe.endswith(suffix):
+            return pd.Timedelta(days=int(timeframe[:-len(suffix)] or 1) * days)
+    try:
+        return pd.Timedelta(timeframe)
+    except ValueError:
+        return pd.Timedelta(days=1)
 
 class HistoricalDataManager:
     """
@@ -12,22 +23,30 @@ class HistoricalDataManager:
     Handles data fetching, caching, and preprocessing.
     """
     
-    def __init__(self, data_dir: str = "data/historical", cache_dir: str = "data/cache"):
+    def __init__(self,
+                 data_dir: str = "data/historical",
+                 cache_dir: str = "data/cache",
+                 cache: Optional[DataFrameCache] = None):
         """
         Initialize the historical data manager.
         
         Args:
             data_dir: Directory for storing raw historical data
             cache_dir: Directory for storing processed/cached data
+            cache: In-memory cache for loaded data (defaults to the process-wide
+                   cache shared by all managers, sized by DATA_CACHE_MAX_MB)
         """
         self.data_dir = data_dir
         self.cache_dir = cache_dir
-        self.cache = {}
+        self.cache = cache if cache is not None else get_shared_cache()
         self.logger = logging.getLogger(__name__)
         
         # Create directories if they don't exist
         os.makedirs(data_dir, exist_ok=True)
         os.makedirs(cache_dir, exist_ok=True)
+        
+        # Columnar store shared by every range requested for a symbol/timeframe
+        self.bar_store = BarStore(os.path.join(cache_dir, "bars"))
     
     def load_data(self, 
                  symbol: str, 
@@ -48,30 +67,46 @@ class HistoricalDataManager:
         Returns:
             DataFrame containing historical price data
         """
-        cache_key = f"{symbol}_{timeframe}_{start_date}_{end_date}"
+        # The cache may be shared, so keys include where this manager reads from
+        cache_key = (
+            os.path.abspath(self.data_dir),
+            os.path.abspath(self.cache_dir),
+            f"{symbol}_{timeframe}_{start_date}_{end_date}"
+        )
         
         # Check cache first
-        if not force_refresh and cache_key in self.cache:
-            return self.cache[cache_key]
-        
-        # Try to load from cache file
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.pkl")
-        if not force_refresh and os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'rb') as f:
-                    data = pickle.load(f)
-                self.cache[cache_key] = data
+        if not force_refresh:
+            data = self.cache.get(cache_key)
+            if data is not None:
                 return data
-            except Exception as e:
-                self.logger.warning(f"Error loading cache file: {e}")
         
-        # Load or fetch data
-        data = self._fetch_data(symbol, start_date, end_date, timeframe)
+        try:
+            # Only fetch the parts of the range that have never been fetched
+            if force_refresh:
+                missing = [(pd.Timestamp(start_date), pd.Timestamp(end_date))]
+            else:
+                missing = self.bar_store.missing_ranges(symbol, timeframe, start_date, end_date)
+            for gap_start, gap_end in missing:
+                self.logger.info(f"Fetching {symbol} {timeframe} from {gap_start} to {gap_end}")
+                fetched = self._fetch_data(symbol, gap_start, gap_end, timeframe)
+                if fetched is None or len(fetched) == 0:
+                    # Nothing published yet (or the source failed): try again next time
+                    continue
+                # The whole gap counts as fetched (market closures have no bars),
+                # except the last bar interval before now, which may still be published
+                latest_final = pd.Timestamp.now(tz=gap_end.tz) - _bar_interval(timeframe)
+                covered_end = min(gap_end, latest_final)
+                self.bar_store.write(symbol, timeframe, fetched, covered=(gap_start, covered_end))
+            data = self.bar_store.read(symbol, timeframe, start_date, end_date)
+            if data.empty and len(data.columns) == 0:
+                # Nothing has ever been stored: return the source's (empty) frame as is
+                data = self._fetch_data(symbol, start_date, end_date, timeframe)
+        except Exception as e:
+            self.logger.warning(f"Error using bar store, fetching directly: {e}")
+            data = self._fetch_data(symbol, start_date, end_date, timeframe)
         
         # Cache the data
         self.cache[cache_key] = data
-        with open(cache_file, 'wb') as f:
-            pickle.dump(data, f)
         
         return data
     
@@ -101,7 +136,8 @@ class HistoricalDataManager:
         # For now, return empty DataFrame with required columns
         return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'])
     
-    def preprocess_data(self, data: pd.DataFrame) -> pd.DataFrame:
+    @staticmethod
+    def preprocess_data(data: pd.DataFrame) -> pd.DataFrame:
         """
         Preprocess historical data for analysis.
         
@@ -155,7 +191,9 @@ class HistoricalDataManager:
     
     def clear_cache(self):
         """Clear the data cache"""
-        self.cache = {}
+        self.cache.clear()
+        self.bar_store.clear()
+        # Remove per-range pickle files left by older versions
         for file in os.listdir(self.cache_dir):
             if file.endswith('.pkl'):
                 os.remove(os.path.join(self.cache_dir, file)) 
\ No newline at end of file
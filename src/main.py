@@ -50,6 +50,7 @@ ACTIVE_AGENTS = {
 
 def run_agents(selected_symbols=None, single_run=False):
     """Run all active agents in sequence"""
+    trading_agent = None
     try:
         # Use all symbols if none selected
         if not selected_symbols:
@@ -72,9 +73,7 @@ def run_agents(selected_symbols=None, single_run=False):
                 if trading_agent:
                     cprint("\n🤖 Running Trading Analysis...", "cyan")
                     # Don't use the built-in run() method which loops over all pairs
-                    for pair in selected_symbols:
-                        cprint(f"\n📊 Analyzing {pair}...", "cyan")
-                        trading_agent.analyze_pair(pair)
+                    trading_agent.analyze_pairs(selected_symbols)
                     # Display summary of recommendations
                     trading_agent.display_all_recommendations()
                     
@@ -120,6 +119,10 @@ def run_agents(selected_symbols=None, single_run=False):
     except Exception as e:
         cprint(f"\n❌ Fatal error in main loop: {str(e)}", "red")
         raise
+    finally:
+        # Stop the analysis worker processes
+        if trading_agent:
+            trading_agent.shutdown()
 
 def run_backtesting(strategy, symbol, start_date=None, end_date=None, timeframe='1d', show_charts=True):
     """Run backtesting for a specified strategy and symbol"""
@@ -57,6 +57,121 @@ class BaseStrategy(ABC):
         """
         pass
     
+    def generate_signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Generate the bar-by-bar action array for the whole frame in one pass.
+        
+        Element i must equal the action ``get_recommendation(data.iloc[:i+1])``
+        returns, encoded as 1 (buy), -1 (sell) or 0 (hold). Strategies whose
+        recommendations depend only on past bars can override this to enable
+        the vectorized backtest mode.
+        
+        Args:
+            data: DataFrame containing price and volume data
+            
+        Returns:
+            Integer array of actions, one per bar
+        """
+        raise NotImplementedError(f"{self.name} does not support vectorized signal generation")
+    
+    @property
+    def supports_vectorized(self) -> bool:
+        """Whether the strategy implements generate_signal_array"""
+        return type(self).generate_signal_array is not BaseStrategy.generate_signal_array
+    
+    def generate_signal_matrix(self, prices: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Generate action arrays for many price paths at once.
+        
+        Row p must equal ``generate_signal_array`` applied to path p. Used by
+        batched Monte Carlo simulation.
+        
+        Args:
+            prices: 'open', 'high', 'low', 'close' and 'volume' arrays of shape (n_paths, n_bars)
+            
+        Returns:
+            Integer array of actions of shape (n_paths, n_bars)
+        """
+        raise NotImplementedError(f"{self.name} does not support batched signal generation")
+    
+    @property
+    def supports_batch(self) -> bool:
+        """Whether the strategy implements generate_signal_matrix"""
+        return type(self).generate_signal_matrix is not BaseStrategy.generate_signal_matrix
+    
+    def generate_param_signal_matrix(self, data: pd.DataFrame, param_sets: List[Dict]) -> np.ndarray:
+        """
+        Generate action arrays for many parameter sets on the same data.
+        
+        Row k must equal ``generate_signal_array(data)`` for a copy of the
+        strategy whose params are updated with ``param_sets[k]``. Indicators
+        shared between parameter sets should be computed once. Used by
+        batched parameter optimization.
+        
+        Args:
+            data: DataFrame containing price and volume data
+            param_sets: Parameter overrides, one dictionary per row
+            
+        Returns:
+            Integer array of actions of shape (len(param_sets), n_bars)
+        """
+        raise NotImplementedError(f"{self.name} does not support batched parameter evaluation")
+    
+    @property
+    def supports_param_batch(self) -> bool:
+        """Whether the strategy implements generate_param_signal_matrix"""
+        return type(self).generate_param_signal_matrix is not BaseStrategy.generate_param_signal_matrix
+    
+    def generate_order_arrays(self,
+                              data: pd.DataFrame,
+                              symbol: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Generate per-bar entry signals with their protective levels.
+        
+        Element i is the signal ``generate_signals`` emits at bar i, encoded
+        as 1 (buy), -1 (sell) or 0 (none), together with the stop_loss and
+        take_profit that signal carries (NaN without a signal or level). Used
+        by the event-driven backtester to place bracket orders.
+        
+        Args:
+            data: DataFrame containing price and volume data
+            symbol: Trading symbol, for strategies whose levels depend on the
+                    instrument (as in their live signals)
+            
+        Returns:
+            (signal codes, stop loss, take profit), one element per bar
+        """
+        raise NotImplementedError(f"{self.name} does not support order generation")
+    
+    @property
+    def supports_orders(self) -> bool:
+        """Whether the strategy implements generate_order_arrays"""
+        return type(self).generate_order_arrays is not BaseStrategy.generate_order_arrays
+    
+    @staticmethod
+    def recent_signal_actions(signal_codes: np.ndarray, lookback: int) -> np.ndarray:
+        """
+        Convert per-bar signal codes into per-bar recommendation actions.
+        
+        Mirrors the "latest signal is recent" rule used by get_recommendation:
+        the action at bar i is the most recent non-zero signal code, provided it
+        fired within the last ``lookback`` bars, otherwise hold.
+        
+        Args:
+            signal_codes: Array of 1 (buy), -1 (sell) or 0 (no signal) per bar;
+                          2-D arrays are processed row by row (one path per row)
+            lookback: Number of bars (including the current one) a signal stays actionable
+            
+        Returns:
+            Integer array of actions, one per bar
+        """
+        signal_codes = np.asarray(signal_codes)
+        positions = np.arange(signal_codes.shape[-1])
+        last_signal = np.maximum.accumulate(np.where(signal_codes != 0, positions, -1), axis=-1)
+        actions = np.take_along_axis(signal_codes, np.maximum(last_signal, 0), axis=-1)
+        actions = np.where((last_signal >= 0) & (positions - last_signal < lookback), actions, 0)
+        return actions.astype(np.int8)
+    
     def validate_data(self, data: pd.DataFrame) -> bool:
         """
         Validate input data has required columns and format.
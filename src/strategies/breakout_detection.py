@@ -2,6 +2,7 @@ from typing import Dict, List, Tuple
 import pandas as pd
 import numpy as np
 from .base_strategy import BaseStrategy
+from ..utils.indicator_kernels import find_extrema
 
 class BreakoutDetectionStrategy(BaseStrategy):
     """
@@ -22,70 +23,85 @@ class BreakoutDetectionStrategy(BaseStrategy):
     
     def find_support_resistance(self, data: pd.DataFrame) -> Dict:
         """Find key support and resistance levels"""
-        levels = {
-            'support': [],
-            'resistance': []
-        }
-        
-        # Use rolling window to find local minima and maxima
+        # Support levels are local minima of the lows, resistance levels local maxima of the highs
         window = self.params['lookback_period']
+        resistance_index, support_index = find_extrema(
+            data['high'].to_numpy(dtype=float), data['low'].to_numpy(dtype=float), window
+        )
         
-        for i in range(window, len(data) - window):
-            # Find support levels (local minima)
-            if (data['low'].iloc[i] < data['low'].iloc[i-window:i]).all() and \
-               (data['low'].iloc[i] < data['low'].iloc[i+1:i+window+1]).all():
-                levels['support'].append({
-                    'price': data['low'].iloc[i],
-                    'timestamp': data.index[i]
-                })
-            
-            # Find resistance levels (local maxima)
-            if (data['high'].iloc[i] > data['high'].iloc[i-window:i]).all() and \
-               (data['high'].iloc[i] > data['high'].iloc[i+1:i+window+1]).all():
-                levels['resistance'].append({
-                    'price': data['high'].iloc[i],
-                    'timestamp': data.index[i]
-                })
+        levels = {
+            'support': [
+                {'price': data['low'].iloc[i], 'timestamp': data.index[i]} for i in support_index
+            ],
+            'resistance': [
+                {'price': data['high'].iloc[i], 'timestamp': data.index[i]} for i in resistance_index
+            ]
+        }
         
         return levels
     
     def detect_breakouts(self, data: pd.DataFrame, levels: Dict) -> List[Dict]:
-        """Detect breakouts with volume confirmation"""
-        breakouts = []
-        avg_volume = data['volume'].rolling(window=self.params['lookback_period']).mean()
+        """
+        Detect breakouts with volume confirmation.
         
-        for i in range(len(data)):
-            current_price = data['close'].iloc[i]
-            current_volume = data['volume'].iloc[i]
-            
-            # Check for resistance breakouts
-            for level in levels['resistance']:
-                if (current_price > level['price'] * (1 + self.params['min_breakout_percentage']) and
-                    current_volume > avg_volume.iloc[i] * self.params['volume_threshold']):
-                    breakouts.append({
-                        'timestamp': data.index[i],
-                        'type': 'bullish',
-                        'breakout_price': current_price,
-                        'level_price': level['price'],
-                        'volume_ratio': current_volume / avg_volume.iloc[i],
-                        'confidence': min(0.9, current_volume / (avg_volume.iloc[i] * 2))
-                    })
+        A level found at bar j takes lookback_period later bars to confirm,
+        so it can only be broken from bar j + lookback_period on. Each bar
+        reports at most one bullish and one bearish breakout, against the
+        nearest broken level, with the number of levels it cleared.
+        
+        Args:
+            data: DataFrame containing price and volume data
+            levels: Support and resistance levels from find_support_resistance
             
-            # Check for support breakouts
-            for level in levels['support']:
-                if (current_price < level['price'] * (1 - self.params['min_breakout_percentage']) and
-                    current_volume > avg_volume.iloc[i] * self.params['volume_threshold']):
+        Returns:
+            List of breakouts in bar order
+        """
+        window = self.params['lookback_period']
+        margin = self.params['min_breakout_percentage']
+        close = data['close'].to_numpy(dtype=float)
+        volume = data['volume'].to_numpy(dtype=float)
+        avg_volume = data['volume'].rolling(window=window).mean().to_numpy()
+        
+        # Only bars with a volume surge can break anything
+        with np.errstate(invalid='ignore'):
+            bars = np.flatnonzero((volume > avg_volume * self.params['volume_threshold']) & np.isfinite(close))
+        
+        # A bullish breakout closes above level * (1 + margin), a bearish one below level * (1 - margin)
+        resistance, resistance_at = self._level_arrays(data, levels['resistance'], window)
+        support, support_at = self._level_arrays(data, levels['support'], window)
+        bullish_count, bullish_level = _levels_below(resistance * (1 + margin), resistance_at, bars, close[bars])
+        bearish_count, bearish_level = _levels_below(-(support * (1 - margin)), support_at, bars, -close[bars])
+        
+        breakouts = []
+        for k, i in enumerate(bars):
+            volume_ratio = volume[i] / avg_volume[i]
+            for direction, count, level, prices in (
+                ('bullish', bullish_count[k], bullish_level[k], resistance),
+                ('bearish', bearish_count[k], bearish_level[k], support)
+            ):
+                if count:
                     breakouts.append({
                         'timestamp': data.index[i],
-                        'type': 'bearish',
-                        'breakout_price': current_price,
-                        'level_price': level['price'],
-                        'volume_ratio': current_volume / avg_volume.iloc[i],
-                        'confidence': min(0.9, current_volume / (avg_volume.iloc[i] * 2))
+                        'type': direction,
+                        'breakout_price': close[i],
+                        'level_price': prices[level],
+                        'levels_broken': int(count),
+                        'volume_ratio': volume_ratio,
+                        'confidence': min(0.9, volume[i] / (avg_volume[i] * 2))
                     })
         
         return breakouts
     
+    @staticmethod
+    def _level_arrays(data: pd.DataFrame, levels: List[Dict], window: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Level prices and the bar from which each is confirmed, ordered by confirmation"""
+        prices = np.array([level['price'] for level in levels], dtype=float)
+        positions = data.index.get_indexer([level['timestamp'] for level in levels])
+        # Levels from outside the data are known from the start
+        confirmed_at = np.where(positions >= 0, positions + window, 0)
+        order = np.argsort(confirmed_at, kind='stable')
+        return prices[order], confirmed_at[order]
+    
     def analyze(self, data: pd.DataFrame) -> Dict:
         """Analyze market data for breakouts"""
         if not self.validate_data(data):
@@ -113,6 +129,7 @@ class BreakoutDetectionStrategy(BaseStrategy):
                 'confidence': breakout['confidence'],
                 'price': breakout['breakout_price'],
                 'level_price': breakout['level_price'],
+                'levels_broken': breakout['levels_broken'],
                 'volume_ratio': breakout['volume_ratio'],
                 'signal_type': 'breakout'
             }
@@ -138,4 +155,41 @@ class BreakoutDetectionStrategy(BaseStrategy):
             'level_price': latest_signal['level_price'],
             'volume_ratio': latest_signal['volume_ratio'],
             'reason': f'Breakout {latest_signal["type"]} signal with volume confirmation'
-        } 
\ No newline at end of file
+        } 
+
+def _levels_below(thresholds: np.ndarray, confirmed_at: np.ndarray,
+                  bars: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Count the confirmed thresholds below each query value.
+    
+    Thresholds are added to a sorted array in order of confirmation, and
+    every run of query bars between two confirmations is answered with one
+    searchsorted call against the levels confirmed so far.
+    
+    Args:
+        thresholds: Level thresholds, ordered by confirmed_at
+        confirmed_at: First bar at which each level may be used (non-decreasing)
+        bars: Query bars (increasing)
+        values: Value at each query bar
+        
+    Returns:
+        (count, level) per query bar - the number of thresholds strictly below
+        the value, and the position (in thresholds) of the highest of them
+    """
+    counts = np.zeros(len(bars), dtype=int)
+    nearest = np.full(len(bars), -1)
+    # Query bars [starts[k], starts[k + 1]) see levels 0..k
+    starts = np.append(np.searchsorted(bars, confirmed_at, side='left'), len(bars))
+    sorted_thresholds = np.empty(0)
+    sorted_levels = np.empty(0, dtype=int)
+    for k, threshold in enumerate(thresholds):
+        slot = np.searchsorted(sorted_thresholds, threshold, side='left')
+        sorted_thresholds = np.insert(sorted_thresholds, slot, threshold)
+        sorted_levels = np.insert(sorted_levels, slot, k)
+        lo, hi = starts[k], starts[k + 1]
+        if lo == hi:
+            continue
+        below = np.searchsorted(sorted_thresholds, values[lo:hi], side='left')
+        counts[lo:hi] = below
+        nearest[lo:hi] = np.where(below > 0, sorted_levels[below - 1], -1)
+    return counts, nearest
@@ -8,7 +8,7 @@ import pandas as pd
 import numpy as np
 import pandas as pd
 from termcolor import cprint
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 class KishokaStrategy(BaseStrategy):
     def __init__(self, name: str = "Kishoka Killswitch Strategy", params: Dict = None):
@@ -145,6 +145,61 @@ class KishokaStrategy(BaseStrategy):
                 'reason': 'No recent Kishoka signals'
             }
         
+    def generate_signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Generate the per-bar recommendation actions in a single pass.
+        
+        The Kishoka state machine only looks backwards, so one run over the
+        full frame yields the same entries as running it on every prefix.
+        
+        Args:
+            data: DataFrame containing price and volume data
+            
+        Returns:
+            Integer array of actions (1 buy, -1 sell, 0 hold), one per bar
+        """
+        if not self.validate_data(data):
+            return np.zeros(len(data), dtype=np.int8)
+            
+        signal_codes = self._entry_codes(self._apply_kishoka_strategy(data, 0.0001))
+        
+        # Signals stay actionable for the last three bars
+        return self.recent_signal_actions(signal_codes, lookback=3)
+        
+    def generate_order_arrays(self,
+                              data: pd.DataFrame,
+                              symbol: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Generate per-bar entry signals with the swing-based stop loss and take profit.
+        
+        Args:
+            data: DataFrame containing price and volume data
+            symbol: Trading symbol, whose pip size scales the stop and target
+                    offsets as in generate_signal (0.0001 if not given)
+            
+        Returns:
+            (signal codes, stop loss, take profit) as emitted by generate_signals
+        """
+        if not self.validate_data(data):
+            return np.zeros(len(data), dtype=np.int8), np.full(len(data), np.nan), np.full(len(data), np.nan)
+            
+        pip_size = self._get_pip_size(symbol) if symbol else 0.0001
+        result = self._apply_kishoka_strategy(data, pip_size)
+        signal_codes = self._entry_codes(result)
+        has_signal = signal_codes != 0
+        stop_loss = np.where(has_signal, result['stop_loss'].to_numpy(dtype=float), np.nan)
+        take_profit = np.where(has_signal, result['take_profit'].to_numpy(dtype=float), np.nan)
+        return signal_codes, stop_loss, take_profit
+        
+    @staticmethod
+    def _entry_codes(result: pd.DataFrame) -> np.ndarray:
+        """Signal codes of the bars where a position opens from flat"""
+        position = result['position'].to_numpy(dtype=float)
+        previous = np.concatenate(([0.0], position[:-1]))
+        signal_codes = np.where((position != 0) & (previous == 0), np.sign(position), 0).astype(np.int8)
+        signal_codes[:1] = 0
+        return signal_codes
+        
     def generate_signal(self, pair, data):
         """
         Generate trading signals based on Kishoka Killswitch strategy
@@ -227,6 +282,9 @@ class KishokaStrategy(BaseStrategy):
         """
         Apply the Kishoka Killswitch strategy logic
         
+        The state machine runs over plain NumPy arrays with preallocated
+        outputs; the frame is only written once at the end.
+        
         Args:
             df (pd.DataFrame): OHLC data with datetime index
             pip_size (float): Value of 1 pip in price units
@@ -235,108 +293,127 @@ class KishokaStrategy(BaseStrategy):
             pd.DataFrame: DataFrame with signals and positions
         """
         data = df.copy()
-        data['position'] = 0  # 1 for long, -1 for short
-        data['entry_price'] = np.nan
-        data['stop_loss'] = np.nan
-        data['take_profit'] = np.nan
+        n = len(data)
         
         # Calculate swing highs and lows
-        data['swing_high'] = data['high'].rolling(self.swing_length).max()
-        data['swing_low'] = data['low'].rolling(self.swing_length).min()
+        swing_high = data['high'].rolling(self.swing_length).max()
+        swing_low = data['low'].rolling(self.swing_length).min()
         
         # Identify swing points
-        data['is_swing_high'] = data['high'] >= data['swing_high']
-        data['is_swing_low'] = data['low'] <= data['swing_low']
+        is_swing_high = data['high'] >= swing_high
+        is_swing_low = data['low'] <= swing_low
+        
+        # Plain Python sequences are the fastest to index inside the loop
+        highs = data['high'].to_numpy(dtype=float).tolist()
+        lows = data['low'].to_numpy(dtype=float).tolist()
+        closes = data['close'].to_numpy(dtype=float).tolist()
+        opens = data['open'].to_numpy(dtype=float).tolist()
+        swing_high_flags = is_swing_high.to_numpy().tolist()
+        swing_low_flags = is_swing_low.to_numpy().tolist()
+        
+        # Preallocated outputs
+        position = np.zeros(n)  # 1 for long, -1 for short
+        entry_price = np.full(n, np.nan)
+        stop_loss = np.full(n, np.nan)
+        take_profit = np.full(n, np.nan)
+        fib_names = [f'fib_{int(level*100)}' for level in self.fib_levels]
+        fib_values = {name: np.full(n, np.nan) for name in fib_names}
+        fib_0 = fib_values.get('fib_0')
+        fib_50 = fib_values.get('fib_50')
+        fib_100 = fib_values.get('fib_100')
+        
+        stop_offset = self.stop_loss_pips * pip_size
+        profit_offset = self.profit_secure_pips * pip_size
+        breakeven_distance = self.risk_free_offset * pip_size
+        partially_closed = False
         
         # Track last valid swing points
         last_swing_high = np.nan
         last_swing_low = np.nan
-        fib_range = 0
-        
-        # Fibonacci levels storage
-        for level in self.fib_levels:
-            data[f'fib_{int(level*100)}'] = np.nan
         
-        for i in range(1, len(data)):
+        for i in range(1, n):
             # Update swing points
-            if data['is_swing_high'].iloc[i]:
-                last_swing_high = data['high'].iloc[i]
-            if data['is_swing_low'].iloc[i]:
-                last_swing_low = data['low'].iloc[i]
+            if swing_high_flags[i]:
+                last_swing_high = highs[i]
+            if swing_low_flags[i]:
+                last_swing_low = lows[i]
             
             # Calculate Fibonacci levels
             if not np.isnan(last_swing_high) and not np.isnan(last_swing_low):
                 fib_range = last_swing_high - last_swing_low
-                for level in self.fib_levels:
-                    fib_value = last_swing_low + fib_range * level
-                    data.loc[data.index[i], f'fib_{int(level*100)}'] = fib_value
+                for name, level in zip(fib_names, self.fib_levels):
+                    fib_values[name][i] = last_swing_low + fib_range * level
             
-            # Entry conditions
-            current_low = data['low'].iloc[i]
-            current_high = data['high'].iloc[i]
-            close = data['close'].iloc[i]
-            open_price = data['open'].iloc[i]
+            close = closes[i]
+            fib_50_value = fib_50[i] if fib_50 is not None else np.nan
             
-            # Check if Fibonacci levels are available
-            if f'fib_0' in data.columns and i > 0:
-                fib_0 = data['fib_0'].iloc[i]
-                fib_50 = data['fib_50'].iloc[i] if 'fib_50' in data.columns else np.nan
-                fib_100 = data['fib_100'].iloc[i] if 'fib_100' in data.columns else np.nan
+            # Entry conditions (only evaluated when the 0 level is configured)
+            if fib_0 is not None:
+                fib_0_value = fib_0[i]
+                fib_100_value = fib_100[i] if fib_100 is not None else np.nan
                 
                 # Bullish rejection
-                if (not np.isnan(fib_0) and 
-                    current_low > fib_0 and 
-                    close > open_price and 
-                    close > fib_50 and 
-                    data['position'].iloc[i-1] == 0):
+                if (not np.isnan(fib_0_value) and 
+                    lows[i] > fib_0_value and 
+                    close > opens[i] and 
+                    close > fib_50_value and 
+                    position[i-1] == 0):
                     
-                    data.loc[data.index[i], 'position'] = 1
-                    data.loc[data.index[i], 'entry_price'] = close
-                    data.loc[data.index[i], 'stop_loss'] = last_swing_low - (self.stop_loss_pips * pip_size)
-                    data.loc[data.index[i], 'take_profit'] = close + (self.profit_secure_pips * pip_size)
+                    position[i] = 1
+                    entry_price[i] = close
+                    stop_loss[i] = last_swing_low - stop_offset
+                    take_profit[i] = close + profit_offset
                 
                 # Bearish rejection
-                elif (not np.isnan(fib_100) and 
-                     current_high < fib_100 and 
-                     close < open_price and 
-                     close < fib_50 and 
-                     data['position'].iloc[i-1] == 0):
+                elif (not np.isnan(fib_100_value) and 
+                      highs[i] < fib_100_value and 
+                      close < opens[i] and 
+                      close < fib_50_value and 
+                      position[i-1] == 0):
                     
-                    data.loc[data.index[i], 'position'] = -1
-                    data.loc[data.index[i], 'entry_price'] = close
-                    data.loc[data.index[i], 'stop_loss'] = last_swing_high + (self.stop_loss_pips * pip_size)
-                    data.loc[data.index[i], 'take_profit'] = close - (self.profit_secure_pips * pip_size)
+                    position[i] = -1
+                    entry_price[i] = close
+                    stop_loss[i] = last_swing_high + stop_offset
+                    take_profit[i] = close - profit_offset
             
             # Risk management - copy from previous position if no new entry
-            elif data['position'].iloc[i-1] != 0 and data['position'].iloc[i] == 0:
-                data.loc[data.index[i], 'position'] = data['position'].iloc[i-1]
-                data.loc[data.index[i], 'entry_price'] = data['entry_price'].iloc[i-1]
-                data.loc[data.index[i], 'stop_loss'] = data['stop_loss'].iloc[i-1]
-                data.loc[data.index[i], 'take_profit'] = data['take_profit'].iloc[i-1]
-                
-                # Current values for risk management
-                entry = data['entry_price'].iloc[i]
-                current_close = data['close'].iloc[i]
+            elif position[i-1] != 0 and position[i] == 0:
+                position[i] = position[i-1]
+                entry_price[i] = entry_price[i-1]
+                stop_loss[i] = stop_loss[i-1]
+                take_profit[i] = take_profit[i-1]
+                entry = entry_price[i]
                 
                 # Move to breakeven
-                if entry is not None and not np.isnan(entry):
-                    if abs(current_close - entry) >= self.risk_free_offset * pip_size:
-                        data.loc[data.index[i], 'stop_loss'] = entry
+                if not np.isnan(entry) and abs(close - entry) >= breakeven_distance:
+                    stop_loss[i] = entry
                     
                 # Partial close at 50% level if we have the Fibonacci levels
-                if not np.isnan(fib_50):
-                    if ((data['position'].iloc[i] == 1 and current_close >= fib_50) or 
-                        (data['position'].iloc[i] == -1 and current_close <= fib_50)):
+                if not np.isnan(fib_50_value):
+                    if ((position[i] == 1 and close >= fib_50_value) or 
+                        (position[i] == -1 and close <= fib_50_value)):
                         # Scale position size down to 0.5 (partial close)
-                        data.loc[data.index[i], 'position'] = data['position'].iloc[i] * 0.5
+                        position[i] = position[i] * 0.5
+                        partially_closed = True
                     
                 # Check stop loss and take profit
-                sl = data['stop_loss'].iloc[i]
-                tp = data['take_profit'].iloc[i]
-                
+                sl = stop_loss[i]
+                tp = take_profit[i]
                 if not np.isnan(sl) and not np.isnan(tp):
-                    if ((data['position'].iloc[i] == 1 and (current_close <= sl or current_close >= tp)) or
-                        (data['position'].iloc[i] == -1 and (current_close >= sl or current_close <= tp))):
-                        data.loc[data.index[i], 'position'] = 0  # Close position
+                    if ((position[i] == 1 and (close <= sl or close >= tp)) or
+                        (position[i] == -1 and (close >= sl or close <= tp))):
+                        position[i] = 0  # Close position
+        
+        # Write all outputs into the frame once
+        data['position'] = position if partially_closed else position.astype(np.int64)
+        data['entry_price'] = entry_price
+        data['stop_loss'] = stop_loss
+        data['take_profit'] = take_profit
+        data['swing_high'] = swing_high
+        data['swing_low'] = swing_low
+        data['is_swing_high'] = is_swing_high
+        data['is_swing_low'] = is_swing_low
+        for name in fib_names:
+            data[name] = fib_values[name]
         
-        return data 
\ No newline at end of file
+        return data
@@ -3,9 +3,45 @@ Moving Average Crossover Strategy
 """
 from src.strategies.base_strategy import BaseStrategy
 from src.config import MOVING_AVERAGES
+from src.utils.indicator_kernels import rolling_means
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+ATR_PERIOD = 14
+
+def _atr_missing(data: pd.DataFrame) -> np.ndarray:
+    """Bars where analyze() has no ATR value"""
+    if 'atr' in data.columns:
+        return data['atr'].isna().to_numpy()
+    # Rolling mean of the true range, which skips missing terms
+    high, low, prev_close = data['high'], data['low'], data['close'].shift(1)
+    true_range = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+    return true_range.rolling(window=ATR_PERIOD).count().to_numpy() < ATR_PERIOD
+
+def _signal_codes(close: np.ndarray, fast_ma: np.ndarray, slow_ma: np.ndarray) -> np.ndarray:
+    """Per-bar signal codes (rows are paths or parameter sets), before ATR masking"""
+    # NaN comparisons are False, as in the DataFrame version
+    with np.errstate(invalid='ignore'):
+        fast_ma_above = fast_ma > slow_ma
+        price_vs_fast_ma = close - fast_ma
+        price_vs_slow_ma_pct = (close - slow_ma) / close
+        crossover = np.zeros_like(fast_ma_above)
+        crossover[:, 1:] = fast_ma_above[:, 1:] != fast_ma_above[:, :-1]
+        
+        # Same precedence as generate_signals: crossovers first, then trend continuation
+        signal_codes = np.select(
+            [
+                crossover & fast_ma_above,
+                crossover & ~fast_ma_above,
+                fast_ma_above & (price_vs_fast_ma > 0) & (price_vs_slow_ma_pct > 0.02),
+                ~fast_ma_above & (price_vs_fast_ma < 0) & (price_vs_slow_ma_pct < -0.02)
+            ],
+            [1, -1, 1, -1],
+            default=0
+        )
+    signal_codes[:, :1] = 0
+    return signal_codes
 
 class MovingAverageStrategy(BaseStrategy):
     def __init__(self, name: str = "Moving Average Strategy", params: Dict = None):
@@ -58,7 +94,7 @@ class MovingAverageStrategy(BaseStrategy):
             
             ranges = pd.concat([high_low, high_close, low_close], axis=1)
             true_range = ranges.max(axis=1)
-            result['atr'] = true_range.rolling(window=14).mean()
+            result['atr'] = true_range.rolling(window=ATR_PERIOD).mean()
         
         # Identify crossovers
         result['fast_ma_above'] = result[fast_ma_col] > result[slow_ma_col]
@@ -163,6 +199,121 @@ class MovingAverageStrategy(BaseStrategy):
                 
         return signals
     
+    def generate_signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Generate the per-bar recommendation actions in a single pass.
+        
+        Equivalent to calling get_recommendation on every growing prefix of
+        the data, since all moving average columns only look backwards.
+        
+        Args:
+            data: DataFrame containing price and volume data
+            
+        Returns:
+            Integer array of actions (1 buy, -1 sell, 0 hold), one per bar
+        """
+        if not self.validate_data(data):
+            return np.zeros(len(data), dtype=np.int8)
+            
+        signal_codes = self._frame_signal_codes(self.analyze(data)['analysis_data'])
+        
+        # Signals stay actionable for the current and previous bar
+        return self.recent_signal_actions(signal_codes, lookback=2)
+    
+    def generate_order_arrays(self,
+                              data: pd.DataFrame,
+                              symbol: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Generate per-bar entry signals with their ATR-based stop loss and take profit.
+        
+        Args:
+            data: DataFrame containing price and volume data
+            symbol: Trading symbol (unused: ATR levels are already in price units)
+            
+        Returns:
+            (signal codes, stop loss, take profit) as emitted by generate_signals
+        """
+        if not self.validate_data(data):
+            return np.zeros(len(data), dtype=np.int8), np.full(len(data), np.nan), np.full(len(data), np.nan)
+            
+        result = self.analyze(data)['analysis_data']
+        signal_codes = self._frame_signal_codes(result)
+        close = result['close'].to_numpy(dtype=float)
+        atr = result['atr'].to_numpy(dtype=float)
+        
+        # Stops sit below longs and above shorts, targets the other way
+        has_signal = signal_codes != 0
+        stop_loss = np.where(has_signal, close - signal_codes * atr * self.params['stop_loss_multiplier'], np.nan)
+        take_profit = np.where(has_signal, close + signal_codes * atr * self.params['take_profit_multiplier'], np.nan)
+        return signal_codes, stop_loss, take_profit
+    
+    def _frame_signal_codes(self, result: pd.DataFrame) -> np.ndarray:
+        """Per-bar signal codes from analyze() output, as generate_signals emits them"""
+        signal_codes = _signal_codes(
+            result['close'].to_numpy(dtype=float)[None, :],
+            result[f"sma_{self.params['fast_period']}"].to_numpy(dtype=float)[None, :],
+            result[f"sma_{self.params['slow_period']}"].to_numpy(dtype=float)[None, :]
+        )[0]
+        signal_codes[result['atr'].isna().to_numpy()] = 0
+        return signal_codes
+    
+    def generate_signal_matrix(self, prices: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Generate per-bar actions for many price paths at once.
+        
+        Row-wise equivalent of generate_signal_array for paths without
+        precomputed moving average or ATR columns.
+        
+        Args:
+            prices: 'close' (and other OHLCV) arrays of shape (n_paths, n_bars)
+            
+        Returns:
+            Integer array of actions of shape (n_paths, n_bars)
+        """
+        close = np.asarray(prices['close'], dtype=float)
+        moving_averages = rolling_means(close, [self.params['fast_period'], self.params['slow_period']])
+        signal_codes = _signal_codes(
+            close, moving_averages[self.params['fast_period']], moving_averages[self.params['slow_period']]
+        )
+        # No signals until the 14-bar ATR exists (bars 0-12 for finite prices)
+        signal_codes[:, :ATR_PERIOD - 1] = 0
+        
+        return self.recent_signal_actions(signal_codes, lookback=2)
+    
+    def generate_param_signal_matrix(self, data: pd.DataFrame, param_sets: List[Dict]) -> np.ndarray:
+        """
+        Generate per-bar actions for many parameter sets in one pass.
+        
+        Every distinct moving average length in the parameter sets is
+        computed once, from a single cumulative sum; each parameter set is
+        then a row of one signal matrix.
+        
+        Args:
+            data: DataFrame containing price and volume data
+            param_sets: Parameter overrides, one dictionary per row
+            
+        Returns:
+            Integer array of actions of shape (len(param_sets), n_bars)
+        """
+        params = [dict(self.params, **overrides) for overrides in param_sets]
+        if not self.validate_data(data):
+            return np.zeros((len(params), len(data)), dtype=np.int8)
+        
+        close = data['close'].to_numpy(dtype=float)
+        periods = {p['fast_period'] for p in params} | {p['slow_period'] for p in params}
+        moving_averages = rolling_means(close, [p for p in periods if f'sma_{p}' not in data.columns])
+        # Precomputed columns take precedence, as in analyze()
+        moving_averages.update({p: data[f'sma_{p}'].to_numpy(dtype=float) for p in periods if f'sma_{p}' in data.columns})
+        
+        signal_codes = _signal_codes(
+            close[None, :],
+            np.stack([moving_averages[p['fast_period']] for p in params]),
+            np.stack([moving_averages[p['slow_period']] for p in params])
+        )
+        signal_codes[:, _atr_missing(data)] = 0
+        
+        return self.recent_signal_actions(signal_codes, lookback=2)
+    
     def get_recommendation(self, data: pd.DataFrame) -> Dict:
         """
         Generate a trading recommendation based on current market conditions.
@@ -2,6 +2,126 @@ from typing import Dict, List, Tuple
 import pandas as pd
 import numpy as np
 from .base_strategy import BaseStrategy
+from ..utils.indicator_kernels import find_extrema
+
+EXTREMUM_WINDOW = 5  # Bars on each side of a peak/trough
+
+# Bar positions of the three peaks and the two troughs between them
+HEAD_AND_SHOULDERS_DTYPE = np.dtype([
+    ('left_shoulder', np.intp), ('head', np.intp), ('right_shoulder', np.intp),
+    ('left_trough', np.intp), ('right_trough', np.intp), ('neckline', float)
+])
+# Bar positions of the two tops (bottoms) and the opposite extremum between them
+DOUBLE_PATTERN_DTYPE = np.dtype([('first', np.intp), ('second', np.intp), ('middle', np.intp)])
+
+def _extreme_between(bounds: np.ndarray, positions: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    For each pair of consecutive bounds, find the lowest value strictly between them.
+    
+    Args:
+        bounds: Increasing bar positions (e.g. peaks)
+        positions: Increasing bar positions of the candidates (e.g. troughs)
+        values: Value of each candidate (negate to find the highest)
+        
+    Returns:
+        Candidate number of the lowest value per gap (len(bounds) - 1), -1 for empty gaps
+    """
+    lowest = np.full(max(len(bounds) - 1, 0), -1, dtype=np.intp)
+    if len(bounds) < 2 or len(positions) == 0:
+        return lowest
+    # bounds[gap] < position <= bounds[gap + 1]; a candidate on a bound belongs to no gap
+    upper = np.searchsorted(bounds, positions, side='left')
+    gap = upper - 1
+    inside = (gap >= 0) & (upper < len(bounds))
+    inside[inside] = bounds[upper[inside]] != positions[inside]
+    candidates = np.flatnonzero(inside)
+    # Sort by gap, then value; the first candidate of each gap is its lowest
+    order = candidates[np.lexsort((values[candidates], gap[candidates]))]
+    gaps, first = np.unique(gap[order], return_index=True)
+    lowest[gaps] = order[first]
+    return lowest
+
+def find_head_and_shoulders(peak_index: np.ndarray, peak_price: np.ndarray,
+                            trough_index: np.ndarray, trough_price: np.ndarray,
+                            threshold: float) -> np.ndarray:
+    """
+    Head-and-shoulders tops over arrays of local extrema.
+    
+    Any three consecutive peaks whose middle one is the highest form a
+    pattern when the shoulders differ by less than threshold * head and
+    each gap between them holds a trough. The neckline is the lower of
+    the two intervening troughs.
+    
+    Args:
+        peak_index, peak_price: Bar positions (increasing) and prices of the peaks
+        trough_index, trough_price: Bar positions (increasing) and prices of the troughs
+        threshold: Maximum shoulder difference as a fraction of the head price
+        
+    Returns:
+        Structured array of HEAD_AND_SHOULDERS_DTYPE, ordered by head
+    """
+    peak_index = np.asarray(peak_index, dtype=np.intp)
+    peak_price = np.asarray(peak_price, dtype=float)
+    trough_index = np.asarray(trough_index, dtype=np.intp)
+    trough_price = np.asarray(trough_price, dtype=float)
+    if len(peak_index) < 3:
+        return np.empty(0, dtype=HEAD_AND_SHOULDERS_DTYPE)
+    
+    gap_trough = _extreme_between(peak_index, trough_index, trough_price)
+    left, head, right = peak_price[:-2], peak_price[1:-1], peak_price[2:]
+    with np.errstate(invalid='ignore'):
+        matched = (
+            (head > left) & (head > right)
+            & (np.abs(left - right) < threshold * head)
+            & (gap_trough[:-1] >= 0) & (gap_trough[1:] >= 0)
+        )
+    k = np.flatnonzero(matched)
+    left_trough, right_trough = gap_trough[k], gap_trough[k + 1]
+    
+    patterns = np.empty(len(k), dtype=HEAD_AND_SHOULDERS_DTYPE)
+    patterns['left_shoulder'] = peak_index[k]
+    patterns['head'] = peak_index[k + 1]
+    patterns['right_shoulder'] = peak_index[k + 2]
+    patterns['left_trough'] = trough_index[left_trough]
+    patterns['right_trough'] = trough_index[right_trough]
+    patterns['neckline'] = np.minimum(trough_price[left_trough], trough_price[right_trough])
+    return patterns
+
+def find_double_tops(peak_index: np.ndarray, peak_price: np.ndarray,
+                     trough_index: np.ndarray, trough_price: np.ndarray,
+                     threshold: float) -> np.ndarray:
+    """
+    Double tops: consecutive peaks within threshold * first peak of each
+    other, with the lowest trough between them as the middle.
+    
+    Call with negated prices and peaks/troughs swapped for double bottoms.
+    
+    Returns:
+        Structured array of DOUBLE_PATTERN_DTYPE, ordered by second top
+    """
+    peak_index = np.asarray(peak_index, dtype=np.intp)
+    peak_price = np.asarray(peak_price, dtype=float)
+    if len(peak_index) < 2:
+        return np.empty(0, dtype=DOUBLE_PATTERN_DTYPE)
+    
+    gap_trough = _extreme_between(peak_index, np.asarray(trough_index, dtype=np.intp), np.asarray(trough_price, dtype=float))
+    with np.errstate(invalid='ignore'):
+        matched = (np.abs(peak_price[:-1] - peak_price[1:]) < threshold * np.abs(peak_price[:-1])) & (gap_trough >= 0)
+    k = np.flatnonzero(matched)
+    
+    patterns = np.empty(len(k), dtype=DOUBLE_PATTERN_DTYPE)
+    patterns['first'] = peak_index[k]
+    patterns['second'] = peak_index[k + 1]
+    patterns['middle'] = np.asarray(trough_index, dtype=np.intp)[gap_trough[k]]
+    return patterns
+
+def find_double_bottoms(peak_index: np.ndarray, peak_price: np.ndarray,
+                        trough_index: np.ndarray, trough_price: np.ndarray,
+                        threshold: float) -> np.ndarray:
+    """Double bottoms, with the highest peak between the troughs as the middle (see find_double_tops)"""
+    return find_double_tops(
+        trough_index, -np.asarray(trough_price, dtype=float), peak_index, -np.asarray(peak_price, dtype=float), threshold
+    )
 
 class PatternRecognitionStrategy(BaseStrategy):
     """
@@ -22,87 +142,99 @@ class PatternRecognitionStrategy(BaseStrategy):
     
     def find_local_extrema(self, data: pd.DataFrame) -> Tuple[List[Dict], List[Dict]]:
         """Find local minima and maxima in the price data"""
-        peaks = []
-        troughs = []
-        window = 5  # Lookback window for finding extrema
+        high = data['high'].to_numpy(dtype=float)
+        low = data['low'].to_numpy(dtype=float)
+        peak_index, trough_index = find_extrema(high, low, EXTREMUM_WINDOW)
         
-        for i in range(window, len(data) - window):
-            # Find peaks
-            if (data['high'].iloc[i] > data['high'].iloc[i-window:i]).all() and \
-               (data['high'].iloc[i] > data['high'].iloc[i+1:i+window+1]).all():
-                peaks.append({
-                    'index': i,
-                    'price': data['high'].iloc[i],
-                    'timestamp': data.index[i]
-                })
-            
-            # Find troughs
-            if (data['low'].iloc[i] < data['low'].iloc[i-window:i]).all() and \
-               (data['low'].iloc[i] < data['low'].iloc[i+1:i+window+1]).all():
-                troughs.append({
-                    'index': i,
-                    'price': data['low'].iloc[i],
-                    'timestamp': data.index[i]
-                })
+        peaks = [
+            {'index': int(i), 'price': price, 'timestamp': timestamp}
+            for i, price, timestamp in zip(peak_index, high[peak_index], data.index[peak_index])
+        ]
+        troughs = [
+            {'index': int(i), 'price': price, 'timestamp': timestamp}
+            for i, price, timestamp in zip(trough_index, low[trough_index], data.index[trough_index])
+        ]
         
         return peaks, troughs
     
+    @staticmethod
+    def _extremum_arrays(extrema: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Bar positions and prices of find_local_extrema output"""
+        index = np.array([extremum['index'] for extremum in extrema], dtype=np.intp)
+        price = np.array([extremum['price'] for extremum in extrema], dtype=float)
+        return index, price
+    
+    def find_patterns(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Detect all patterns as structured arrays of bar positions.
+        
+        Args:
+            data: DataFrame containing price data
+            
+        Returns:
+            Dictionary with 'head_and_shoulders', 'double_top' and 'double_bottom' arrays
+        """
+        high = data['high'].to_numpy(dtype=float)
+        low = data['low'].to_numpy(dtype=float)
+        peak_index, trough_index = find_extrema(high, low, EXTREMUM_WINDOW)
+        extrema = (peak_index, high[peak_index], trough_index, low[trough_index], self.params['pattern_threshold'])
+        return {
+            'head_and_shoulders': find_head_and_shoulders(*extrema),
+            'double_top': find_double_tops(*extrema),
+            'double_bottom': find_double_bottoms(*extrema)
+        }
+    
     def detect_head_and_shoulders(self, peaks: List[Dict], troughs: List[Dict]) -> List[Dict]:
         """Detect head and shoulders patterns"""
-        patterns = []
+        peak_index, peak_price = self._extremum_arrays(peaks)
+        trough_index, trough_price = self._extremum_arrays(troughs)
+        found = find_head_and_shoulders(
+            peak_index, peak_price, trough_index, trough_price, self.params['pattern_threshold']
+        )
         
-        for i in range(2, len(peaks) - 2):
-            # Check for head and shoulders pattern
-            left_shoulder = peaks[i-1]
-            head = peaks[i]
-            right_shoulder = peaks[i+1]
-            
-            # Check if head is higher than shoulders
-            if (head['price'] > left_shoulder['price'] and 
-                head['price'] > right_shoulder['price']):
-                
-                # Check if shoulders are roughly at same level
-                shoulder_diff = abs(left_shoulder['price'] - right_shoulder['price'])
-                if shoulder_diff < self.params['pattern_threshold'] * head['price']:
-                    patterns.append({
-                        'type': 'head_and_shoulders',
-                        'direction': 'bearish',
-                        'head': head,
-                        'left_shoulder': left_shoulder,
-                        'right_shoulder': right_shoulder,
-                        'neckline': min(troughs[i-1]['price'], troughs[i]['price']),
-                        'confidence': 0.8
-                    })
+        patterns = []
+        for pattern in found:
+            k = np.searchsorted(peak_index, pattern['head'])
+            patterns.append({
+                'type': 'head_and_shoulders',
+                'direction': 'bearish',
+                'head': peaks[k],
+                'left_shoulder': peaks[k - 1],
+                'right_shoulder': peaks[k + 1],
+                'neckline': pattern['neckline'],
+                'confidence': 0.8
+            })
         
         return patterns
     
     def detect_double_top_bottom(self, peaks: List[Dict], troughs: List[Dict]) -> List[Dict]:
         """Detect double top and double bottom patterns"""
+        peak_index, peak_price = self._extremum_arrays(peaks)
+        trough_index, trough_price = self._extremum_arrays(troughs)
+        extrema = (peak_index, peak_price, trough_index, trough_price, self.params['pattern_threshold'])
         patterns = []
         
-        # Check for double tops
-        for i in range(1, len(peaks) - 1):
-            if abs(peaks[i]['price'] - peaks[i+1]['price']) < self.params['pattern_threshold'] * peaks[i]['price']:
-                patterns.append({
-                    'type': 'double_top',
-                    'direction': 'bearish',
-                    'first_top': peaks[i],
-                    'second_top': peaks[i+1],
-                    'trough': troughs[i],
-                    'confidence': 0.7
-                })
+        for pattern in find_double_tops(*extrema):
+            k = np.searchsorted(peak_index, pattern['first'])
+            patterns.append({
+                'type': 'double_top',
+                'direction': 'bearish',
+                'first_top': peaks[k],
+                'second_top': peaks[k + 1],
+                'trough': troughs[np.searchsorted(trough_index, pattern['middle'])],
+                'confidence': 0.7
+            })
         
-        # Check for double bottoms
-        for i in range(1, len(troughs) - 1):
-            if abs(troughs[i]['price'] - troughs[i+1]['price']) < self.params['pattern_threshold'] * troughs[i]['price']:
-                patterns.append({
-                    'type': 'double_bottom',
-                    'direction': 'bullish',
-                    'first_bottom': troughs[i],
-                    'second_bottom': troughs[i+1],
-                    'peak': peaks[i],
-                    'confidence': 0.7
-                })
+        for pattern in find_double_bottoms(*extrema):
+            k = np.searchsorted(trough_index, pattern['first'])
+            patterns.append({
+                'type': 'double_bottom',
+                'direction': 'bullish',
+                'first_bottom': troughs[k],
+                'second_bottom': troughs[k + 1],
+                'peak': peaks[np.searchsorted(peak_index, pattern['middle'])],
+                'confidence': 0.7
+            })
         
         return patterns
     
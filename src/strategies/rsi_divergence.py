@@ -2,6 +2,29 @@ from typing import Dict, List, Tuple
 import pandas as pd
 import numpy as np
 from .base_strategy import BaseStrategy
+from ..utils.indicator_kernels import compute_rsi, find_peaks, find_troughs, rsi_by_period
+
+EXTREMUM_WINDOW = 5  # Bars on each side of a local peak/trough
+
+def _divergent_swings(swings: np.ndarray, price: np.ndarray, rsi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Match each swing with the previous one and keep the pairs where price
+    and RSI moved in opposite directions.
+    
+    Args:
+        swings: Increasing swing positions
+        price: Price series the swings were found in
+        rsi: RSI series aligned with price
+        
+    Returns:
+        (current, previous) swing positions of the divergent pairs
+    """
+    previous, current = swings[:-1], swings[1:]
+    with np.errstate(invalid='ignore'):
+        price_change = price[current] - price[previous]
+        rsi_change = rsi[current] - rsi[previous]
+        divergent = ((price_change > 0) & (rsi_change < 0)) | ((price_change < 0) & (rsi_change > 0))
+    return current[divergent], previous[divergent]
 
 class RSIDivergenceStrategy(BaseStrategy):
     """
@@ -10,54 +33,61 @@ class RSIDivergenceStrategy(BaseStrategy):
     and generates signals at these divergence points.
     """
     
-    def __init__(self, rsi_period: int = 14, divergence_threshold: float = 0.1):
+    def __init__(self, rsi_period: int = 14, divergence_threshold: float = 0.1, rsi_method: str = 'wilder'):
         super().__init__("RSI Divergence Strategy", {
             'rsi_period': rsi_period,
-            'divergence_threshold': divergence_threshold
+            'divergence_threshold': divergence_threshold,
+            'rsi_method': rsi_method
         })
         
     def calculate_rsi(self, data: pd.DataFrame) -> pd.Series:
-        """Calculate RSI indicator"""
-        delta = data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.params['rsi_period']).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.params['rsi_period']).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        """Calculate RSI indicator ('wilder' or 'sma' smoothing, see rsi_method)"""
+        values = compute_rsi(data['close'].to_numpy(dtype=float), self.params['rsi_period'], self.params['rsi_method'])
+        return pd.Series(values, index=data.index)
     
     def find_divergences(self, data: pd.DataFrame, rsi: pd.Series) -> List[Dict]:
-        """Find bullish and bearish divergences"""
-        divergences = []
-        window = 5  # Lookback window for finding peaks/troughs
-        
-        for i in range(window, len(data) - window):
-            # Find local minima in price and RSI
-            if (data['low'].iloc[i] < data['low'].iloc[i-window:i]).all() and \
-               (data['low'].iloc[i] < data['low'].iloc[i+1:i+window+1]).all():
-                # Bullish divergence: Higher lows in price, lower lows in RSI
-                if (rsi.iloc[i] < rsi.iloc[i-window:i]).all() and \
-                   (rsi.iloc[i] < rsi.iloc[i+1:i+window+1]).all():
-                    divergences.append({
-                        'timestamp': data.index[i],
-                        'type': 'bullish',
-                        'price_low': data['low'].iloc[i],
-                        'rsi_low': rsi.iloc[i],
-                        'confidence': 0.7
-                    })
-            
-            # Find local maxima in price and RSI
-            if (data['high'].iloc[i] > data['high'].iloc[i-window:i]).all() and \
-               (data['high'].iloc[i] > data['high'].iloc[i+1:i+window+1]).all():
-                # Bearish divergence: Lower highs in price, higher highs in RSI
-                if (rsi.iloc[i] > rsi.iloc[i-window:i]).all() and \
-                   (rsi.iloc[i] > rsi.iloc[i+1:i+window+1]).all():
-                    divergences.append({
-                        'timestamp': data.index[i],
-                        'type': 'bearish',
-                        'price_high': data['high'].iloc[i],
-                        'rsi_high': rsi.iloc[i],
-                        'confidence': 0.7
-                    })
+        """
+        Find bullish and bearish divergences.
+        
+        Consecutive swing lows (highs) of price are compared with the RSI at
+        the same bars. When price and RSI move in opposite directions
+        between two swing lows the divergence is bullish, between two swing
+        highs it is bearish. It is 'regular' when price made the new extreme
+        (lower low, higher high) and 'hidden' otherwise. Swings need
+        EXTREMUM_WINDOW bars on each side.
+        """
+        low = data['low'].to_numpy(dtype=float)
+        high = data['high'].to_numpy(dtype=float)
+        rsi_values = rsi.to_numpy(dtype=float)
+        
+        bullish, bullish_previous = _divergent_swings(find_troughs(low, EXTREMUM_WINDOW), low, rsi_values)
+        bearish, bearish_previous = _divergent_swings(find_peaks(high, EXTREMUM_WINDOW), high, rsi_values)
         
+        divergences = [
+            {
+                'timestamp': data.index[i],
+                'type': 'bullish',
+                'price_low': low[i],
+                'rsi_low': rsi_values[i],
+                'previous_timestamp': data.index[j],
+                'kind': 'regular' if low[i] < low[j] else 'hidden',
+                'confidence': 0.7
+            }
+            for i, j in zip(bullish, bullish_previous)
+        ] + [
+            {
+                'timestamp': data.index[i],
+                'type': 'bearish',
+                'price_high': high[i],
+                'rsi_high': rsi_values[i],
+                'previous_timestamp': data.index[j],
+                'kind': 'regular' if high[i] > high[j] else 'hidden',
+                'confidence': 0.7
+            }
+            for i, j in zip(bearish, bearish_previous)
+        ]
+        # In bar order; a bar can carry both, the bullish one is listed first
+        divergences.sort(key=lambda div: div['timestamp'])
         return divergences
     
     def analyze(self, data: pd.DataFrame) -> Dict:
@@ -92,6 +122,66 @@ class RSIDivergenceStrategy(BaseStrategy):
         
         return signals
     
+    def generate_signal_array(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Generate the per-bar recommendation actions in a single pass.
+        
+        A divergence at bar i needs EXTREMUM_WINDOW later bars to confirm,
+        so a prefix ending at bar t sees the divergences up to bar
+        t - EXTREMUM_WINDOW; the recommendation follows the latest of them.
+        
+        Args:
+            data: DataFrame containing price and volume data
+            
+        Returns:
+            Integer array of actions (1 buy, -1 sell, 0 hold), one per bar
+        """
+        return self.generate_param_signal_matrix(data, [{}])[0]
+    
+    def generate_param_signal_matrix(self, data: pd.DataFrame, param_sets: List[Dict]) -> np.ndarray:
+        """
+        Generate per-bar actions for many parameter sets in one pass.
+        
+        The RSI is computed once per distinct (rsi_period, rsi_method) and
+        the price swings once for all parameter sets.
+        
+        Args:
+            data: DataFrame containing price and volume data
+            param_sets: Parameter overrides, one dictionary per row
+            
+        Returns:
+            Integer array of actions of shape (len(param_sets), n_bars)
+        """
+        if not self.validate_data(data):
+            raise ValueError("Invalid data format")
+        
+        settings = [
+            (params['rsi_period'], params['rsi_method'])
+            for params in (dict(self.params, **overrides) for overrides in param_sets)
+        ]
+        close = data['close'].to_numpy(dtype=float)
+        low = data['low'].to_numpy(dtype=float)
+        high = data['high'].to_numpy(dtype=float)
+        troughs = find_troughs(low, EXTREMUM_WINDOW)
+        peaks = find_peaks(high, EXTREMUM_WINDOW)
+        
+        actions_by_setting = {}
+        for method in {method for _, method in settings}:
+            rsi = rsi_by_period(close, [period for period, m in settings if m == method], method)
+            for period, values in rsi.items():
+                codes = np.zeros(len(data), dtype=np.int8)
+                codes[_divergent_swings(troughs, low, values)[0]] = 1
+                # A bearish divergence is listed after a bullish one on the same bar
+                codes[_divergent_swings(peaks, high, values)[0]] = -1
+                confirmed = np.zeros_like(codes)
+                confirmed[EXTREMUM_WINDOW:] = codes[:len(codes) - EXTREMUM_WINDOW]
+                # The latest divergence stays the recommendation however old it is
+                actions_by_setting[period, method] = self.recent_signal_actions(confirmed, lookback=len(confirmed) + 1)
+        
+        if not settings:
+            return np.zeros((0, len(data)), dtype=np.int8)
+        return np.stack([actions_by_setting[setting] for setting in settings])
+    
     def get_recommendation(self, data: pd.DataFrame) -> Dict:
         """Generate trading recommendation based on current market conditions"""
         signals = self.generate_signals(data)
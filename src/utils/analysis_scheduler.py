@@ -0,0 +1,119 @@
+"""
+Concurrent scheduler for the multi-symbol, multi-timeframe analysis cycle
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+from termcolor import cprint
+from src.config import ANALYSIS_FETCH_CONCURRENCY, ANALYSIS_PROCESS_WORKERS
+
+class AnalysisScheduler:
+    """
+    Fans work out over an I/O thread pool (data fetching) and a process pool
+    (CPU-bound evaluation). Results always come back in submission order so
+    the cycle's output is deterministic, and each stage's wall time is recorded.
+    Provider rate limits are enforced by the fetchers themselves
+    (see src.utils.rate_limiter) so they hold across all worker threads.
+    """
+    
+    def __init__(self, max_fetch_workers=None, max_process_workers=None):
+        """
+        Initialize the scheduler
+        
+        Args:
+            max_fetch_workers (int): Concurrent I/O tasks (defaults to ANALYSIS_FETCH_CONCURRENCY)
+            max_process_workers (int): Worker processes, -1 for all cores, 0 to run inline
+                                       (defaults to ANALYSIS_PROCESS_WORKERS)
+        """
+        self.max_fetch_workers = max(1, max_fetch_workers or ANALYSIS_FETCH_CONCURRENCY)
+        if max_process_workers is None:
+            max_process_workers = ANALYSIS_PROCESS_WORKERS
+        if max_process_workers < 0:
+            max_process_workers = os.cpu_count() or 1
+        self.max_process_workers = max_process_workers
+        self.timings = {}
+        self._process_pool = None
+        
+    @contextmanager
+    def stage(self, name):
+        """Time a stage of the cycle"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+            
+    def map_io(self, fn, items, return_exceptions=False):
+        """
+        Run fn(*item) for each item on the I/O thread pool
+        
+        Args:
+            fn (callable): Task to run
+            items (list): Argument tuples, one per task
+            return_exceptions (bool): Put a task's exception in its result slot
+                                      instead of raising it
+        
+        Returns:
+            list: Results in the same order as items
+        """
+        if not items:
+            return []
+        workers = min(self.max_fetch_workers, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(fn, *item) for item in items]
+            return _gather(futures, return_exceptions)
+            
+    def map_cpu(self, fn, items, return_exceptions=False):
+        """
+        Run fn(*item) for each item on the process pool (inline if disabled)
+        
+        fn and the items must be picklable.
+        
+        Args:
+            fn (callable): Task to run
+            items (list): Argument tuples, one per task
+            return_exceptions (bool): Put a task's exception in its result slot
+                                      instead of raising it
+        
+        Returns:
+            list: Results in the same order as items
+        """
+        if self.max_process_workers == 0 or len(items) <= 1:
+            results = []
+            for item in items:
+                try:
+                    results.append(fn(*item))
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results.append(e)
+            return results
+            
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_process_workers)
+        futures = [self._process_pool.submit(fn, *item) for item in items]
+        return _gather(futures, return_exceptions)
+        
+    def report_timings(self):
+        """Print the per-stage timings of the last cycle"""
+        if not self.timings:
+            return
+        stages = ", ".join(f"{name}: {seconds:.2f}s" for name, seconds in self.timings.items())
+        cprint(f"⏱️ Cycle timings - {stages}", "blue")
+        
+    def shutdown(self):
+        """Stop the worker process pool"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
+
+def _gather(futures, return_exceptions):
+    """Collect future results in submission order"""
+    results = []
+    for future in futures:
+        error = future.exception()
+        if error is not None and not return_exceptions:
+            raise error
+        results.append(error if error is not None else future.result())
+    return results
@@ -6,6 +6,7 @@ import pandas as pd
 from datetime import datetime, timedelta
 from termcolor import cprint
 from src.utils.forex_dot_com_client import ForexDotComClient
+from src.utils.rate_limiter import get_rate_limiter
 
 class ForexDataFetcher:
     def __init__(self):
@@ -24,6 +25,7 @@ class ForexDataFetcher:
             formatted_pair = self.client.format_symbol(pair)
             
             # Get data from FOREX.com API
+            get_rate_limiter('forex_com').acquire()
             response = self.client.get_price_data(formatted_pair, timeframe, count)
             
             if not response or 'candles' not in response:
@@ -68,6 +70,7 @@ class ForexDataFetcher:
             formatted_pair = self.client.format_symbol(pair)
             
             # Get current price from FOREX.com API
+            get_rate_limiter('forex_com').acquire()
             price = self.client.get_current_price(formatted_pair)
             
             if price is None:
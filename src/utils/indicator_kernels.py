@@ -0,0 +1,232 @@
+"""
+Array kernels for technical indicators
+
+Plain NumPy functions that work along the last axis, so the same code
+computes an indicator for one series, for many simulated paths (rows of a
+2-D array) or for many parameter values at once. Output matches the pandas
+rolling versions used by the strategies.
+"""
+from typing import Dict, Iterable, Tuple
+import numpy as np
+import pandas as pd
+
+def rolling_means(values: np.ndarray, windows: Iterable[int]) -> Dict[int, np.ndarray]:
+    """
+    Trailing rolling means for several window lengths from one cumulative sum.
+
+    Args:
+        values: Array whose last axis is time (no NaNs)
+        windows: Window lengths
+
+    Returns:
+        Dictionary of window -> means, NaN until the window is full
+    """
+    values = np.asarray(values, dtype=float)
+    # Offsetting by the first value keeps the running sums small and accurate
+    offset = values[..., :1]
+    cumsum = np.cumsum(values - offset, axis=-1)
+    means = {}
+    for window in set(windows):
+        sums = cumsum.copy()
+        sums[..., window:] = cumsum[..., window:] - cumsum[..., :-window]
+        mean = sums / window + offset
+        mean[..., :window - 1] = np.nan
+        means[window] = mean
+    return means
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing rolling mean along the last axis (NaN until the window is full)"""
+    return rolling_means(values, [window])[window]
+
+def rolling_sums(values: np.ndarray, windows: Iterable[int]) -> Dict[int, np.ndarray]:
+    """
+    Trailing rolling sums for several window lengths from one cumulative sum.
+
+    Windows of exact zeros sum to exactly zero, as long as values are
+    non-negative (the cumulative sum then does not change across them).
+
+    Args:
+        values: Array whose last axis is time (no NaNs)
+        windows: Window lengths
+
+    Returns:
+        Dictionary of window -> sums, NaN until the window is full
+    """
+    cumsum = np.cumsum(np.asarray(values, dtype=float), axis=-1)
+    sums = {}
+    for window in set(windows):
+        total = cumsum.copy()
+        total[..., window:] = cumsum[..., window:] - cumsum[..., :-window]
+        total[..., :window - 1] = np.nan
+        sums[window] = total
+    return sums
+
+def price_changes(close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-bar gains and losses (both non-negative) along the last axis.
+
+    The first, undefined change and any change involving a NaN count as zero.
+    """
+    close = np.asarray(close, dtype=float)
+    delta = np.zeros_like(close)
+    delta[..., 1:] = np.diff(close, axis=-1)
+    with np.errstate(invalid='ignore'):
+        gains = np.where(delta > 0, delta, 0.0)
+        losses = np.where(delta < 0, -delta, 0.0)
+    return gains, losses
+
+def wilder_mean(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder's smoothing along the last axis, skipping the first value.
+
+    The mean of values 1..period seeds the average at position period;
+    after that avg = avg + (value - avg) / period. Earlier positions are NaN.
+
+    Args:
+        values: Array whose last axis is time (no NaNs)
+        period: Smoothing period
+
+    Returns:
+        Array of smoothed values
+    """
+    values = np.asarray(values, dtype=float)
+    n = values.shape[-1]
+    if n <= period:
+        return np.full(values.shape, np.nan)
+    seeded = np.full(values.shape, np.nan).reshape(-1, n)
+    flat = values.reshape(-1, n)
+    seeded[:, period] = flat[:, 1:period + 1].mean(axis=1)
+    seeded[:, period + 1:] = flat[:, period + 1:]
+    # ewm with adjust=False starts from the first non-NaN value (the seed)
+    smoothed = pd.DataFrame(seeded.T).ewm(alpha=1 / period, adjust=False).mean().to_numpy().T
+    return smoothed.reshape(values.shape)
+
+def _rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    """RSI from average gains and losses: 100 without losses, NaN without any change"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+def simple_rsi(close: np.ndarray, periods: Iterable[int]) -> Dict[int, np.ndarray]:
+    """
+    RSI on simple rolling means of gains and losses, for several periods.
+
+    Matches ``100 - 100 / (1 + gain.rolling(p).mean() / loss.rolling(p).mean())``
+    with the first (undefined) change counted as zero: a window without
+    losses gives 100, one without any change gives NaN.
+
+    Args:
+        close: Close prices, last axis is time
+        periods: RSI periods
+
+    Returns:
+        Dictionary of period -> RSI values
+    """
+    periods = set(periods)
+    gains, losses = price_changes(close)
+    gain_sums = rolling_sums(gains, periods)
+    loss_sums = rolling_sums(losses, periods)
+    return {period: _rsi_from_averages(gain_sums[period], loss_sums[period]) for period in periods}
+
+def wilder_rsi(close: np.ndarray, periods: Iterable[int]) -> Dict[int, np.ndarray]:
+    """
+    Wilder's RSI for several periods.
+
+    The first value is at position period (after period price changes).
+    Flat stretches are handled as in simple_rsi.
+
+    Args:
+        close: Close prices, last axis is time
+        periods: RSI periods
+
+    Returns:
+        Dictionary of period -> RSI values
+    """
+    gains, losses = price_changes(close)
+    return {
+        period: _rsi_from_averages(wilder_mean(gains, period), wilder_mean(losses, period))
+        for period in set(periods)
+    }
+
+RSI_METHODS = {'wilder': wilder_rsi, 'sma': simple_rsi}
+
+def rsi_by_period(close: np.ndarray, periods: Iterable[int], method: str = 'wilder') -> Dict[int, np.ndarray]:
+    """RSI for several periods with the named smoothing ('wilder' or 'sma')"""
+    if method not in RSI_METHODS:
+        raise ValueError(f"Unknown RSI method {method!r}; expected one of {sorted(RSI_METHODS)}")
+    return RSI_METHODS[method](close, periods)
+
+def compute_rsi(close: np.ndarray, period: int = 14, method: str = 'wilder') -> np.ndarray:
+    """RSI along the last axis with the named smoothing ('wilder' or 'sma')"""
+    return rsi_by_period(close, [period], method)[period]
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing rolling maximum of a 1-D array in O(n) (van Herk / Gil-Werman).
+
+    Any NaN inside a window makes that window's maximum NaN.
+
+    Args:
+        values: 1-D array
+        window: Window length
+
+    Returns:
+        Array of window maxima, NaN until the window is full
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    result = np.full(n, np.nan)
+    if window < 1 or n < window:
+        return result
+    # Running maxima from the start (prefix) and to the end (suffix) of each block of `window` bars
+    padded = np.full(-(-n // window) * window, -np.inf)
+    padded[:n] = values
+    blocks = padded.reshape(-1, window)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()[:n]
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()[:n]
+    # A window [j - window + 1, j] spans the end of one block and the start of the next
+    result[window - 1:] = np.maximum(suffix[:n - window + 1], prefix[window - 1:])
+    return result
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing rolling minimum of a 1-D array in O(n), see rolling_max"""
+    return -rolling_max(-np.asarray(values, dtype=float), window)
+
+def find_peaks(values: np.ndarray, window: int, strict: bool = True) -> np.ndarray:
+    """
+    Indices of local maxima against the ``window`` bars on each side.
+
+    Only bars with a full window on both sides qualify, and a NaN anywhere
+    in the neighbourhood rules a bar out. This is the vectorized form of
+    ``(v[i] > v[i-window:i]).all() and (v[i] > v[i+1:i+window+1]).all()``
+    (``>=`` when not strict).
+
+    Args:
+        values: 1-D array
+        window: Bars compared on each side
+        strict: Require the peak to exceed (rather than equal or exceed) its neighbours
+
+    Returns:
+        Sorted integer array of peak positions
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if window < 1 or n < 2 * window + 1:
+        return np.array([], dtype=np.intp)
+    window_max = rolling_max(values, window)
+    centre = values[window:n - window]
+    before = window_max[window - 1:n - window - 1]  # max of values[i - window:i]
+    after = window_max[2 * window:]                 # max of values[i + 1:i + window + 1]
+    with np.errstate(invalid='ignore'):
+        if strict:
+            is_peak = (centre > before) & (centre > after)
+        else:
+            is_peak = (centre >= before) & (centre >= after)
+    return np.flatnonzero(is_peak) + window
+
+def find_troughs(values: np.ndarray, window: int, strict: bool = True) -> np.ndarray:
+    """Indices of local minima against the ``window`` bars on each side, see find_peaks"""
+    return find_peaks(-np.asarray(values, dtype=float), window, strict)
+
+def find_extrema(high: np.ndarray, low: np.ndarray, window: int, strict: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """Peak indices of the highs and trough indices of the lows"""
+    return find_peaks(high, window, strict), find_troughs(low, window, strict)
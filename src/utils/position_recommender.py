@@ -1,10 +1,105 @@
 """
 Position recommendation utility for analyzing market data and providing trading recommendations
 """
+from typing import Dict, List, Mapping, Tuple, Union
 import pandas as pd
 import numpy as np
 from datetime import datetime
 from termcolor import cprint
+from src.utils.indicator_kernels import compute_rsi
+
+# Indicator columns from TechnicalAnalysis.add_all_indicators that the recommender reuses
+REUSED_COLUMNS = ['sma_10', 'sma_50', 'rsi', 'macd', 'macd_signal', 'macd_hist', 'bb_middle', 'bb_upper', 'bb_lower']
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+MIN_BARS = 10
+
+def _sign(values: np.ndarray) -> np.ndarray:
+    """1, -1 or 0 (also for NaN), like the if/elif/else comparisons"""
+    with np.errstate(invalid='ignore'):
+        return np.where(values > 0, 1.0, np.where(values < 0, -1.0, 0.0))
+
+def _when(condition: np.ndarray, values) -> np.ndarray:
+    """values where condition holds, NaN (signal absent) elsewhere"""
+    return np.where(condition, values, np.nan)
+
+def _panel_matrices(panel: Union[Mapping[str, pd.DataFrame], pd.DataFrame],
+                    columns: List[str]) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Stack every symbol's bars into left-aligned, NaN-padded matrices.
+    
+    Args:
+        panel: Mapping of symbol -> bars, or one frame indexed by (symbol, timestamp)
+        columns: Columns to stack (missing ones are NaN)
+        
+    Returns:
+        (symbols, lengths, matrices, present) - matrices[column] has one row per
+        symbol; present[column] flags the symbols that supplied that column
+    """
+    if isinstance(panel, pd.DataFrame):
+        codes, symbols = pd.factorize(panel.index.get_level_values(0))
+        symbols = list(symbols)
+        lengths = np.bincount(codes, minlength=len(symbols))
+        position = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+        width = lengths.max() if len(lengths) else 0
+        matrices, present = {}, {}
+        for column in columns:
+            matrix = np.full((len(symbols), width), np.nan)
+            if column in panel.columns:
+                matrix[codes, position] = panel[column].to_numpy(dtype=float)
+                present[column] = ~np.isnan(matrix).all(axis=1)
+            else:
+                present[column] = np.zeros(len(symbols), dtype=bool)
+            matrices[column] = matrix
+        return symbols, lengths, matrices, present
+    
+    symbols = list(panel)
+    frames = [panel[symbol] if panel[symbol] is not None else pd.DataFrame() for symbol in symbols]
+    lengths = np.array([len(frame) for frame in frames], dtype=int)
+    width = lengths.max() if len(lengths) else 0
+    matrices, present = {}, {}
+    for column in columns:
+        matrix = np.full((len(symbols), width), np.nan)
+        has = np.zeros(len(symbols), dtype=bool)
+        for row, frame in enumerate(frames):
+            if column in frame.columns:
+                matrix[row, :len(frame)] = frame[column].to_numpy(dtype=float)
+                has[row] = True
+        matrices[column] = matrix
+        present[column] = has
+    return symbols, lengths, matrices, present
+
+def _rolling_moments(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling mean and sample standard deviation of every row.
+    
+    Like pandas rolling(window).mean()/.std(), a window containing a NaN
+    (or extending before the first bar) is NaN.
+    """
+    missing = np.isnan(values)
+    # Centering on each row's first valid value keeps the running sums accurate
+    offset = np.nanmin(np.where(missing, np.inf, values), axis=1, keepdims=True) if values.size else 0.0
+    offset = np.where(np.isfinite(offset), offset, 0.0)
+    centered = np.where(missing, 0.0, values - offset)
+    
+    def window_sums(series):
+        cumsum = np.zeros((series.shape[0], series.shape[1] + 1))
+        np.cumsum(series, axis=1, out=cumsum[:, 1:])
+        sums = np.full(series.shape, np.nan)
+        sums[:, window - 1:] = cumsum[:, window:] - cumsum[:, :-window]
+        return sums
+    
+    total = window_sums(centered)
+    squares = window_sums(centered ** 2)
+    incomplete = window_sums(missing.astype(float)) != 0
+    mean = total / window
+    variance = np.maximum((squares - total * mean) / (window - 1), 0.0)
+    mean[incomplete] = np.nan
+    variance[incomplete] = np.nan
+    return mean + offset, np.sqrt(variance)
+
+def _column_ewm(values: np.ndarray, span: int) -> np.ndarray:
+    """pandas ewm(span, adjust=False) mean of every row"""
+    return pd.DataFrame(values.T).ewm(span=span, adjust=False).mean().to_numpy().T
 
 class PositionRecommender:
     """
@@ -29,49 +124,207 @@ class PositionRecommender:
         Returns:
             dict: Position recommendation details
         """
-        if price_data is None or len(price_data) < 10:
-            cprint(f"❌ Insufficient data for {symbol} to make a recommendation", "red")
-            return {
-                "symbol": symbol,
-                "recommendation": "NEUTRAL",
-                "confidence": 0.0,
-                "entry_price": None,
-                "take_profit": None,
-                "stop_loss": None,
-                "risk_reward_ratio": None,
-                "timestamp": datetime.now().isoformat(),
-                "reason": "Insufficient data"
-            }
-            
-        # Calculate basic signals
-        signals = {}
+        return self.recommend_batch(
+            {symbol: price_data},
+            {symbol: technical_indicators} if technical_indicators else None,
+            {symbol: sentiment_score} if sentiment_score is not None else None
+        )[symbol]
         
-        # 1. Moving Average signals
-        signals.update(self._calculate_ma_signals(price_data))
-        
-        # 2. RSI signals
-        signals.update(self._calculate_rsi_signals(price_data))
+    def recommend_batch(self, panel, technical_indicators=None, sentiment_scores=None):
+        """
+        Recommend positions for many symbols at once.
         
-        # 3. MACD signals
-        signals.update(self._calculate_macd_signals(price_data))
+        Every signal is computed for all symbols together from padded price
+        matrices. Indicator columns already added by TechnicalAnalysis
+        (sma_10, sma_50, rsi, macd*, bb_*) are used as they are; missing
+        ones are computed. The input frames are never modified.
         
-        # 4. Price action signals
-        signals.update(self._calculate_price_action_signals(price_data))
+        Args:
+            panel (dict or pd.DataFrame): symbol -> price data, or one frame indexed by (symbol, timestamp)
+            technical_indicators (dict, optional): symbol -> dictionary of extra indicator signals
+            sentiment_scores (dict, optional): symbol -> news sentiment score from -1.0 to 1.0
+            
+        Returns:
+            dict: symbol -> position recommendation details, in panel order
+        """
+        technical_indicators = technical_indicators or {}
+        sentiment_scores = sentiment_scores or {}
+        symbols, lengths, matrices, present = _panel_matrices(panel, PRICE_COLUMNS + REUSED_COLUMNS)
+        
+        recommendations = {}
+        usable = lengths >= MIN_BARS
+        if usable.any():
+            rows = np.flatnonzero(usable)
+            if not usable.all():
+                matrices = {column: matrix[rows] for column, matrix in matrices.items()}
+                present = {column: flags[rows] for column, flags in present.items()}
+            signal_table, current_price, avg_range = self._score_matrices(matrices, present, lengths[rows])
+            names = [name for name, _ in signal_table]
+            # One row of signal values per symbol, NaN where a signal is absent
+            values_by_symbol = np.array([values for _, values in signal_table]).T.tolist()
+            for k, row in enumerate(rows):
+                signals = {name: int(value) for name, value in zip(names, values_by_symbol[k]) if value == value}
+                recommendations[symbols[row]] = self._build_recommendation(
+                    symbols[row], signals, current_price[k], avg_range[k],
+                    technical_indicators.get(symbols[row]), sentiment_scores.get(symbols[row])
+                )
+        
+        # Keep the panel order, with symbols lacking data reported as such
+        result = {}
+        for row, symbol in enumerate(symbols):
+            if symbol in recommendations:
+                result[symbol] = recommendations[symbol]
+            else:
+                cprint(f"❌ Insufficient data for {symbol} to make a recommendation", "red")
+                result[symbol] = self._insufficient_data(symbol)
+        return result
+        
+    def _score_matrices(self, matrices, present, lengths):
+        """
+        Evaluate every signal for all symbols at their last bar.
         
-        # 5. Volatility based signals
-        signals.update(self._calculate_volatility_signals(price_data))
+        Args:
+            matrices (dict): column -> (symbols, bars) left-aligned matrix
+            present (dict): column -> flags of symbols that supplied the column
+            lengths (np.ndarray): Number of bars per symbol
+            
+        Returns:
+            tuple: ([(signal name, values with NaN where absent)], current prices, average true ranges)
+        """
+        open_, high, low, close = (matrices[column] for column in PRICE_COLUMNS)
+        rows = np.arange(len(lengths))
+        last = lengths - 1
+        
+        def indicator(column, compute):
+            """Supplied column where present, computed (for the other symbols only) otherwise"""
+            missing = ~present[column]
+            if not missing.any():
+                return matrices[column]
+            values = matrices[column].copy()
+            values[missing] = compute(missing)
+            return values
+        
+        def at(matrix, bars_back=0):
+            return matrix[rows, last - bars_back]
+        
+        cache = {}
+        
+        def moments(selection, window):
+            # Computed once per window for every symbol, since each indicator selects its own rows
+            if window not in cache:
+                cache[window] = _rolling_moments(close, window)
+            return tuple(values[selection] for values in cache[window])
+        
+        ma_short = indicator('sma_10', lambda selection: moments(selection, 10)[0])
+        ma_mid = indicator('sma_50', lambda selection: moments(selection, 50)[0])
+        # Simple (not Wilder) averages of gains and losses, as the recommender always used
+        rsi = indicator('rsi', lambda selection: compute_rsi(close[selection], 14, method='sma'))
+        macd = indicator('macd', lambda selection: _column_ewm(close[selection], 12) - _column_ewm(close[selection], 26))
+        macd_signal = indicator('macd_signal', lambda selection: _column_ewm(macd[selection], 9))
+        macd_hist = indicator('macd_hist', lambda selection: macd[selection] - macd_signal[selection])
+        bb_middle = indicator('bb_middle', lambda selection: moments(selection, 20)[0])
+        bb_upper = indicator('bb_upper', lambda selection: bb_middle[selection] + moments(selection, 20)[1] * 2)
+        bb_lower = indicator('bb_lower', lambda selection: bb_middle[selection] - moments(selection, 20)[1] * 2)
+        
+        c, o = at(close), at(open_)
+        signals = []
+        with np.errstate(invalid='ignore'):
+            # 1. Moving Average signals
+            short, mid = at(ma_short), at(ma_mid)
+            ma_ok = ~np.isnan(short) & ~np.isnan(mid)
+            signals += [
+                ('ma_cross', _when(ma_ok, _sign(short - mid))),
+                ('price_vs_ma_short', _when(ma_ok, _sign(c - short))),
+                ('price_vs_ma_mid', _when(ma_ok, _sign(c - mid))),
+                ('ma_slope', _when(ma_ok, _sign(short - at(ma_short, 4))))
+            ]
+            
+            # 2. RSI signals
+            last_rsi = at(rsi)
+            rsi_ok = ~np.isnan(last_rsi)
+            overbought, oversold = last_rsi > 70, last_rsi < 30
+            signals += [
+                ('rsi_overbought', _when(rsi_ok & overbought, -1)),
+                ('rsi_oversold', _when(rsi_ok & ~overbought & oversold, 1)),
+                ('rsi_neutral', _when(rsi_ok & ~overbought & ~oversold, 0)),
+                ('rsi_trend', _when(rsi_ok, _sign(last_rsi - at(rsi, 5))))
+            ]
+            
+            # 3. MACD signals
+            last_macd = at(macd)
+            macd_ok = ~np.isnan(last_macd) & ~np.isnan(at(macd_signal))
+            signals += [
+                ('macd_cross', _when(macd_ok, _sign(last_macd - at(macd_signal)))),
+                ('macd_hist_dir', _when(macd_ok, _sign(at(macd_hist) - at(macd_hist, 1)))),
+                ('macd_above_zero', _when(macd_ok & (last_macd > 0), 1)),
+                ('macd_below_zero', _when(macd_ok & (last_macd < 0), -1)),
+                ('macd_zero', _when(macd_ok & ~(last_macd > 0) & ~(last_macd < 0), 0))
+            ]
+            
+            # 4. Price action signals
+            higher_highs = (at(high) > at(high, 1)) & (at(high, 1) > at(high, 2))
+            lower_lows = (at(low) < at(low, 1)) & (at(low, 1) < at(low, 2))
+            prev_close, prev_open = at(close, 1), at(open_, 1)
+            bullish_engulfing = (prev_close < prev_open) & (c > o) & (o <= prev_close) & (c >= prev_open)
+            bearish_engulfing = (prev_close > prev_open) & (c < o) & (o >= prev_close) & (c <= prev_open)
+            signals += [
+                ('last_candle', _sign(c - o)),
+                ('higher_highs', _when(higher_highs, 1)),
+                ('lower_lows', _when(~higher_highs & lower_lows, -1)),
+                ('bullish_engulfing', _when(bullish_engulfing, 1)),
+                ('bearish_engulfing', _when(~bullish_engulfing & bearish_engulfing, -1))
+            ]
+            
+            # 5. Volatility based signals
+            middle, upper, lower = at(bb_middle), at(bb_upper), at(bb_lower)
+            bb_ok = ~np.isnan(middle)
+            width = (bb_upper - bb_lower) / bb_middle
+            width[np.arange(width.shape[1]) > last[:, None]] = np.nan
+            valid = ~np.isnan(width)
+            avg_width = np.where(valid, width, 0.0).sum(axis=1) / np.maximum(valid.sum(axis=1), 1)
+            signals += [
+                ('bb_upper', _when(bb_ok & (c > upper), -1)),
+                ('bb_lower', _when(bb_ok & ~(c > upper) & (c < lower), 1)),
+                ('bb_squeeze', _when(bb_ok & ((upper - lower) / middle < avg_width * 0.8), 0))
+            ]
+            
+            # Volatility (ATR-like): mean true range of the last 14 bars (excluding the first bar)
+            prev = np.full_like(close, np.nan)
+            prev[:, 1:] = close[:, :-1]
+            true_range = np.maximum(high - low, np.maximum(np.abs(high - prev), np.abs(low - prev)))
+            bars = last[:, None] - np.arange(14)[None, :]
+            in_range = bars >= 1
+            taken = np.where(in_range, true_range[rows[:, None], np.maximum(bars, 0)], 0.0)
+            avg_range = taken.sum(axis=1) / in_range.sum(axis=1)
+        
+        return signals, c, avg_range
+        
+    @staticmethod
+    def _insufficient_data(symbol):
+        return {
+            "symbol": symbol,
+            "recommendation": "NEUTRAL",
+            "confidence": 0.0,
+            "entry_price": None,
+            "take_profit": None,
+            "stop_loss": None,
+            "risk_reward_ratio": None,
+            "timestamp": datetime.now().isoformat(),
+            "reason": "Insufficient data"
+        }
         
-        # 6. Include technical indicators if provided
+    def _build_recommendation(self, symbol, signals, current_price, avg_range,
+                              technical_indicators=None, sentiment_score=None):
+        """Aggregate one symbol's signals into a recommendation with stop loss and take profit"""
+        # Include technical indicators if provided
         if technical_indicators:
             for indicator, value in technical_indicators.items():
                 signals[indicator] = value
                 
-        # 7. Include sentiment score if provided
-        sentiment_signal = 0
+        # Include sentiment score if provided
         if sentiment_score is not None:
             # Convert -1.0 to 1.0 sentiment to a signal
-            sentiment_signal = sentiment_score
-            signals["sentiment"] = sentiment_signal
+            signals["sentiment"] = sentiment_score
             
         # Aggregate signals and determine overall recommendation
         long_signals = sum(1 for value in signals.values() if value > 0)
@@ -95,39 +348,19 @@ class PositionRecommender:
         # Calculate confidence
         confidence = abs(net_signal)
         
-        # Get current price
-        current_price = float(price_data['close'].iloc[-1])
-        
-        # Calculate volatility (using ATR-like approach)
-        highs = price_data['high'].values
-        lows = price_data['low'].values
-        closes = price_data['close'].values
-        
-        ranges = []
-        for i in range(1, len(closes)):
-            true_range = max(
-                highs[i] - lows[i],                  # Current high - low
-                abs(highs[i] - closes[i-1]),         # Current high - previous close
-                abs(lows[i] - closes[i-1])           # Current low - previous close
-            )
-            ranges.append(true_range)
-            
-        avg_range = np.mean(ranges[-14:]) if ranges else current_price * 0.01
-        
         # Determine stop loss and take profit based on volatility
+        current_price = float(current_price)
         stop_loss_pips = avg_range * 2
         take_profit_pips = avg_range * 3
         
+        entry_price = current_price
         if recommendation == "LONG":
-            entry_price = current_price
             stop_loss = entry_price - stop_loss_pips
             take_profit = entry_price + take_profit_pips
         elif recommendation == "SHORT":
-            entry_price = current_price
             stop_loss = entry_price + stop_loss_pips
             take_profit = entry_price - take_profit_pips
         else:
-            entry_price = current_price
             stop_loss = None
             take_profit = None
             
@@ -147,14 +380,13 @@ class PositionRecommender:
             elif value < 0:
                 reasons.append(f"{signal}: Bearish")
                 
-        # Create recommendation object
-        position_recommendation = {
+        return {
             "symbol": symbol,
             "recommendation": recommendation,
             "confidence": round(confidence, 2),
             "entry_price": round(entry_price, 5),
-            "stop_loss": round(stop_loss, 5) if stop_loss else None,
-            "take_profit": round(take_profit, 5) if take_profit else None,
+            "stop_loss": round(float(stop_loss), 5) if stop_loss else None,
+            "take_profit": round(float(take_profit), 5) if take_profit else None,
             "risk_reward_ratio": risk_reward_ratio,
             "timestamp": datetime.now().isoformat(),
             "analysis": {
@@ -163,229 +395,6 @@ class PositionRecommender:
             }
         }
         
-        return position_recommendation
-        
-    def _calculate_ma_signals(self, price_data):
-        """Calculate Moving Average based signals"""
-        signals = {}
-        
-        # Calculate short-term MA (10 periods)
-        price_data['ma_short'] = price_data['close'].rolling(window=10).mean()
-        
-        # Calculate mid-term MA (50 periods)
-        price_data['ma_mid'] = price_data['close'].rolling(window=50).mean()
-        
-        # Calculate long-term MA (200 periods or max available)
-        ma_long_window = min(200, len(price_data) // 2)
-        price_data['ma_long'] = price_data['close'].rolling(window=ma_long_window).mean()
-        
-        # Skip if not enough data
-        if price_data['ma_short'].isna().iloc[-1] or price_data['ma_mid'].isna().iloc[-1]:
-            return signals
-            
-        # Signal 1: Short MA vs Mid MA
-        last_close = price_data['close'].iloc[-1]
-        last_ma_short = price_data['ma_short'].iloc[-1]
-        last_ma_mid = price_data['ma_mid'].iloc[-1]
-        
-        if last_ma_short > last_ma_mid:
-            signals['ma_cross'] = 1  # Bullish
-        elif last_ma_short < last_ma_mid:
-            signals['ma_cross'] = -1  # Bearish
-        else:
-            signals['ma_cross'] = 0  # Neutral
-            
-        # Signal 2: Price vs Short MA
-        if last_close > last_ma_short:
-            signals['price_vs_ma_short'] = 1  # Bullish
-        elif last_close < last_ma_short:
-            signals['price_vs_ma_short'] = -1  # Bearish
-        else:
-            signals['price_vs_ma_short'] = 0  # Neutral
-            
-        # Signal 3: Price vs Mid MA
-        if last_close > last_ma_mid:
-            signals['price_vs_ma_mid'] = 1  # Bullish
-        elif last_close < last_ma_mid:
-            signals['price_vs_ma_mid'] = -1  # Bearish
-        else:
-            signals['price_vs_ma_mid'] = 0  # Neutral
-            
-        # Signal 4: MA slope (trend direction)
-        ma_short_slope = price_data['ma_short'].iloc[-1] - price_data['ma_short'].iloc[-5]
-        if ma_short_slope > 0:
-            signals['ma_slope'] = 1  # Bullish
-        elif ma_short_slope < 0:
-            signals['ma_slope'] = -1  # Bearish
-        else:
-            signals['ma_slope'] = 0  # Neutral
-            
-        return signals
-        
-    def _calculate_rsi_signals(self, price_data):
-        """Calculate RSI based signals"""
-        signals = {}
-        
-        # Calculate RSI
-        delta = price_data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        
-        # Avoid division by zero
-        rs = gain / loss.where(loss != 0, 1)
-        rsi = 100 - (100 / (1 + rs))
-        
-        price_data['rsi'] = rsi
-        
-        # Skip if not enough data
-        if price_data['rsi'].isna().iloc[-1]:
-            return signals
-            
-        last_rsi = price_data['rsi'].iloc[-1]
-        
-        # Signal 1: RSI overbought/oversold
-        if last_rsi > 70:
-            signals['rsi_overbought'] = -1  # Bearish
-        elif last_rsi < 30:
-            signals['rsi_oversold'] = 1  # Bullish
-        else:
-            signals['rsi_neutral'] = 0  # Neutral
-            
-        # Signal 2: RSI trend
-        rsi_5_periods_ago = price_data['rsi'].iloc[-6] if len(price_data) > 5 else last_rsi
-        if last_rsi > rsi_5_periods_ago:
-            signals['rsi_trend'] = 1  # Bullish
-        elif last_rsi < rsi_5_periods_ago:
-            signals['rsi_trend'] = -1  # Bearish
-        else:
-            signals['rsi_trend'] = 0  # Neutral
-            
-        return signals
-        
-    def _calculate_macd_signals(self, price_data):
-        """Calculate MACD based signals"""
-        signals = {}
-        
-        # Calculate MACD
-        ema_12 = price_data['close'].ewm(span=12, adjust=False).mean()
-        ema_26 = price_data['close'].ewm(span=26, adjust=False).mean()
-        
-        price_data['macd'] = ema_12 - ema_26
-        price_data['macd_signal'] = price_data['macd'].ewm(span=9, adjust=False).mean()
-        price_data['macd_hist'] = price_data['macd'] - price_data['macd_signal']
-        
-        # Skip if not enough data
-        if price_data['macd'].isna().iloc[-1] or price_data['macd_signal'].isna().iloc[-1]:
-            return signals
-            
-        # Signal 1: MACD vs Signal line
-        last_macd = price_data['macd'].iloc[-1]
-        last_signal = price_data['macd_signal'].iloc[-1]
-        
-        if last_macd > last_signal:
-            signals['macd_cross'] = 1  # Bullish
-        elif last_macd < last_signal:
-            signals['macd_cross'] = -1  # Bearish
-        else:
-            signals['macd_cross'] = 0  # Neutral
-            
-        # Signal 2: MACD histogram direction
-        last_hist = price_data['macd_hist'].iloc[-1]
-        prev_hist = price_data['macd_hist'].iloc[-2] if len(price_data) > 1 else 0
-        
-        if last_hist > prev_hist:
-            signals['macd_hist_dir'] = 1  # Bullish
-        elif last_hist < prev_hist:
-            signals['macd_hist_dir'] = -1  # Bearish
-        else:
-            signals['macd_hist_dir'] = 0  # Neutral
-            
-        # Signal 3: MACD above/below zero
-        if last_macd > 0:
-            signals['macd_above_zero'] = 1  # Bullish
-        elif last_macd < 0:
-            signals['macd_below_zero'] = -1  # Bearish
-        else:
-            signals['macd_zero'] = 0  # Neutral
-            
-        return signals
-        
-    def _calculate_price_action_signals(self, price_data):
-        """Calculate price action based signals"""
-        signals = {}
-        
-        # Get recent candles
-        if len(price_data) < 3:
-            return signals
-            
-        last_candle = price_data.iloc[-1]
-        prev_candle = price_data.iloc[-2]
-        third_candle = price_data.iloc[-3]
-        
-        # Signal 1: Bullish/Bearish candle
-        if last_candle['close'] > last_candle['open']:
-            signals['last_candle'] = 1  # Bullish
-        elif last_candle['close'] < last_candle['open']:
-            signals['last_candle'] = -1  # Bearish
-        else:
-            signals['last_candle'] = 0  # Neutral
-            
-        # Signal 2: Higher highs / Lower lows (basic trend)
-        if last_candle['high'] > prev_candle['high'] and prev_candle['high'] > third_candle['high']:
-            signals['higher_highs'] = 1  # Bullish
-        elif last_candle['low'] < prev_candle['low'] and prev_candle['low'] < third_candle['low']:
-            signals['lower_lows'] = -1  # Bearish
-            
-        # Signal 3: Engulfing patterns
-        # Bullish engulfing
-        if (prev_candle['close'] < prev_candle['open'] and  # Previous candle is bearish
-            last_candle['close'] > last_candle['open'] and  # Current candle is bullish
-            last_candle['open'] <= prev_candle['close'] and  # Current open <= previous close
-            last_candle['close'] >= prev_candle['open']):   # Current close >= previous open
-            signals['bullish_engulfing'] = 1
-            
-        # Bearish engulfing
-        elif (prev_candle['close'] > prev_candle['open'] and  # Previous candle is bullish
-              last_candle['close'] < last_candle['open'] and  # Current candle is bearish
-              last_candle['open'] >= prev_candle['close'] and  # Current open >= previous close
-              last_candle['close'] <= prev_candle['open']):   # Current close <= previous open
-            signals['bearish_engulfing'] = -1
-            
-        return signals
-        
-    def _calculate_volatility_signals(self, price_data):
-        """Calculate volatility based signals"""
-        signals = {}
-        
-        # Calculate Bollinger Bands
-        price_data['ma20'] = price_data['close'].rolling(window=20).mean()
-        price_data['std20'] = price_data['close'].rolling(window=20).std()
-        price_data['upper_band'] = price_data['ma20'] + (price_data['std20'] * 2)
-        price_data['lower_band'] = price_data['ma20'] - (price_data['std20'] * 2)
-        
-        # Skip if not enough data
-        if price_data['ma20'].isna().iloc[-1]:
-            return signals
-            
-        last_close = price_data['close'].iloc[-1]
-        last_upper = price_data['upper_band'].iloc[-1]
-        last_lower = price_data['lower_band'].iloc[-1]
-        
-        # Signal 1: Price near Bollinger Bands
-        if last_close > last_upper:
-            signals['bb_upper'] = -1  # Overbought, bearish
-        elif last_close < last_lower:
-            signals['bb_lower'] = 1  # Oversold, bullish
-            
-        # Signal 2: Bollinger Band width (volatility)
-        band_width = (last_upper - last_lower) / price_data['ma20'].iloc[-1]
-        avg_band_width = ((price_data['upper_band'] - price_data['lower_band']) / price_data['ma20']).mean()
-        
-        if band_width < avg_band_width * 0.8:
-            signals['bb_squeeze'] = 0  # Neutral, but potential breakout coming
-            
-        return signals
-        
     def format_recommendation_output(self, recommendation):
         """Format the recommendation output for display"""
         symbol = recommendation["symbol"]
@@ -0,0 +1,38 @@
+"""
+Per-provider request rate limiting shared by all fetcher threads
+"""
+import threading
+import time
+from src.config import PROVIDER_RATE_LIMITS
+
+class RateLimiter:
+    """Spaces calls out so a provider never sees more than max_per_second requests"""
+    
+    def __init__(self, max_per_second):
+        self.interval = 1.0 / max_per_second if max_per_second and max_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+        
+    def acquire(self):
+        """Block until the caller may issue its next request"""
+        if not self.interval:
+            return
+            
+        # Reserve a slot under the lock, then sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            
+        if slot > now:
+            time.sleep(slot - now)
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider):
+    """Get the process-wide rate limiter for a data provider"""
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = RateLimiter(PROVIDER_RATE_LIMITS.get(provider, 0))
+        return _limiters[provider]
@@ -0,0 +1,387 @@
+"""
+Incremental (streaming) technical indicators
+
+Keeps running state per indicator so that appending a bar costs O(1) instead of
+recomputing every column over the full frame. Output matches the batch
+functions in TechnicalAnalysis applied to the accumulated bar history.
+"""
+import copy
+import math
+from collections import deque
+import numpy as np
+
+class RollingMean:
+    """Fixed-window mean using a compensated running sum"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.total = 0.0
+        self.compensation = 0.0
+
+    def _add(self, value):
+        # Kahan summation keeps the running sum as accurate as a fresh sum
+        y = value - self.compensation
+        t = self.total + y
+        self.compensation = (t - self.total) - y
+        self.total = t
+
+    def update(self, value):
+        self.values.append(value)
+        if not math.isnan(value):
+            self.nobs += 1
+            self._add(value)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if not math.isnan(old):
+                self.nobs -= 1
+                self._add(-old)
+        if self.nobs < self.window:
+            return np.nan
+        return self.total / self.nobs
+
+    def copy(self):
+        clone = copy.copy(self)
+        clone.values = self.values.copy()
+        return clone
+
+class RollingStd:
+    """Fixed-window sample standard deviation using Welford's add/remove updates"""
+
+    def __init__(self, window, ddof=1):
+        self.window = window
+        self.ddof = ddof
+        self.values = deque()
+        self.nobs = 0
+        self.mean = 0.0
+        self.ssqdm = 0.0
+
+    def update(self, value):
+        self.values.append(value)
+        if not math.isnan(value):
+            self.nobs += 1
+            delta = value - self.mean
+            self.mean += delta / self.nobs
+            self.ssqdm += ((self.nobs - 1) * delta ** 2) / self.nobs
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if not math.isnan(old):
+                self.nobs -= 1
+                if self.nobs:
+                    delta = old - self.mean
+                    self.mean -= delta / self.nobs
+                    self.ssqdm -= ((self.nobs + 1) * delta ** 2) / self.nobs
+                else:
+                    self.mean = 0.0
+                    self.ssqdm = 0.0
+        if self.nobs < self.window or self.nobs <= self.ddof:
+            return np.nan
+        return math.sqrt(max(self.ssqdm / (self.nobs - self.ddof), 0.0))
+
+    def copy(self):
+        clone = copy.copy(self)
+        clone.values = self.values.copy()
+        return clone
+
+class RollingExtreme:
+    """Fixed-window max or min using a monotonic deque"""
+
+    def __init__(self, window, mode='max'):
+        self.window = window
+        self.is_max = mode == 'max'
+        self.candidates = deque()  # (position, value), monotonic in value
+        self.nan_positions = deque()
+        self.position = -1
+
+    def update(self, value):
+        self.position += 1
+        cutoff = self.position - self.window
+        if math.isnan(value):
+            self.nan_positions.append(self.position)
+        else:
+            # Drop candidates that can never be the extreme again
+            while self.candidates and (
+                self.candidates[-1][1] <= value if self.is_max else self.candidates[-1][1] >= value
+            ):
+                self.candidates.pop()
+            self.candidates.append((self.position, value))
+        while self.candidates and self.candidates[0][0] <= cutoff:
+            self.candidates.popleft()
+        while self.nan_positions and self.nan_positions[0] <= cutoff:
+            self.nan_positions.popleft()
+        if self.position + 1 < self.window or self.nan_positions or not self.candidates:
+            return np.nan
+        return self.candidates[0][1]
+
+    def copy(self):
+        clone = copy.copy(self)
+        clone.candidates = self.candidates.copy()
+        clone.nan_positions = self.nan_positions.copy()
+        return clone
+
+class ExponentialMean:
+    """Recursive EMA matching pandas ewm(span=..., adjust=False).mean()"""
+
+    def __init__(self, span):
+        alpha = 2.0 / (span + 1.0)
+        self.old_wt_factor = 1.0 - alpha
+        self.new_wt = alpha
+        self.old_wt = 1.0
+        self.value = np.nan
+
+    def update(self, value):
+        if not math.isnan(self.value):
+            self.old_wt *= self.old_wt_factor
+            if not math.isnan(value):
+                if self.value != value:
+                    self.value = (self.old_wt * self.value + self.new_wt * value) / (self.old_wt + self.new_wt)
+                self.old_wt = 1.0
+        elif not math.isnan(value):
+            self.value = value
+        return self.value
+
+    def copy(self):
+        return copy.copy(self)
+
+class WilderMean:
+    """Wilder's smoothing: the mean of the first `period` values, then avg += (value - avg) / period"""
+
+    def __init__(self, period):
+        self.period = period
+        self.nobs = 0
+        self.total = 0.0
+        self.value = np.nan
+
+    def update(self, value):
+        if self.nobs < self.period:
+            self.nobs += 1
+            self.total += value
+            if self.nobs == self.period:
+                self.value = self.total / self.period
+        else:
+            self.value += (value - self.value) / self.period
+        return self.value
+
+    def copy(self):
+        return copy.copy(self)
+
+def relative_strength(avg_gain, avg_loss):
+    """RSI from average gains and losses: 100 without losses, NaN without any change"""
+    if math.isnan(avg_gain) or math.isnan(avg_loss):
+        return np.nan
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else np.nan
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+class StreamingIndicators:
+    """
+    Stateful indicator engine for a single (symbol, timeframe) bar stream.
+
+    The stream keeps its own bar history, and update() writes the rows of
+    add_all_indicators over that whole history for the bars of the frame it
+    is given. Only bars newer than the last one seen are processed, so a
+    polling loop over a growing frame or a fixed-length sliding window does
+    O(1) work per new bar. The most recent bar may be revised (e.g. a
+    still-forming candle). A frame that does not line up with the stored
+    history (a gap, or bars that differ) triggers a rebuild from the
+    supplied frame.
+    """
+
+    SMA_PERIODS = [10, 20, 50, 100, 200]
+    EMA_PERIODS = [10, 20, 50, 100, 200]
+    LONG_PERIOD = 200  # sma_200/ema_200 only appear once this many bars were seen
+
+    def __init__(self, rsi_period=14, rsi_method='wilder', macd_fast=12, macd_slow=26, macd_signal=9,
+                 bb_period=20, bb_std_dev=2, atr_period=14, stoch_k_period=14, stoch_d_period=3,
+                 max_history=5000):
+        if rsi_method not in ('wilder', 'sma'):
+            raise ValueError(f"Unknown RSI method {rsi_method!r}; expected 'sma' or 'wilder'")
+        self.rsi_period = rsi_period
+        self.rsi_method = rsi_method
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal = macd_signal
+        self.bb_period = bb_period
+        self.bb_std_dev = bb_std_dev
+        self.atr_period = atr_period
+        self.stoch_k_period = stoch_k_period
+        self.stoch_d_period = stoch_d_period
+        self.max_history = max_history
+        self.reset()
+
+    @property
+    def columns(self):
+        """Indicator columns in the order add_all_indicators creates them"""
+        long_ok = self._count >= self.LONG_PERIOD
+        columns = [f'sma_{p}' for p in self.SMA_PERIODS if p != self.LONG_PERIOD or long_ok]
+        columns += [f'ema_{p}' for p in self.EMA_PERIODS if p != self.LONG_PERIOD or long_ok]
+        columns += ['rsi', 'macd', 'macd_signal', 'macd_hist',
+                    'bb_middle', 'bb_upper', 'bb_lower', 'bb_bandwidth',
+                    'atr', 'stoch_k', 'stoch_d']
+        return columns
+
+    def reset(self):
+        """Drop all accumulated state"""
+        self._state = {
+            'sma': {p: RollingMean(p) for p in self.SMA_PERIODS},
+            'ema': {p: ExponentialMean(p) for p in self.EMA_PERIODS},
+            'rsi_gain': self._rsi_average(),
+            'rsi_loss': self._rsi_average(),
+            'macd_fast': ExponentialMean(self.macd_fast),
+            'macd_slow': ExponentialMean(self.macd_slow),
+            'macd_signal': ExponentialMean(self.macd_signal),
+            'bb_middle': RollingMean(self.bb_period),
+            'bb_std': RollingStd(self.bb_period),
+            'atr': RollingMean(self.atr_period),
+            'stoch_low': RollingExtreme(self.stoch_k_period, 'min'),
+            'stoch_high': RollingExtreme(self.stoch_k_period, 'max'),
+            'stoch_d': RollingMean(self.stoch_d_period),
+            'prev_close': np.nan
+        }
+        self._snapshot = None
+        self._timestamps = []
+        self._last_bar = None
+        self._count = 0
+        self._outputs = {}
+
+    def _copy_state(self):
+        """Snapshot of the indicator state; windows are short, so this is cheap"""
+        state = {}
+        for key, value in self._state.items():
+            if isinstance(value, dict):
+                state[key] = {period: indicator.copy() for period, indicator in value.items()}
+            elif isinstance(value, float):
+                state[key] = value
+            else:
+                state[key] = value.copy()
+        return state
+
+    def _rsi_average(self):
+        return WilderMean(self.rsi_period) if self.rsi_method == 'wilder' else RollingMean(self.rsi_period)
+
+    def _step(self, high, low, close):
+        """Advance every indicator by one bar and return the new row"""
+        state = self._state
+        row = {}
+
+        for period, sma in state['sma'].items():
+            row[f'sma_{period}'] = sma.update(close)
+        for period, ema in state['ema'].items():
+            row[f'ema_{period}'] = ema.update(close)
+
+        # RSI on averaged gains and losses (NaN deltas count as 0). The simple
+        # average counts the first bar as no change, Wilder's starts after it
+        prev_close = state['prev_close']
+        delta = close - prev_close
+        if self._count or self.rsi_method == 'sma':
+            avg_gain = state['rsi_gain'].update(delta if delta > 0 else 0.0)
+            avg_loss = state['rsi_loss'].update(-delta if delta < 0 else 0.0)
+        else:
+            avg_gain = avg_loss = np.nan
+        row['rsi'] = relative_strength(avg_gain, avg_loss)
+
+        macd = state['macd_fast'].update(close) - state['macd_slow'].update(close)
+        macd_signal = state['macd_signal'].update(macd)
+        row['macd'] = macd
+        row['macd_signal'] = macd_signal
+        row['macd_hist'] = macd - macd_signal
+
+        bb_middle = state['bb_middle'].update(close)
+        rolling_std = state['bb_std'].update(close)
+        row['bb_middle'] = bb_middle
+        row['bb_upper'] = bb_middle + (rolling_std * self.bb_std_dev)
+        row['bb_lower'] = bb_middle - (rolling_std * self.bb_std_dev)
+        row['bb_bandwidth'] = (row['bb_upper'] - row['bb_lower']) / bb_middle
+
+        # True range skips missing terms like DataFrame.max()
+        ranges = [r for r in (high - low, abs(high - prev_close), abs(low - prev_close)) if not math.isnan(r)]
+        row['atr'] = state['atr'].update(max(ranges) if ranges else np.nan)
+
+        lowest_low = state['stoch_low'].update(low)
+        highest_high = state['stoch_high'].update(high)
+        denominator = highest_high - lowest_low if highest_high != lowest_low else 1
+        stoch_k = 100 * ((close - lowest_low) / denominator)
+        row['stoch_k'] = stoch_k
+        row['stoch_d'] = state['stoch_d'].update(stoch_k)
+
+        state['prev_close'] = close
+        return row
+
+    def _append(self, timestamp, bar):
+        row = self._step(bar[1], bar[2], bar[3])
+        for column, value in row.items():
+            self._outputs.setdefault(column, []).append(value)
+        self._timestamps.append(timestamp)
+        self._last_bar = bar
+        self._count += 1
+
+    def _rollback_last(self):
+        """Undo the most recent bar using the snapshot taken before it"""
+        self._state = self._snapshot
+        self._snapshot = None
+        for values in self._outputs.values():
+            values.pop()
+        self._timestamps.pop()
+        self._count -= 1
+        self._last_bar = None
+
+    def _trim(self, keep):
+        # Amortised O(1): only trim once the history doubles the limit
+        keep = max(keep, self.max_history)
+        if len(self._timestamps) > 2 * keep:
+            self._timestamps = self._timestamps[-keep:]
+            for column in self._outputs:
+                self._outputs[column] = self._outputs[column][-keep:]
+
+    def update(self, df):
+        """
+        Process any new bars in df and write all indicator columns into it.
+
+        Args:
+            df (pd.DataFrame): OHLC frame whose rows are the latest bars of the stream,
+                               in chronological order
+
+        Returns:
+            pd.DataFrame: df with indicator columns added
+        """
+        if df is None or len(df) == 0:
+            return df
+
+        prices = df[['open', 'high', 'low', 'close']]
+        n_old = 0
+        if self._timestamps:
+            # Rows up to the last bar seen must be the tail of the stored history
+            n_old = int(df.index.searchsorted(self._timestamps[-1], side='right'))
+            aligned = (
+                0 < n_old <= len(self._timestamps)
+                and df.index[n_old - 1] == self._timestamps[-1]
+                and df.index[0] == self._timestamps[-n_old]
+            )
+            if not aligned:
+                self.reset()
+                n_old = 0
+
+        # Only the last bar seen (to detect a revision) and the new bars are read
+        first = max(n_old - 1, 0)
+        bars = prices.iloc[first:].to_numpy(dtype=float)
+        if n_old and tuple(bars[0]) != self._last_bar:
+            if self._snapshot is None:
+                self.reset()
+                n_old = first = 0
+                bars = prices.to_numpy(dtype=float)
+            else:
+                # The latest bar was revised - replay it
+                self._rollback_last()
+                n_old -= 1
+
+        for i in range(n_old, len(df)):
+            if i == len(df) - 1:
+                self._snapshot = self._copy_state()
+            self._append(df.index[i], tuple(bars[i - first]))
+        self._trim(len(df))
+
+        for column in self.columns:
+            df[column] = np.asarray(self._outputs[column][-len(df):], dtype=float)
+
+        return df
@@ -12,10 +12,15 @@ except ImportError:
     HAS_PANDAS_TA = False
     
 from src.config import MOVING_AVERAGES, RSI_PERIOD, MACD_SETTINGS
+from src.utils.streaming_indicators import StreamingIndicators
+from src.utils.indicator_kernels import compute_rsi, find_extrema
 
 class TechnicalAnalysis:
     """Static class for technical analysis functions"""
     
+    # Streaming indicator engines keyed by (symbol, timeframe)
+    _streaming_engines = {}
+    
     @staticmethod
     def add_all_indicators(df):
         """Add all technical indicators to a DataFrame"""
@@ -46,6 +51,40 @@ class TechnicalAnalysis:
             cprint(f"❌ Error adding indicators: {str(e)}", "red")
             return df
     
+    @staticmethod
+    def add_all_indicators_incremental(df, symbol, timeframe):
+        """
+        Add all technical indicators using a per-(symbol, timeframe) streaming engine.
+        
+        The engine keeps the stream's bar history, so values are those of
+        add_all_indicators over all bars seen for the stream, on df's rows.
+        Only bars newer than the previous call are processed, so polling a
+        growing frame or a fixed-length sliding window costs O(1) per new bar.
+        """
+        if df is None or len(df) < 10:
+            return df
+            
+        key = (symbol, timeframe)
+        engine = TechnicalAnalysis._streaming_engines.get(key)
+        if engine is None:
+            engine = StreamingIndicators()
+            TechnicalAnalysis._streaming_engines[key] = engine
+            
+        try:
+            return engine.update(df)
+        except Exception as e:
+            cprint(f"❌ Error updating streaming indicators: {str(e)}", "red")
+            engine.reset()
+            return TechnicalAnalysis.add_all_indicators(df)
+    
+    @staticmethod
+    def reset_streaming_indicators(symbol=None, timeframe=None):
+        """Drop streaming indicator state for one (symbol, timeframe) or for all streams"""
+        if symbol is None:
+            TechnicalAnalysis._streaming_engines.clear()
+        else:
+            TechnicalAnalysis._streaming_engines.pop((symbol, timeframe), None)
+    
     @staticmethod
     def add_moving_averages(df):
         """Add moving averages to DataFrame"""
@@ -72,23 +111,9 @@ class TechnicalAnalysis:
         return df
     
     @staticmethod
-    def add_rsi(df, period=14):
-        """Add Relative Strength Index to DataFrame"""
-        delta = df['close'].diff()
-        
-        # Get gains and losses
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-        
-        # Calculate average gain and loss
-        avg_gain = gain.rolling(window=period).mean()
-        avg_loss = loss.rolling(window=period).mean()
-        
-        # Calculate RS
-        rs = avg_gain / avg_loss.where(avg_loss != 0, 1)  # avoid division by zero
-        
-        # Calculate RSI
-        df['rsi'] = 100 - (100 / (1 + rs))
+    def add_rsi(df, period=14, method='wilder'):
+        """Add Relative Strength Index to DataFrame ('wilder' or 'sma' smoothing)"""
+        df['rsi'] = compute_rsi(df['close'].to_numpy(dtype=float), period, method)
         
         return df
     
@@ -203,20 +228,12 @@ class TechnicalAnalysis:
         if len(df) < window * 2:
             return None, None
             
-        # Get local minima and maxima
-        local_min = []
-        local_max = []
-        
-        for i in range(window, len(df) - window):
-            # Check for local minimum
-            if all(df['low'].iloc[i] <= df['low'].iloc[i-j] for j in range(1, window+1)) and \
-               all(df['low'].iloc[i] <= df['low'].iloc[i+j] for j in range(1, window+1)):
-                local_min.append(df['low'].iloc[i])
-                
-            # Check for local maximum
-            if all(df['high'].iloc[i] >= df['high'].iloc[i-j] for j in range(1, window+1)) and \
-               all(df['high'].iloc[i] >= df['high'].iloc[i+j] for j in range(1, window+1)):
-                local_max.append(df['high'].iloc[i])
+        # Get local minima and maxima (ties with neighbouring bars count)
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        max_index, min_index = find_extrema(high, low, window, strict=False)
+        local_min = list(low[min_index])
+        local_max = list(high[max_index])
         
         # Calculate support (average of recent local minima)
         support = np.mean(local_min[-3:]) if len(local_min) >= 3 else None
@@ -11,12 +11,15 @@ import random
 from pathlib import Path
 from datetime import datetime, timedelta
 from termcolor import cprint
+from src.utils.rate_limiter import get_rate_limiter
+from src.data.bar_store import BarStore
 
 class YFinanceDataFetcher:
     def __init__(self):
         """Initialize the data fetcher with Yahoo Finance"""
         self.environment = os.getenv("ENVIRONMENT", "development")
         self.cache_dir = self._setup_cache_directory()
+        self.bar_store = BarStore(self.cache_dir / "bars")
         self.cache_duration = 1  # Cache duration in hours
         self.max_retries = 3
         self.base_delay = 2  # Base delay in seconds for retry
@@ -88,56 +91,51 @@ class YFinanceDataFetcher:
             # If we got no data, try with a longer timeframe
             if df is None or len(df) == 0:
                 cprint(f"⚠️ No data found for {yf_symbol} with interval {interval}. Trying with daily data.", "yellow")
-                # Add a delay to avoid rate limiting
-                time.sleep(1)
                 df = self._fetch_with_retry(
                     yf_symbol,
                     start_date - timedelta(days=30),  # Go further back
                     end_date,
                     "1d"  # Use daily data
                 )
+                interval = "1d"
             
             # Check if we have any data
             if df is None or len(df) == 0:
                 cprint(f"❌ No data available for {yf_symbol}", "red")
                 if self.environment == "development":
-                    df = self._get_simulated_data(symbol, timeframe, count)
-                    # Save simulated data to cache
-                    self._save_to_cache(symbol, timeframe, count, df)
-                    return df
+                    # Simulated bars are never cached, so they can't mix into real series
+                    return self._get_simulated_data(symbol, timeframe, count)
                 return None
             
             # Process the data
             df = self._process_data_frame(df, count)
             
-            # Save to cache
-            self._save_to_cache(symbol, timeframe, count, df)
+            # Save to cache under the interval the bars actually have
+            self._save_to_cache(symbol, interval, count, df)
             
             return df
             
         except Exception as e:
             cprint(f"❌ Error fetching price data: {str(e)}", "red")
             if self.environment == "development":
-                df = self._get_simulated_data(symbol, timeframe, count)
-                # Save simulated data to cache
-                self._save_to_cache(symbol, timeframe, count, df)
-                return df
+                return self._get_simulated_data(symbol, timeframe, count)
             return None
     
     def _fetch_with_retry(self, symbol, start_date, end_date, interval, current_retry=0):
         """Fetch data with exponential backoff retry logic"""
         try:
-            # Add a small random delay to avoid consecutive rapid requests
-            jitter = random.uniform(0.1, 0.5)
-            time.sleep(jitter)
+            # Shared limiter spaces out requests across all fetcher threads
+            get_rate_limiter('yfinance').acquire()
             
             cprint(f"📈 Fetching {symbol} data from Yahoo Finance...", "cyan")
-            df = yf.download(
-                symbol,
+            # Ticker.history keeps no module-level state, unlike yf.download,
+            # so concurrent fetches for different symbols don't interfere
+            df = yf.Ticker(symbol).history(
                 start=start_date,
                 end=end_date,
                 interval=interval,
-                progress=False
+                auto_adjust=False,
+                actions=False
             )
             return df
         except Exception as e:
@@ -177,43 +175,38 @@ class YFinanceDataFetcher:
             
         return df
     
-    def _get_cache_path(self, symbol, timeframe, count):
-        """Get the file path for a cached data item"""
-        safe_symbol = symbol.replace('/', '_').replace('\\', '_')
-        filename = f"{safe_symbol}_{timeframe}_{count}.pkl"
-        return self.cache_dir / filename
-    
     def _get_from_cache(self, symbol, timeframe, count):
-        """Try to get data from cache if available and not expired"""
-        cache_path = self._get_cache_path(symbol, timeframe, count)
-        
-        if not cache_path.exists():
+        """Try to get data from the bar store if it is recent and long enough"""
+        updated = self.bar_store.last_modified(symbol, timeframe)
+        if updated is None:
             return None
             
         # Check if cache is still valid
-        cache_time = datetime.fromtimestamp(cache_path.stat().st_mtime)
-        cache_age = datetime.now() - cache_time
+        cache_age = datetime.now() - updated
         
         if cache_age > timedelta(hours=self.cache_duration):
             cprint(f"🔄 Cache expired for {symbol}, fetching fresh data...", "blue")
             return None
             
         try:
-            df = pd.read_pickle(cache_path)
-            cprint(f"📂 Using cached data for {symbol}", "green")
-            return df
+            df = self.bar_store.tail(symbol, timeframe, count)
         except Exception as e:
             cprint(f"⚠️ Error reading from cache: {str(e)}", "yellow")
             return None
+            
+        if len(df) < count:
+            return None
+            
+        cprint(f"📂 Using cached data for {symbol}", "green")
+        return df
     
     def _save_to_cache(self, symbol, timeframe, count, df):
-        """Save data to cache"""
+        """Append fetched bars to the bar store"""
         if df is None or len(df) == 0:
             return
             
         try:
-            cache_path = self._get_cache_path(symbol, timeframe, count)
-            df.to_pickle(cache_path)
+            self.bar_store.write(symbol, timeframe, df)
             cprint(f"💾 Saved {symbol} data to cache", "green")
         except Exception as e:
             cprint(f"⚠️ Error saving to cache: {str(e)}", "yellow")
@@ -242,8 +235,7 @@ class YFinanceDataFetcher:
             # Convert forex pair to Yahoo Finance format if needed
             yf_symbol = self._convert_to_yf_symbol(symbol)
             
-            # Add a small random delay
-            time.sleep(random.uniform(0.1, 0.3))
+            get_rate_limiter('yfinance').acquire()
             
             # Get the most recent price
             ticker = yf.Ticker(yf_symbol)
@@ -0,0 +1,86 @@
+"""
+Tests for the concurrent analysis scheduler and provider rate limiting
+"""
+import os
+import sys
+import time
+import unittest
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils.analysis_scheduler import AnalysisScheduler
+from src.utils.rate_limiter import RateLimiter
+
+def slow_square(value, delay):
+    """Square a value after a delay (module level so worker processes can run it)"""
+    time.sleep(delay)
+    return value * value
+
+def fail_on_three(value):
+    if value == 3:
+        raise ValueError("bad value")
+    return value
+
+class TestAnalysisScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = AnalysisScheduler(max_fetch_workers=4, max_process_workers=2)
+        
+    def tearDown(self):
+        self.scheduler.shutdown()
+        
+    def test_results_keep_submission_order(self):
+        # Later items finish first, results must still line up with the inputs
+        items = [(i, 0.05 * (5 - i)) for i in range(5)]
+        expected = [i * i for i in range(5)]
+        self.assertEqual(self.scheduler.map_io(slow_square, items), expected)
+        self.assertEqual(self.scheduler.map_cpu(slow_square, items), expected)
+        
+    def test_inline_evaluation(self):
+        scheduler = AnalysisScheduler(max_process_workers=0)
+        self.assertEqual(scheduler.map_cpu(slow_square, [(2, 0), (3, 0)]), [4, 9])
+        self.assertIsNone(scheduler._process_pool)
+        
+    def test_return_exceptions(self):
+        items = [(i,) for i in range(5)]
+        for mapper in (self.scheduler.map_io, self.scheduler.map_cpu):
+            results = mapper(fail_on_three, items, return_exceptions=True)
+            self.assertEqual(results[:3] + results[4:], [0, 1, 2, 4])
+            self.assertIsInstance(results[3], ValueError)
+            with self.assertRaises(ValueError):
+                mapper(fail_on_three, items)
+                
+    def test_stage_timings(self):
+        with self.scheduler.stage('fetch'):
+            time.sleep(0.01)
+        self.assertGreaterEqual(self.scheduler.timings['fetch'], 0.01)
+        
+    def test_shutdown_releases_the_workers(self):
+        self.scheduler.map_cpu(slow_square, [(2, 0), (3, 0)])
+        pool = self.scheduler._process_pool
+        self.scheduler.shutdown()
+        self.assertIsNone(self.scheduler._process_pool)
+        with self.assertRaises(RuntimeError):
+            pool.submit(slow_square, 2, 0)
+        # The next cycle starts a new pool
+        self.assertEqual(self.scheduler.map_cpu(slow_square, [(2, 0), (3, 0)]), [4, 9])
+
+class TestRateLimiter(unittest.TestCase):
+    def test_spacing_across_threads(self):
+        limiter = RateLimiter(max_per_second=20)
+        scheduler = AnalysisScheduler(max_fetch_workers=8)
+        start = time.monotonic()
+        scheduler.map_io(limiter.acquire, [()] * 6)
+        # Six calls need at least five intervals of 50ms
+        self.assertGreaterEqual(time.monotonic() - start, 0.25 - 1e-3)
+        
+    def test_unlimited(self):
+        limiter = RateLimiter(max_per_second=0)
+        start = time.monotonic()
+        for _ in range(100):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.05)
+
+if __name__ == '__main__':
+    unittest.main()
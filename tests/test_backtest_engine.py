@@ -0,0 +1,166 @@
+"""
+Tests for the backtesting engine execution modes
+"""
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.backtesting.backtest_engine import BacktestEngine
+from src.backtesting.prefix_cache import PrefixSignalCache
+from src.data.historical_data_manager import HistoricalDataManager
+from src.strategies.moving_average_strategy import MovingAverageStrategy
+from src.strategies.kishoka_strategy import KishokaStrategy
+from src.strategies.rsi_divergence import RSIDivergenceStrategy
+
+def generate_price_data(periods=200, seed=7):
+    """Generate a trending random walk with OHLCV columns"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start='2023-01-01', periods=periods, freq='1h')
+    closes = 1.1 + np.cumsum(rng.normal(0, 0.002, periods)) + 0.02 * np.sin(np.linspace(0, 12, periods))
+    opens = np.concatenate(([closes[0]], closes[:-1]))
+    spread = np.abs(rng.normal(0, 0.001, periods))
+    data = pd.DataFrame({
+        'open': opens,
+        'high': np.maximum(opens, closes) + spread,
+        'low': np.minimum(opens, closes) - spread,
+        'close': closes,
+        'volume': rng.integers(100, 10000, periods)
+    }, index=dates)
+    return data
+
+class TestBacktestModes(unittest.TestCase):
+    def setUp(self):
+        """Set up an engine backed by a throwaway data manager"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        data_manager = HistoricalDataManager(
+            data_dir=os.path.join(self.tmp_dir.name, 'historical'),
+            cache_dir=os.path.join(self.tmp_dir.name, 'cache')
+        )
+        self.engine = BacktestEngine(data_manager)
+        self.data = data_manager.preprocess_data(generate_price_data())
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def _run_both(self, strategy):
+        loop = self.engine.run_backtest(strategy, 'EUR/USD', None, None, data=self.data, mode='loop', warm_start=False)
+        vectorized = self.engine.run_backtest(strategy, 'EUR/USD', None, None, data=self.data, mode='vectorized')
+        return loop, vectorized
+        
+    def _assert_same_results(self, loop, vectorized):
+        self.assertGreater(len(loop['trades']), 0)
+        self.assertEqual(
+            [(t['timestamp'], t['type'], t['price']) for t in loop['trades']],
+            [(t['timestamp'], t['type'], t['price']) for t in vectorized['trades']]
+        )
+        np.testing.assert_allclose(
+            [t['capital'] for t in loop['trades']],
+            [t['capital'] for t in vectorized['trades']],
+            rtol=1e-10
+        )
+        np.testing.assert_allclose(loop['equity_curve'], vectorized['equity_curve'], rtol=1e-10)
+        self.assertAlmostEqual(loop['final_capital'], vectorized['final_capital'], places=6)
+        
+    def test_moving_average_modes_match(self):
+        """Vectorized mode reproduces the bar loop for the MA strategy"""
+        strategy = MovingAverageStrategy(params={'fast_period': 5, 'slow_period': 20})
+        self._assert_same_results(*self._run_both(strategy))
+        
+    def test_kishoka_modes_match(self):
+        """Vectorized mode reproduces the bar loop for the Kishoka strategy"""
+        strategy = KishokaStrategy(params={'swing_length': 10})
+        self._assert_same_results(*self._run_both(strategy))
+        
+    def test_rsi_divergence_modes_match(self):
+        """Vectorized mode reproduces the bar loop for the RSI divergence strategy"""
+        strategy = RSIDivergenceStrategy(rsi_period=7)
+        self._assert_same_results(*self._run_both(strategy))
+        
+    def test_auto_mode_selection(self):
+        """Strategies without a signal array fall back to the bar loop"""
+        self.assertTrue(MovingAverageStrategy().supports_vectorized)
+        with self.assertRaises(ValueError):
+            self.engine.run_backtest(MovingAverageStrategy(), 'EUR/USD', None, None, data=self.data, mode='fast')
+
+class TestParamBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        data_manager = HistoricalDataManager(
+            data_dir=os.path.join(self.tmp_dir.name, 'historical'),
+            cache_dir=os.path.join(self.tmp_dir.name, 'cache')
+        )
+        self.engine = BacktestEngine(data_manager)
+        self.data = data_manager.preprocess_data(generate_price_data(periods=400))
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def _assert_batch_matches(self, strategy, param_sets, build):
+        batch = self.engine.run_param_batch(strategy, self.data, param_sets)
+        self.assertEqual(batch['equity'].shape, (len(param_sets), len(self.data)))
+        for k, params in enumerate(param_sets):
+            single = self.engine.run_backtest(build(params), 'EUR/USD', None, None, data=self.data, mode='vectorized')
+            np.testing.assert_allclose(batch['equity'][k], single['equity_curve'], rtol=1e-10)
+            self.assertEqual(batch['n_trades'][k], len(single['trades']))
+            for key, value in single['metrics'].items():
+                np.testing.assert_allclose(batch[key][k], value, rtol=1e-8, err_msg=f"{params} {key}")
+                
+    def test_moving_average_param_batch(self):
+        """Each row of the batch equals a separate vectorized backtest"""
+        param_sets = [{'fast_period': f, 'slow_period': s} for f in (3, 5, 10) for s in (20, 30)]
+        param_sets.append({'fast_period': 10, 'slow_period': 20, 'stop_loss_multiplier': 3.0})
+        self._assert_batch_matches(
+            MovingAverageStrategy(), param_sets, lambda params: MovingAverageStrategy(params=params)
+        )
+        
+    def test_rsi_divergence_param_batch(self):
+        """RSI is computed once per distinct period and rows match single backtests"""
+        param_sets = [{'rsi_period': p} for p in (5, 7, 14, 7)]
+        self._assert_batch_matches(
+            RSIDivergenceStrategy(), param_sets, lambda params: RSIDivergenceStrategy(**params)
+        )
+
+class TestPrefixSignalCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        data_manager = HistoricalDataManager(
+            data_dir=os.path.join(self.tmp_dir.name, 'historical'),
+            cache_dir=os.path.join(self.tmp_dir.name, 'cache')
+        )
+        self.engine = BacktestEngine(data_manager)
+        self.data = data_manager.preprocess_data(generate_price_data())
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def test_warm_start_matches_plain_loop(self):
+        """Warm-started bar loop produces exactly the plain loop's results"""
+        strategy = MovingAverageStrategy(params={'fast_period': 5, 'slow_period': 20})
+        cold = self.engine.run_backtest(strategy, 'EUR/USD', None, None, data=self.data, mode='loop', warm_start=False)
+        warm = self.engine.run_backtest(strategy, 'EUR/USD', None, None, data=self.data, mode='loop', warm_start=True)
+        self.assertEqual(cold['trades'], warm['trades'])
+        self.assertEqual(cold['equity_curve'], warm['equity_curve'])
+        self.assertNotIn('generate_signals', vars(strategy))
+        
+    def test_point_in_time_view(self):
+        """Cached views never expose signals after the prefix's last bar"""
+        cache = PrefixSignalCache(KishokaStrategy(params={'swing_length': 10}), self.data)
+        self.assertTrue(cache.verify())
+        cutoff = self.data.index[100]
+        self.assertTrue(all(s['timestamp'] <= cutoff for s in cache.signals_until(cutoff)))
+        
+    def test_lookahead_strategy_rejected(self):
+        """Strategies using centered windows fail verification"""
+        cache = PrefixSignalCache(RSIDivergenceStrategy(), self.data)
+        self.assertGreater(len(cache.signals), 0)
+        self.assertFalse(cache.verify())
+
+if __name__ == '__main__':
+    unittest.main()
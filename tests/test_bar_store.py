@@ -0,0 +1,223 @@
+"""
+Tests for the columnar on-disk bar store
+"""
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.data.bar_store import BarStore
+from src.data.historical_data_manager import HistoricalDataManager
+from src.utils.yfinance_data_fetcher import YFinanceDataFetcher
+
+def generate_bars(start='2024-01-25', periods=500, freq='1h', tz=None, seed=3):
+    """Generate OHLCV bars with a float and an integer column type"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start=start, periods=periods, freq=freq, tz=tz, name='Datetime')
+    close = 100 + np.cumsum(rng.normal(0, 0.5, periods))
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.1, periods),
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': rng.integers(100, 1000, periods)
+    }, index=index)
+
+class TestBarStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = BarStore(self.tmp_dir.name)
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def test_round_trip_and_range_slice(self):
+        bars = generate_bars(tz='America/New_York')
+        self.assertEqual(self.store.write('EUR/USD', '1h', bars), len(bars))
+        pd.testing.assert_frame_equal(self.store.read('EUR/USD', '1h'), bars, check_freq=False)
+        
+        # Spans a partition boundary (bars start in January)
+        start, end = bars.index[100], bars.index[300]
+        pd.testing.assert_frame_equal(
+            self.store.read('EUR/USD', '1h', start, end), bars.loc[start:end], check_freq=False
+        )
+        pd.testing.assert_frame_equal(self.store.tail('EUR/USD', '1h', 50), bars.iloc[-50:], check_freq=False)
+        self.assertEqual(self.store.bounds('EUR/USD', '1h'), (bars.index[0], bars.index[-1]))
+        
+    def test_append_does_not_rewrite_history(self):
+        bars = generate_bars()
+        self.store.write('AAPL', '1h', bars.iloc[:200])
+        january = os.path.join(self.tmp_dir.name, 'AAPL', '1h', '2024-01', 'close.f8')
+        inode = os.stat(january).st_ino
+        
+        self.store.write('AAPL', '1h', bars.iloc[180:])  # Overlaps the stored February bars only
+        self.store.write('AAPL', '1h', bars.iloc[-1:])
+        pd.testing.assert_frame_equal(self.store.read('AAPL', '1h'), bars, check_freq=False)
+        self.assertEqual(os.stat(january).st_ino, inode)
+        
+    def test_revised_and_out_of_order_bars(self):
+        bars = generate_bars()
+        self.store.write('AAPL', '1h', bars.iloc[250:])
+        self.store.write('AAPL', '1h', bars.iloc[:260])
+        
+        revised = bars.iloc[-1:].copy()
+        revised['close'] = 1.0
+        self.store.write('AAPL', '1h', revised)
+        
+        expected = bars.copy()
+        expected.iloc[-1, expected.columns.get_loc('close')] = 1.0
+        pd.testing.assert_frame_equal(self.store.read('AAPL', '1h'), expected, check_freq=False)
+        
+    def test_missing_series(self):
+        self.assertTrue(self.store.read('XAU/USD', '1d').empty)
+        self.assertIsNone(self.store.bounds('XAU/USD', '1d'))
+        self.assertIsNone(self.store.last_modified('XAU/USD', '1d'))
+        
+    def test_missing_ranges(self):
+        bars = generate_bars(periods=300, freq='1D')
+        self.assertEqual(
+            self.store.missing_ranges('AAPL', '1d', '2024-02-01', '2024-03-01'),
+            [(pd.Timestamp('2024-02-01'), pd.Timestamp('2024-03-01'))]
+        )
+        self.store.write('AAPL', '1d', bars.loc['2024-02-01':'2024-03-01'], covered=('2024-02-01', '2024-03-01'))
+        self.store.write('AAPL', '1d', bars.iloc[:0], covered=('2024-04-01', '2024-04-10'))
+        
+        one_ns = pd.Timedelta(1, 'ns')
+        self.assertEqual(
+            self.store.missing_ranges('AAPL', '1d', '2024-01-15', '2024-05-01'),
+            [
+                (pd.Timestamp('2024-01-15'), pd.Timestamp('2024-02-01') - one_ns),
+                (pd.Timestamp('2024-03-01') + one_ns, pd.Timestamp('2024-04-01') - one_ns),
+                (pd.Timestamp('2024-04-10') + one_ns, pd.Timestamp('2024-05-01'))
+            ]
+        )
+        self.assertEqual(self.store.missing_ranges('AAPL', '1d', '2024-02-10', '2024-02-20'), [])
+        self.assertEqual(len(self.store.coverage('AAPL', '1d')), 2)
+
+class CountingDataManager(HistoricalDataManager):
+    """Records the ranges passed to _fetch_data"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetches = []
+        
+    def _fetch_data(self, symbol, start_date, end_date, timeframe):
+        self.fetches.append((pd.Timestamp(start_date), pd.Timestamp(end_date)))
+        return super()._fetch_data(symbol, start_date, end_date, timeframe)
+
+class TestGapFillingLoad(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        data_dir = os.path.join(self.tmp_dir.name, 'historical')
+        self.manager = CountingDataManager(data_dir=data_dir, cache_dir=os.path.join(self.tmp_dir.name, 'cache'))
+        self.bars = generate_bars(periods=300, freq='1D')
+        self.bars.to_csv(os.path.join(data_dir, 'AAPL_1d.csv'))
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def assert_matches_source(self, data, start, end):
+        pd.testing.assert_frame_equal(data, self.bars.loc[start:end], check_freq=False, check_names=False)
+        
+    def test_only_missing_ranges_are_fetched(self):
+        self.assert_matches_source(self.manager.load_data('AAPL', '2024-02-01', '2024-03-31'), '2024-02-01', '2024-03-31')
+        self.assertEqual(len(self.manager.fetches), 1)
+        
+        self.assert_matches_source(self.manager.load_data('AAPL', '2024-02-01', '2024-06-30'), '2024-02-01', '2024-06-30')
+        self.assertEqual(self.manager.fetches[1], (pd.Timestamp('2024-03-31') + pd.Timedelta(1, 'ns'), pd.Timestamp('2024-06-30')))
+        
+        # Sliding windows inside the covered range do no I/O at all
+        for month in range(3, 6):
+            start, end = f'2024-0{month}-01', f'2024-0{month + 1}-15'
+            self.assert_matches_source(self.manager.load_data('AAPL', start, end), start, end)
+        self.assertEqual(len(self.manager.fetches), 2)
+        
+    def test_closed_market_tails_are_not_refetched(self):
+        # Weekday hourly bars, requested up to a Sunday midnight
+        bars = generate_bars(start='2024-01-22', periods=24 * 21, freq='1h')
+        bars = bars[bars.index.dayofweek < 5]
+        bars.to_csv(os.path.join(self.manager.data_dir, 'EURUSD_1h.csv'))
+        self.manager.load_data('EURUSD', '2024-01-29', '2024-02-04', '1h')
+        self.assertEqual(self.manager.bar_store.coverage('EURUSD', '1h'),
+                         [(pd.Timestamp('2024-01-29'), pd.Timestamp('2024-02-04'))])
+        
+        self.manager.cache.clear()
+        data = self.manager.load_data('EURUSD', '2024-01-29', '2024-02-04', '1h')
+        pd.testing.assert_frame_equal(data, bars.loc['2024-01-29':'2024-02-04'], check_freq=False, check_names=False)
+        self.assertEqual(len(self.manager.fetches), 1)
+        
+    def test_recent_ranges_are_refetched(self):
+        today = pd.Timestamp.now().normalize()
+        self.bars = generate_bars(start=today - pd.Timedelta(days=20), periods=20, freq='1D')
+        self.bars.to_csv(os.path.join(self.manager.data_dir, 'AAPL_1d.csv'))
+        start, end = today - pd.Timedelta(days=20), today + pd.Timedelta(days=30)
+        # The last day before now may still get bars, so it is not covered
+        self.manager.load_data('AAPL', start, end)
+        [(covered_start, covered_end)] = self.manager.bar_store.coverage('AAPL', '1d')
+        self.assertEqual(covered_start, start)
+        self.assertTrue(self.bars.index[-1] <= covered_end < pd.Timestamp.now() - pd.Timedelta(hours=23))
+        
+        # The source publishes more bars, which the next load picks up
+        self.bars = pd.concat([self.bars, generate_bars(start=today, periods=1, freq='1D', seed=4)])
+        self.bars.to_csv(os.path.join(self.manager.data_dir, 'AAPL_1d.csv'))
+        self.manager.cache.clear()
+        self.assert_matches_source(self.manager.load_data('AAPL', start, end), start, end)
+        self.assertEqual(self.manager.fetches[-1][0], covered_end + pd.Timedelta(1, 'ns'))
+        
+    def test_ranges_without_bars_are_refetched(self):
+        # A range with no bars at all is not recorded as fetched
+        self.manager.load_data('AAPL', '2030-01-01', '2030-02-01')
+        self.assertEqual(self.manager.bar_store.missing_ranges('AAPL', '1d', '2030-01-01', '2030-02-01'),
+                         [(pd.Timestamp('2030-01-01'), pd.Timestamp('2030-02-01'))])
+        
+    def test_force_refresh_refetches(self):
+        self.manager.load_data('AAPL', '2024-02-01', '2024-03-31')
+        self.manager.load_data('AAPL', '2024-02-01', '2024-03-31', force_refresh=True)
+        self.assertEqual(len(self.manager.fetches), 2)
+
+class OfflineFetcher(YFinanceDataFetcher):
+    """Caches into a temporary directory and serves bars only for the intervals in `bars`"""
+    
+    def __init__(self, cache_dir, bars):
+        self.tmp_cache_dir = cache_dir
+        self.bars = bars
+        super().__init__()
+        self.environment = 'development'
+        
+    def _setup_cache_directory(self):
+        return Path(self.tmp_cache_dir)
+        
+    def _fetch_with_retry(self, symbol, start_date, end_date, interval, current_retry=0):
+        bars = self.bars.get(interval)
+        return None if bars is None else bars.rename(columns=str.capitalize)
+
+class TestFetcherCaching(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def test_simulated_bars_are_not_cached(self):
+        fetcher = OfflineFetcher(self.tmp_dir.name, {})
+        self.assertEqual(len(fetcher.get_price_data('EUR/USD', '1h', count=50)), 50)
+        self.assertIsNone(fetcher.bar_store.last_modified('EUR/USD', '1h'))
+        self.assertIsNone(fetcher.bar_store.last_modified('EUR/USD', '1d'))
+        
+    def test_daily_fallback_is_cached_as_daily(self):
+        daily = generate_bars(periods=60, freq='1D')
+        fetcher = OfflineFetcher(self.tmp_dir.name, {'1d': daily})
+        data = fetcher.get_price_data('EUR/USD', '1h', count=20)
+        pd.testing.assert_frame_equal(data, daily.iloc[-20:], check_freq=False)
+        self.assertIsNone(fetcher.bar_store.last_modified('EUR/USD', '1h'))
+        self.assertEqual(len(fetcher.bar_store.read('EUR/USD', '1d')), 20)
+
+if __name__ == '__main__':
+    unittest.main()
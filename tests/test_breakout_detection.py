@@ -0,0 +1,65 @@
+"""
+Tests for breakout detection against confirmed support/resistance levels
+"""
+import os
+import sys
+import unittest
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.strategies.breakout_detection import BreakoutDetectionStrategy
+from tests.test_backtest_engine import generate_price_data
+
+def scan_breakouts(strategy, data, levels):
+    """Reference: compare every bar with every level confirmed by then"""
+    window = strategy.params['lookback_period']
+    margin = strategy.params['min_breakout_percentage']
+    avg_volume = data['volume'].rolling(window=window).mean()
+    found = []
+    for i in range(len(data)):
+        if not data['volume'].iloc[i] > avg_volume.iloc[i] * strategy.params['volume_threshold']:
+            continue
+        price = data['close'].iloc[i]
+        for direction, side, broken in (
+            ('bullish', 'resistance', lambda level: price > level * (1 + margin)),
+            ('bearish', 'support', lambda level: price < level * (1 - margin))
+        ):
+            prices = [
+                level['price'] for level in levels[side]
+                if data.index.get_loc(level['timestamp']) + window <= i and broken(level['price'])
+            ]
+            if prices:
+                nearest = max(prices) if direction == 'bullish' else min(prices)
+                found.append((data.index[i], direction, nearest, len(prices)))
+    return found
+
+class TestBreakoutDetection(unittest.TestCase):
+    def setUp(self):
+        self.data = generate_price_data(periods=1500, seed=5)
+        self.strategy = BreakoutDetectionStrategy(lookback_period=10, volume_threshold=1.3, min_breakout_percentage=0.005)
+        
+    def test_matches_bar_by_level_scan(self):
+        levels = self.strategy.find_support_resistance(self.data)
+        breakouts = self.strategy.detect_breakouts(self.data, levels)
+        expected = scan_breakouts(self.strategy, self.data, levels)
+        self.assertEqual({direction for _, direction, _, _ in expected}, {'bullish', 'bearish'})
+        self.assertEqual(
+            [(b['timestamp'], b['type'], b['level_price'], b['levels_broken']) for b in breakouts], expected
+        )
+        
+    def test_no_lookahead(self):
+        full = self.strategy.analyze(self.data)['breakouts']
+        for end in (300, 700, 1100):
+            prefix = self.strategy.analyze(self.data.iloc[:end])['breakouts']
+            cutoff = self.data.index[end]
+            self.assertEqual(prefix, [b for b in full if b['timestamp'] < cutoff])
+            
+    def test_no_levels(self):
+        levels = {'support': [], 'resistance': []}
+        self.assertEqual(self.strategy.detect_breakouts(self.data, levels), [])
+        self.assertEqual(self.strategy.get_recommendation(self.data.iloc[:15])['action'], 'hold')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for the trading cost models
+"""
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.backtesting.backtest_engine import BacktestEngine
+from src.backtesting.costs import CostModel, InstrumentCostModel, ROLLOVER_WEIGHTS, rollover_counts
+from src.backtesting.event_engine import EventDrivenBacktester
+from src.backtesting.portfolio_backtest import PortfolioBacktester
+from src.data.historical_data_manager import HistoricalDataManager
+from src.strategies.moving_average_strategy import MovingAverageStrategy
+from tests.test_backtest_engine import generate_price_data
+
+class TestCostModels(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_manager = HistoricalDataManager(
+            data_dir=os.path.join(self.tmp_dir.name, 'historical'),
+            cache_dir=os.path.join(self.tmp_dir.name, 'cache')
+        )
+        self.engine = BacktestEngine(self.data_manager)
+        self.data = self.data_manager.preprocess_data(generate_price_data(periods=600, seed=3))
+        self.strategy = MovingAverageStrategy(params={'fast_period': 5, 'slow_period': 20})
+        self.costs = InstrumentCostModel()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _final_capital(self, symbol, cost_model=None, mode='vectorized'):
+        results = self.engine.run_backtest(
+            self.strategy, symbol, None, None, data=self.data, mode=mode, warm_start=False, cost_model=cost_model
+        )
+        return results['final_capital']
+
+    def test_flat_model_is_the_commission(self):
+        self.assertEqual(self._final_capital('EUR/USD', CostModel(0.001)), self._final_capital('EUR/USD'))
+        self.assertNotEqual(self._final_capital('EUR/USD', CostModel(0.002)), self._final_capital('EUR/USD'))
+
+    def test_instrument_costs_differ_by_type(self):
+        frictionless = self._final_capital('EUR/USD', InstrumentCostModel(
+            slippage_atr=0.0, spreads={'forex': 0.0}, swap_rates={'forex': (0.0, 0.0)}
+        ))
+        self.assertAlmostEqual(frictionless, self._final_capital('EUR/USD', CostModel(0.0)))
+        forex = self._final_capital('EUR/USD', self.costs)
+        self.assertLess(forex, frictionless)
+        self.assertNotEqual(forex, self._final_capital('XAU/USD', self.costs))
+        self.assertNotEqual(forex, self._final_capital('AAPL', self.costs))
+
+        prices = {field: self.data[field].to_numpy() for field in ('high', 'low', 'close')}
+        forex_rates = self.costs.bar_costs(prices, self.data.index, 'EUR/USD')
+        stock_rates = self.costs.bar_costs(prices, self.data.index, 'AAPL')
+        self.assertTrue((forex_rates['fill'] > 0).all())
+        self.assertTrue((stock_rates['fill'] > forex_rates['fill']).all())
+        self.assertTrue((np.diff(forex_rates['carry_long']) >= 0).all())
+        with self.assertRaises(ValueError):
+            self.costs.bar_costs(prices, self.data.index)
+
+    def test_rollovers_follow_the_weekly_pattern(self):
+        # Monday 2024-01-01 through the next Monday
+        index = pd.date_range('2024-01-01 12:00', periods=8, freq='1D')
+        np.testing.assert_array_equal(rollover_counts(index, ROLLOVER_WEIGHTS['forex']), [0, 1, 2, 5, 6, 7, 7, 7])
+        np.testing.assert_array_equal(rollover_counts(index, ROLLOVER_WEIGHTS['stock']), np.arange(8))
+        # Bars within a day do not roll
+        intraday = pd.date_range('2024-01-03 00:00', periods=30, freq='1h')
+        self.assertEqual(rollover_counts(intraday, ROLLOVER_WEIGHTS['forex']).tolist(), [0] * 24 + [3] * 6)
+
+    def test_modes_agree_with_instrument_costs(self):
+        for symbol in ('EUR/USD', 'AAPL'):
+            loop = self._final_capital(symbol, self.costs, mode='loop')
+            vectorized = self._final_capital(symbol, self.costs)
+            self.assertAlmostEqual(loop, vectorized, places=6)
+
+    def test_param_batch_matches_single_runs(self):
+        param_sets = [{'fast_period': fast, 'slow_period': slow} for fast, slow in ((5, 20), (8, 30), (10, 50))]
+        batch = self.engine.run_param_batch(self.strategy, self.data, param_sets, symbol='GBP/USD', cost_model=self.costs)
+        for k, params in enumerate(param_sets):
+            single = self.engine.run_backtest(
+                MovingAverageStrategy(params=params), 'GBP/USD', None, None, data=self.data, cost_model=self.costs
+            )
+            self.assertAlmostEqual(batch['final_capital'][k], single['final_capital'], places=6)
+
+    def test_other_engines_charge_the_costs(self):
+        flat = EventDrivenBacktester(self.data_manager, commission=0.0)
+        frictionless = flat.run_backtest(self.strategy, 'EUR/USD', None, None, data=self.data)
+        charged = flat.run_backtest(self.strategy, 'EUR/USD', None, None, data=self.data, cost_model=self.costs)
+        self.assertLess(charged['final_capital'], frictionless['final_capital'])
+
+        portfolio = PortfolioBacktester(self.data_manager, position_fraction=0.5)
+        frames = {'EUR/USD': self.data, 'AAPL': self.data_manager.preprocess_data(generate_price_data(periods=600, seed=4))}
+        results = portfolio.run_backtest(self.strategy, list(frames), None, None, '1h', data=frames, cost_model=self.costs)
+        self.assertAlmostEqual(results['attribution'].sum(), results['final_capital'] - 10000.0, places=6)
+        np.testing.assert_allclose(
+            results['attribution_curve'].sum(axis=1), results['equity_curve'] - 10000.0, atol=1e-6
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Tests for the byte-budgeted LRU cache used for loaded price data
+"""
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.data.dataframe_cache import DataFrameCache, get_shared_cache
+from src.data.historical_data_manager import HistoricalDataManager
+from src.backtesting.backtest_engine import BacktestEngine
+from src.backtesting.optimization import MonteCarloSimulator
+
+def make_frame(rows):
+    return pd.DataFrame({'close': np.arange(rows, dtype=float)}, index=pd.date_range('2024-01-01', periods=rows))
+
+class TestDataFrameCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        size = DataFrameCache.size_of(make_frame(100))
+        cache = DataFrameCache(max_bytes=3 * size)
+        for key in 'abc':
+            cache.put(key, make_frame(100))
+        self.assertIsNotNone(cache.get('a'))  # 'b' is now the least recently used
+        cache.put('d', make_frame(100))
+        
+        self.assertNotIn('b', cache)
+        self.assertTrue(all(key in cache for key in 'acd'))
+        self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        
+    def test_counters_and_oversized_entries(self):
+        cache = DataFrameCache(max_bytes=DataFrameCache.size_of(make_frame(10)))
+        self.assertIsNone(cache.get('missing'))
+        cache['small'] = make_frame(10)
+        cache['large'] = make_frame(1000)
+        self.assertEqual(len(cache['small']), 10)
+        with self.assertRaises(KeyError):
+            cache['large']
+            
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 2, 1))
+        
+    def test_replacing_entry_updates_size(self):
+        cache = DataFrameCache(max_bytes=10 ** 6)
+        cache.put('a', make_frame(1000))
+        cache.put('a', make_frame(10))
+        self.assertEqual(cache.current_bytes, DataFrameCache.size_of(make_frame(10)))
+        
+    def test_shared_between_backtest_components(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_dir = os.path.join(tmp_dir, 'historical')
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            first = HistoricalDataManager(data_dir=data_dir, cache_dir=cache_dir)
+            second = HistoricalDataManager(data_dir=data_dir, cache_dir=cache_dir)
+            self.assertIs(first.cache, get_shared_cache())
+            self.assertIs(
+                BacktestEngine(first).data_manager.cache,
+                MonteCarloSimulator(BacktestEngine(second)).backtest_engine.data_manager.cache
+            )
+            
+            make_frame(50).assign(open=1.0, high=1.0, low=1.0, volume=1).to_csv(os.path.join(data_dir, 'AAPL_1d.csv'))
+            hits = get_shared_cache().hits
+            loaded = first.load_data('AAPL', '2024-01-01', '2024-02-01')
+            self.assertIs(second.load_data('AAPL', '2024-01-01', '2024-02-01'), loaded)
+            self.assertEqual(get_shared_cache().hits, hits + 1)
+
+if __name__ == '__main__':
+    unittest.main()
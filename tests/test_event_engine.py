@@ -0,0 +1,170 @@
+"""
+Tests for the event-driven backtester
+"""
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.backtesting.event_engine import EventDrivenBacktester, OrderBook, STOP, LIMIT
+from src.data.historical_data_manager import HistoricalDataManager
+from src.strategies.kishoka_strategy import KishokaStrategy
+from src.strategies.moving_average_strategy import MovingAverageStrategy
+from tests.test_backtest_engine import generate_price_data
+
+def loop_brackets(prices, signals, stop_loss, take_profit, capital, commission, allow_short, tie_break):
+    """Reference: walk every bar, checking the brackets against its range before acting on its close"""
+    units, stop, target, equity = 0.0, np.nan, np.nan, []
+    for i in range(len(signals)):
+        bar_open, high, low, close = (prices[field][i] for field in ('open', 'high', 'low', 'close'))
+        if units != 0:
+            side = 1 if units > 0 else -1
+            stop_hit = not np.isnan(stop) and (low <= stop if side == 1 else high >= stop)
+            target_hit = not np.isnan(target) and (high >= target if side == 1 else low <= target)
+            if stop_hit and target_hit:
+                if tie_break == 'stop':
+                    target_hit = False
+                elif tie_break == 'target':
+                    stop_hit = False
+                else:
+                    stop_gap = bar_open <= stop if side == 1 else bar_open >= stop
+                    target_gap = bar_open >= target if side == 1 else bar_open <= target
+                    stop_first = stop_gap or (not target_gap and abs(bar_open - stop) <= abs(bar_open - target))
+                    stop_hit, target_hit = stop_first, not stop_first
+            if stop_hit or target_hit:
+                level = stop if stop_hit else target
+                worse = min if (side == 1) == stop_hit else max
+                price = worse(bar_open, level)
+                capital += units * price - abs(units) * price * commission
+                units = 0.0
+        signal = signals[i]
+        if signal != 0 and (units == 0 or np.sign(units) != signal):
+            if units != 0:
+                capital += units * close - abs(units) * close * commission
+                units = 0.0
+            if signal == 1 or allow_short:
+                units = signal * capital / close
+                capital -= units * close + abs(units) * close * commission
+                stop, target = stop_loss[i], take_profit[i]
+        equity.append(capital + units * close)
+    return np.array(equity)
+
+class TestOrderBook(unittest.TestCase):
+    def test_groups_cancel_together_and_slots_are_reused(self):
+        book = OrderBook(capacity=2)
+        book.add(-1, STOP, 0.9, group=1)
+        book.add(-1, LIMIT, 1.2, group=1)
+        book.add(1, STOP, 1.5, group=2)
+        self.assertEqual(book.pending().tolist(), [0, 1, 2])
+        book.cancel_group(1)
+        self.assertEqual(book.pending().tolist(), [2])
+        book.cancel_group(2)
+        self.assertEqual(book.n_active, 0)
+        self.assertEqual(book.add(1, LIMIT, 1.0, group=3), 0)
+
+class TestEventDrivenBacktester(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_manager = HistoricalDataManager(
+            data_dir=os.path.join(self.tmp_dir.name, 'historical'),
+            cache_dir=os.path.join(self.tmp_dir.name, 'cache')
+        )
+        self.data = self.data_manager.preprocess_data(generate_price_data(periods=600, seed=4))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _prices(self, data):
+        return {field: data[field].to_numpy(dtype=float) for field in ('open', 'high', 'low', 'close')}
+
+    def test_matches_bar_by_bar_reference(self):
+        rng = np.random.default_rng(0)
+        prices = self._prices(self.data)
+        n = len(self.data)
+        signals = rng.choice([-1, 0, 0, 0, 0, 0, 1], n)
+        distance = np.abs(rng.normal(0, 0.004, (2, n)))
+        stop_loss = np.where(signals != 0, prices['close'] - signals * distance[0], np.nan)
+        take_profit = np.where(signals != 0, prices['close'] + signals * distance[1], np.nan)
+        # Some signals come without a target
+        take_profit[rng.random(n) < 0.2] = np.nan
+
+        for tie_break in ('stop', 'target', 'nearest'):
+            for allow_short in (True, False):
+                engine = EventDrivenBacktester(self.data_manager, allow_short=allow_short, tie_break=tie_break)
+                simulation = engine.run_orders(prices, signals, stop_loss, take_profit)
+                expected = loop_brackets(prices, signals, stop_loss, take_profit, 10000.0, 0.001, allow_short, tie_break)
+                np.testing.assert_allclose(simulation['equity'], expected, rtol=1e-10, err_msg=f"{tie_break} {allow_short}")
+
+    def test_intrabar_fills(self):
+        prices = {
+            'open':  np.array([1.00, 1.00, 1.00, 0.90, 1.00, 1.00]),
+            'high':  np.array([1.00, 1.05, 1.25, 0.95, 1.00, 1.00]),
+            'low':   np.array([1.00, 0.98, 0.85, 0.85, 1.00, 1.00]),
+            'close': np.array([1.00, 1.00, 1.00, 0.90, 1.00, 1.00])
+        }
+        signals = np.array([1, 0, 0, 0, 0, 0])
+        stop_loss = np.array([0.95, np.nan, np.nan, np.nan, np.nan, np.nan])
+        take_profit = np.array([1.20, np.nan, np.nan, np.nan, np.nan, np.nan])
+
+        # Bar 2 reaches both levels
+        for tie_break, reason, price in (('stop', 'stop_loss', 0.95), ('target', 'take_profit', 1.20)):
+            engine = EventDrivenBacktester(self.data_manager, commission=0.0, tie_break=tie_break)
+            trades = engine.run_orders(prices, signals, stop_loss, take_profit)['trades']
+            self.assertEqual([(t['bar'], t['type'], t['reason']) for t in trades][1], (2, 'sell', reason))
+            self.assertEqual(trades[1]['price'], price)
+
+        # A short stopped out by a gap fills at the open
+        prices['open'][3] = 1.10
+        prices['high'][3] = 1.10
+        signals = np.array([0, 0, -1, 0, 0, 0])
+        stop_loss = np.array([np.nan, np.nan, 1.05, np.nan, np.nan, np.nan])
+        engine = EventDrivenBacktester(self.data_manager, commission=0.0)
+        simulation = engine.run_orders(prices, signals, stop_loss, np.full(6, np.nan))
+        exit_trade = simulation['trades'][-1]
+        self.assertEqual((exit_trade['bar'], exit_trade['type'], exit_trade['price']), (3, 'buy', 1.10))
+        self.assertEqual(simulation['position'].tolist(), [0, 0, -10000.0, 0, 0, 0])
+        self.assertAlmostEqual(simulation['equity'][-1], 10000.0 - 10000.0 * 0.10)
+
+    def test_strategies_trade_their_brackets(self):
+        for strategy in (MovingAverageStrategy(params={'fast_period': 5, 'slow_period': 20}), KishokaStrategy()):
+            results = EventDrivenBacktester(self.data_manager).run_backtest(
+                strategy, 'EUR/USD', None, None, '1h', data=self.data
+            )
+            signals = {signal['timestamp']: signal for signal in strategy.generate_signals(self.data)}
+            entries = [t for t in results['trades'] if t['timestamp'] in signals and t['reason'] == 'signal']
+            self.assertTrue(entries, strategy.name)
+            reasons = {t['reason'] for t in results['trades']}
+            self.assertTrue({'stop_loss', 'take_profit'} & reasons, strategy.name)
+
+            signal_codes, stop_loss, take_profit = strategy.generate_order_arrays(self.data)
+            bars = np.flatnonzero(signal_codes)
+            self.assertEqual([self.data.index[i] for i in bars], list(signals))
+            for i in bars:
+                signal = signals[self.data.index[i]]
+                self.assertEqual(signal_codes[i], 1 if signal['type'] == 'buy' else -1)
+                self.assertAlmostEqual(stop_loss[i], signal['stop_loss'])
+                self.assertAlmostEqual(take_profit[i], signal['take_profit'])
+
+    def test_kishoka_brackets_use_the_symbols_pip_size(self):
+        strategy = KishokaStrategy()
+        for symbol in ('EUR/USD', 'USD/JPY', 'AAPL'):
+            signal_codes, stop_loss, take_profit = strategy.generate_order_arrays(self.data, symbol)
+            bars = np.flatnonzero(signal_codes)
+            self.assertTrue(len(bars), symbol)
+            # Same levels as the live signal at each entry bar
+            for i in bars[:5]:
+                live = strategy.generate_signal(symbol, self.data.iloc[:i + 1])
+                self.assertAlmostEqual(stop_loss[i], live['stop_loss'], msg=symbol)
+                self.assertAlmostEqual(take_profit[i], live['take_profit'], msg=symbol)
+
+    def test_unknown_tie_break(self):
+        with self.assertRaises(ValueError):
+            EventDrivenBacktester(self.data_manager, tie_break='random')
+
+if __name__ == '__main__':
+    unittest.main()
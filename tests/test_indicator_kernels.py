@@ -0,0 +1,163 @@
+"""
+Tests for the NumPy indicator kernels
+"""
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.strategies.breakout_detection import BreakoutDetectionStrategy
+from src.strategies.pattern_recognition import PatternRecognitionStrategy
+from src.strategies.rsi_divergence import RSIDivergenceStrategy
+from src.utils.indicator_kernels import (
+    compute_rsi, find_peaks, find_troughs, rolling_max, rolling_mean, rolling_means, rolling_min, simple_rsi
+)
+from src.utils.position_recommender import PositionRecommender
+from src.utils.technical_analysis import TechnicalAnalysis
+from tests.test_backtest_engine import generate_price_data
+
+class TestIndicatorKernels(unittest.TestCase):
+    def setUp(self):
+        self.data = generate_price_data(periods=300)
+        
+    def test_rolling_means_match_pandas(self):
+        means = rolling_means(self.data['close'].to_numpy(), [5, 20, 50])
+        for window, values in means.items():
+            expected = self.data['close'].rolling(window=window).mean().to_numpy()
+            np.testing.assert_allclose(values, expected, rtol=1e-12, equal_nan=True)
+            
+    def test_rows_are_independent_series(self):
+        paths = np.stack([self.data['close'].to_numpy(), self.data['open'].to_numpy()])
+        means = rolling_mean(paths, 10)
+        np.testing.assert_allclose(means[1], self.data['open'].rolling(window=10).mean(), rtol=1e-12, equal_nan=True)
+        
+    def _flat_stretches(self):
+        close = self.data['close'].copy()
+        close.iloc[100:120] = np.linspace(1.0, 1.1, 20)  # Only gains: RSI is exactly 100
+        close.iloc[150:170] = 1.05  # No change at all: RSI is undefined
+        return self.data.assign(close=close)
+        
+    def test_simple_rsi_matches_pandas(self):
+        data = self._flat_stretches()
+        rsi = simple_rsi(data['close'].to_numpy(), [7, 14])
+        for period, values in rsi.items():
+            delta = data['close'].diff()
+            gain = delta.where(delta > 0, 0).rolling(window=period).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+            expected = (100 - (100 / (1 + gain / loss))).to_numpy()
+            np.testing.assert_allclose(values, expected, rtol=1e-10, equal_nan=True)
+            self.assertEqual(values[119], 100)
+            self.assertTrue(np.isnan(values[169]))
+            strategy = RSIDivergenceStrategy(rsi_period=period, rsi_method='sma')
+            np.testing.assert_array_equal(strategy.calculate_rsi(data), values)
+            
+    def test_wilder_rsi_matches_recursion(self):
+        data = self._flat_stretches()
+        close = data['close'].to_numpy()
+        for period in (7, 14):
+            changes = np.diff(close)
+            gains, losses = np.maximum(changes, 0), np.maximum(-changes, 0)
+            avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+            expected = np.full(len(close), np.nan)
+            for t in range(period, len(close)):
+                if t > period:
+                    avg_gain = (avg_gain * (period - 1) + gains[t - 1]) / period
+                    avg_loss = (avg_loss * (period - 1) + losses[t - 1]) / period
+                expected[t] = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+            values = compute_rsi(close, period)
+            np.testing.assert_allclose(values, expected, rtol=1e-10, equal_nan=True)
+            
+        paths = np.stack([close, close[::-1]])
+        np.testing.assert_allclose(compute_rsi(paths, 14)[1], compute_rsi(close[::-1], 14), rtol=1e-12, equal_nan=True)
+        with self.assertRaises(ValueError):
+            compute_rsi(close, 14, method='ema')
+            
+    def test_rsi_is_shared(self):
+        data = self._flat_stretches()
+        expected = compute_rsi(data['close'].to_numpy(), 14)
+        np.testing.assert_array_equal(TechnicalAnalysis.add_rsi(data.copy())['rsi'], expected)
+        np.testing.assert_array_equal(RSIDivergenceStrategy().calculate_rsi(data), expected)
+        # The recommender computes the simple-average kernel RSI when the frame has none
+        recommender = PositionRecommender()
+        computed = recommender.analyze_and_recommend('TEST', data)['analysis']['signals']
+        simple = compute_rsi(data['close'].to_numpy(), 14, method='sma')
+        supplied = recommender.analyze_and_recommend('TEST', data.assign(rsi=simple))['analysis']['signals']
+        self.assertEqual(computed, supplied)
+
+def loop_peaks(values, window, strict=True):
+    """Reference: the bar-by-bar comparison the strategies used to run"""
+    if strict:
+        return [
+            i for i in range(window, len(values) - window)
+            if (values[i] > values[i-window:i]).all() and (values[i] > values[i+1:i+window+1]).all()
+        ]
+    return [
+        i for i in range(window, len(values) - window)
+        if (values[i] >= values[i-window:i]).all() and (values[i] >= values[i+1:i+window+1]).all()
+    ]
+
+class TestExtrema(unittest.TestCase):
+    def setUp(self):
+        # Coarse rounding produces plenty of ties between neighbouring bars
+        self.data = generate_price_data(periods=400, seed=3).round(3)
+        
+    def test_rolling_max_min_match_pandas(self):
+        values = self.data['close'].to_numpy().copy()
+        values[50] = np.nan
+        for window in (1, 3, 7, 20):
+            series = pd.Series(values)
+            np.testing.assert_array_equal(rolling_max(values, window), series.rolling(window).max(), err_msg=str(window))
+            np.testing.assert_array_equal(rolling_min(values, window), series.rolling(window).min(), err_msg=str(window))
+            
+    def test_peaks_and_troughs_match_loop(self):
+        values = self.data['high'].to_numpy().copy()
+        values[[40, 200]] = np.nan  # NaNs never compare true
+        for window in (1, 2, 5, 20):
+            for strict in (True, False):
+                self.assertEqual(list(find_peaks(values, window, strict)), loop_peaks(values, window, strict))
+                self.assertEqual(list(find_troughs(values, window, strict)), loop_peaks(-values, window, strict))
+        self.assertEqual(len(find_peaks(values[:10], 5)), 0)
+        
+    def test_strategies_use_shared_extrema(self):
+        high, low = self.data['high'].to_numpy(), self.data['low'].to_numpy()
+        peaks, troughs = PatternRecognitionStrategy().find_local_extrema(self.data)
+        self.assertEqual([peak['index'] for peak in peaks], loop_peaks(high, 5))
+        self.assertEqual([trough['index'] for trough in troughs], loop_peaks(-low, 5))
+        self.assertEqual(peaks[0]['timestamp'], self.data.index[peaks[0]['index']])
+        
+        levels = BreakoutDetectionStrategy(lookback_period=10).find_support_resistance(self.data)
+        self.assertEqual([level['price'] for level in levels['resistance']], [high[i] for i in loop_peaks(high, 10)])
+        self.assertEqual([level['price'] for level in levels['support']], [low[i] for i in loop_peaks(-low, 10)])
+        
+        support, resistance = TechnicalAnalysis.calculate_support_resistance(self.data, window=10)
+        self.assertEqual(support, np.mean([low[i] for i in loop_peaks(-low, 10, strict=False)][-3:]))
+        self.assertEqual(resistance, np.mean([high[i] for i in loop_peaks(high, 10, strict=False)][-3:]))
+        
+    def test_divergences_match_swing_loop(self):
+        strategy = RSIDivergenceStrategy()
+        rsi = strategy.calculate_rsi(self.data)
+        divergences = strategy.find_divergences(self.data, rsi)
+        expected = []
+        for direction, swings, price in (
+            ('bullish', loop_peaks(-self.data['low'].to_numpy(), 5), self.data['low'].to_numpy()),
+            ('bearish', loop_peaks(self.data['high'].to_numpy(), 5), self.data['high'].to_numpy())
+        ):
+            for previous, current in zip(swings, swings[1:]):
+                price_change = price[current] - price[previous]
+                rsi_change = rsi.iloc[current] - rsi.iloc[previous]
+                if price_change * rsi_change < 0:
+                    expected.append((self.data.index[current], direction, self.data.index[previous]))
+        self.assertEqual({direction for _, direction, _ in expected}, {'bullish', 'bearish'})
+        self.assertEqual(
+            [(div['timestamp'], div['type'], div['previous_timestamp']) for div in divergences],
+            sorted(expected, key=lambda item: (item[0], item[1] != 'bullish'))
+        )
+        self.assertEqual({div['kind'] for div in divergences}, {'regular', 'hidden'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@ import os
 import sys
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 from termcolor import cprint
 
 # Add project root to Python path
@@ -120,6 +120,140 @@ def test_kishoka_strategy():
     
     cprint("\nTest completed!", "green")
 
+def reference_apply_kishoka_strategy(strategy, df, pip_size=0.0001):
+    """
+    Original pandas bar loop, kept verbatim as the parity reference for the NumPy version
+    
+    Args:
+        strategy (KishokaStrategy): Strategy whose parameters are used
+        df (pd.DataFrame): OHLC data with datetime index
+        pip_size (float): Value of 1 pip in price units
+        
+    Returns:
+        pd.DataFrame: DataFrame with signals and positions
+    """
+    data = df.copy()
+    data['position'] = 0  # 1 for long, -1 for short
+    data['entry_price'] = np.nan
+    data['stop_loss'] = np.nan
+    data['take_profit'] = np.nan
+    
+    # Calculate swing highs and lows
+    data['swing_high'] = data['high'].rolling(strategy.swing_length).max()
+    data['swing_low'] = data['low'].rolling(strategy.swing_length).min()
+    
+    # Identify swing points
+    data['is_swing_high'] = data['high'] >= data['swing_high']
+    data['is_swing_low'] = data['low'] <= data['swing_low']
+    
+    # Track last valid swing points
+    last_swing_high = np.nan
+    last_swing_low = np.nan
+    fib_range = 0
+    
+    # Fibonacci levels storage
+    for level in strategy.fib_levels:
+        data[f'fib_{int(level*100)}'] = np.nan
+    
+    for i in range(1, len(data)):
+        # Update swing points
+        if data['is_swing_high'].iloc[i]:
+            last_swing_high = data['high'].iloc[i]
+        if data['is_swing_low'].iloc[i]:
+            last_swing_low = data['low'].iloc[i]
+        
+        # Calculate Fibonacci levels
+        if not np.isnan(last_swing_high) and not np.isnan(last_swing_low):
+            fib_range = last_swing_high - last_swing_low
+            for level in strategy.fib_levels:
+                fib_value = last_swing_low + fib_range * level
+                data.loc[data.index[i], f'fib_{int(level*100)}'] = fib_value
+        
+        # Entry conditions
+        current_low = data['low'].iloc[i]
+        current_high = data['high'].iloc[i]
+        close = data['close'].iloc[i]
+        open_price = data['open'].iloc[i]
+        
+        # Check if Fibonacci levels are available
+        if f'fib_0' in data.columns and i > 0:
+            fib_0 = data['fib_0'].iloc[i]
+            fib_50 = data['fib_50'].iloc[i] if 'fib_50' in data.columns else np.nan
+            fib_100 = data['fib_100'].iloc[i] if 'fib_100' in data.columns else np.nan
+            
+            # Bullish rejection
+            if (not np.isnan(fib_0) and 
+                current_low > fib_0 and 
+                close > open_price and 
+                close > fib_50 and 
+                data['position'].iloc[i-1] == 0):
+                
+                data.loc[data.index[i], 'position'] = 1
+                data.loc[data.index[i], 'entry_price'] = close
+                data.loc[data.index[i], 'stop_loss'] = last_swing_low - (strategy.stop_loss_pips * pip_size)
+                data.loc[data.index[i], 'take_profit'] = close + (strategy.profit_secure_pips * pip_size)
+            
+            # Bearish rejection
+            elif (not np.isnan(fib_100) and 
+                 current_high < fib_100 and 
+                 close < open_price and 
+                 close < fib_50 and 
+                 data['position'].iloc[i-1] == 0):
+                
+                data.loc[data.index[i], 'position'] = -1
+                data.loc[data.index[i], 'entry_price'] = close
+                data.loc[data.index[i], 'stop_loss'] = last_swing_high + (strategy.stop_loss_pips * pip_size)
+                data.loc[data.index[i], 'take_profit'] = close - (strategy.profit_secure_pips * pip_size)
+        
+        # Risk management - copy from previous position if no new entry
+        elif data['position'].iloc[i-1] != 0 and data['position'].iloc[i] == 0:
+            data.loc[data.index[i], 'position'] = data['position'].iloc[i-1]
+            data.loc[data.index[i], 'entry_price'] = data['entry_price'].iloc[i-1]
+            data.loc[data.index[i], 'stop_loss'] = data['stop_loss'].iloc[i-1]
+            data.loc[data.index[i], 'take_profit'] = data['take_profit'].iloc[i-1]
+            
+            # Current values for risk management
+            entry = data['entry_price'].iloc[i]
+            current_close = data['close'].iloc[i]
+            
+            # Move to breakeven
+            if entry is not None and not np.isnan(entry):
+                if abs(current_close - entry) >= strategy.risk_free_offset * pip_size:
+                    data.loc[data.index[i], 'stop_loss'] = entry
+                
+            # Partial close at 50% level if we have the Fibonacci levels
+            if not np.isnan(fib_50):
+                if ((data['position'].iloc[i] == 1 and current_close >= fib_50) or 
+                    (data['position'].iloc[i] == -1 and current_close <= fib_50)):
+                    # Scale position size down to 0.5 (partial close)
+                    data.loc[data.index[i], 'position'] = data['position'].iloc[i] * 0.5
+                
+            # Check stop loss and take profit
+            sl = data['stop_loss'].iloc[i]
+            tp = data['take_profit'].iloc[i]
+            
+            if not np.isnan(sl) and not np.isnan(tp):
+                if ((data['position'].iloc[i] == 1 and (current_close <= sl or current_close >= tp)) or
+                    (data['position'].iloc[i] == -1 and (current_close >= sl or current_close <= tp))):
+                    data.loc[data.index[i], 'position'] = 0  # Close position
+    
+    return data
+
+def test_numpy_state_machine_parity():
+    """The NumPy state machine reproduces the original pandas implementation"""
+    np.random.seed(42)
+    df = TechnicalAnalysis.add_all_indicators(generate_test_data())
+    
+    for params, pip_size in [({}, 0.01), ({'swing_length': 5}, 0.0001), ({'fib_levels': [0, 0.5, 1, 0.618]}, 0.01),
+                              ({'fib_levels': [0.5, 1]}, 0.01)]:
+        strategy = KishokaStrategy(params=params)
+        expected = reference_apply_kishoka_strategy(strategy, df, pip_size)
+        result = strategy._apply_kishoka_strategy(df, pip_size)
+        pd.testing.assert_frame_equal(result, expected)
+        # Without a fib_0 level the original takes the risk-management branch instead of the
+        # entry checks, and since nothing ever enters, it never holds a position
+        assert (result['position'] != 0).any() == (0 in strategy.fib_levels)
+
 def test_with_real_data():
     """Test the Kishoka strategy with real market data"""
     cprint("\n" + "="*60, "magenta")
@@ -0,0 +1,99 @@
+"""
+Tests for the performance metrics kernel
+"""
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.backtesting.backtest_engine import BacktestEngine
+from src.backtesting.metrics import performance_metrics, trade_list_pnl, trade_list_in_market
+from src.data.historical_data_manager import HistoricalDataManager
+from src.strategies.moving_average_strategy import MovingAverageStrategy
+from tests.test_backtest_engine import generate_price_data
+
+class TestPerformanceMetrics(unittest.TestCase):
+    def test_known_curve(self):
+        equity = np.array([100.0, 110.0, 99.0, 104.5, 121.0, 121.0])
+        metrics = performance_metrics(equity, np.array([10.0, -5.0, 25.0, np.nan]), np.array([1, 1, 0, 1, 1, 0]))
+
+        returns = equity[1:] / equity[:-1] - 1
+        self.assertAlmostEqual(metrics['sharpe_ratio'], np.sqrt(252) * returns.mean() / returns.std(ddof=1))
+        self.assertAlmostEqual(metrics['max_drawdown'], -0.1)
+        self.assertEqual(metrics['max_drawdown_duration'], 2)
+        annual_return = 1.21 ** (252 / 5) - 1
+        self.assertAlmostEqual(metrics['calmar_ratio'] / (annual_return / 0.1), 1.0)
+        # A single losing bar has no sample deviation
+        self.assertEqual(metrics['sortino_ratio'], 0.0)
+        self.assertAlmostEqual(metrics['win_rate'], 2 / 3)
+        self.assertAlmostEqual(metrics['profit_factor'], 7.0)
+        self.assertAlmostEqual(metrics['expectancy'], 10.0)
+        self.assertAlmostEqual(metrics['exposure'], 4 / 6)
+
+    def test_drawdown_is_measured_on_equity(self):
+        # Cumulative returns pass through zero here, which broke the old ratio
+        equity = np.array([100.0, 101.0, 99.99, 100.5, 95.0, 100.0])
+        metrics = performance_metrics(equity, np.zeros(0), np.zeros(6))
+        self.assertAlmostEqual(metrics['max_drawdown'], 95.0 / 101.0 - 1)
+        self.assertEqual(metrics['max_drawdown_duration'], 4)
+        self.assertEqual((metrics['win_rate'], metrics['profit_factor'], metrics['expectancy']), (0.0, 0.0, 0.0))
+
+    def test_flat_and_winning_curves(self):
+        metrics = performance_metrics(np.full(5, 100.0), np.zeros(0), np.zeros(5))
+        self.assertTrue(all(value == 0 for value in metrics.values()))
+        metrics = performance_metrics(np.array([100.0, 101.0, 102.0]), np.array([2.0]), np.ones(3))
+        self.assertEqual(metrics['max_drawdown'], 0.0)
+        self.assertEqual(metrics['calmar_ratio'], np.inf)
+        self.assertEqual(metrics['profit_factor'], np.inf)
+
+    def test_batch_rows_match_single_curves(self):
+        rng = np.random.default_rng(0)
+        equity = 1000 * np.cumprod(1 + rng.normal(0, 0.01, (5, 300)), axis=1)
+        trade_pnl = np.where(rng.random((5, 300)) < 0.05, rng.normal(0, 10, (5, 300)), np.nan)
+        in_market = rng.random((5, 300)) < 0.5
+        batch = performance_metrics(equity, trade_pnl, in_market)
+        for k in range(5):
+            single = performance_metrics(equity[k], trade_pnl[k][~np.isnan(trade_pnl[k])], in_market[k])
+            for key, value in single.items():
+                self.assertAlmostEqual(batch[key][k], value, places=10, msg=key)
+
+    def test_trade_lists(self):
+        index = pd.date_range('2024-01-01', periods=8, freq='1h')
+        trades = [
+            {'timestamp': index[1], 'type': 'buy', 'capital': -1.0},
+            {'timestamp': index[3], 'type': 'sell', 'capital': 1050.0},
+            {'timestamp': index[4], 'type': 'buy', 'capital': -1.05},
+            {'timestamp': index[6], 'type': 'sell', 'capital': 1030.0},
+            {'timestamp': index[7], 'type': 'buy', 'capital': -1.03}
+        ]
+        # Results are against the capital before each entry, not the cash left after it
+        self.assertEqual(trade_list_pnl(trades, 1000.0).tolist(), [50.0, -20.0])
+        self.assertEqual(trade_list_in_market(trades, index).tolist(), [False, True, True, False, True, True, False, True])
+        self.assertEqual(len(trade_list_pnl([], 1000.0)), 0)
+        self.assertFalse(trade_list_in_market([], index).any())
+
+    def test_engine_trade_results_sum_to_closed_pnl(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_manager = HistoricalDataManager(
+                data_dir=os.path.join(tmp_dir, 'historical'), cache_dir=os.path.join(tmp_dir, 'cache')
+            )
+            data = data_manager.preprocess_data(generate_price_data(periods=600, seed=3))
+            engine = BacktestEngine(data_manager)
+            strategy = MovingAverageStrategy(params={'fast_period': 5, 'slow_period': 20})
+            for mode in ('loop', 'vectorized'):
+                results = engine.run_backtest(strategy, 'EUR/USD', None, None, data=data, mode=mode, warm_start=False)
+                sells = [trade for trade in results['trades'] if trade['type'] == 'sell']
+                self.assertGreater(len(sells), 1)
+                metrics = results['metrics']
+                self.assertAlmostEqual(metrics['expectancy'] * len(sells), sells[-1]['capital'] - 10000.0, places=6)
+                self.assertLess(metrics['win_rate'], 1.0)
+                self.assertTrue(np.isfinite(metrics['profit_factor']))
+
+if __name__ == '__main__':
+    unittest.main()
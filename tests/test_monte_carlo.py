@@ -0,0 +1,234 @@
+"""
+Tests for the vectorized Monte Carlo simulator
+"""
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.backtesting.backtest_engine import BacktestEngine
+from src.backtesting.monte_carlo import (
+    EquityBands, ReturnSampler, SimulationStats, block_indices, fit_garch, simulate_ohlcv, stationary_indices
+)
+from src.backtesting.optimization import MonteCarloSimulator
+from src.data.historical_data_manager import HistoricalDataManager
+from src.strategies.moving_average_strategy import MovingAverageStrategy
+from tests.test_backtest_engine import generate_price_data
+
+class UnbatchedMovingAverageStrategy(MovingAverageStrategy):
+    """Same signals, but forces the per-path fallback"""
+
+    @property
+    def supports_batch(self) -> bool:
+        return False
+
+class TestBatchBacktest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        data_manager = HistoricalDataManager(
+            data_dir=os.path.join(self.tmp_dir.name, 'historical'),
+            cache_dir=os.path.join(self.tmp_dir.name, 'cache')
+        )
+        self.engine = BacktestEngine(data_manager)
+        self.data = data_manager.preprocess_data(generate_price_data(periods=150))
+        rng = np.random.default_rng(3)
+        close = ReturnSampler(self.data['returns']).paths(self.data['close'].iloc[0], 20, len(self.data), rng)
+        self.prices = simulate_ohlcv(close, self.data['volume'].to_numpy(), rng)
+        self.strategy = MovingAverageStrategy(params={'fast_period': 5, 'slow_period': 20})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _path_frame(self, i):
+        frame = pd.DataFrame({column: values[i] for column, values in self.prices.items()}, index=self.data.index)
+        return self.engine.data_manager.preprocess_data(frame)
+
+    def test_signal_matrix_matches_signal_array(self):
+        matrix = self.strategy.generate_signal_matrix(self.prices)
+        for i in range(len(matrix)):
+            np.testing.assert_array_equal(matrix[i], self.strategy.generate_signal_array(self._path_frame(i)))
+
+    def test_batch_matches_vectorized_backtest(self):
+        batch = self.engine.run_batch(self.strategy, self.prices)
+        self.assertTrue((batch['n_trades'] >= 2).any())
+        for i in range(len(self.prices['close'])):
+            results = self.engine.run_backtest(
+                self.strategy, 'SIM', None, None, '1h', data=self._path_frame(i), mode='vectorized'
+            )
+            np.testing.assert_allclose(batch['equity'][i], results['equity_curve'], rtol=1e-10)
+            self.assertEqual(batch['n_trades'][i], len(results['trades']))
+            for key, value in results['metrics'].items():
+                np.testing.assert_allclose(batch[key][i], value, rtol=1e-8, err_msg=key)
+
+def abs_autocorrelation(returns):
+    """Mean lag-1 autocorrelation of absolute returns across paths"""
+    magnitude = np.abs(returns) - np.abs(returns).mean(axis=1, keepdims=True)
+    return np.mean((magnitude[:, 1:] * magnitude[:, :-1]).mean(axis=1) / (magnitude ** 2).mean(axis=1))
+
+class TestReturnSampler(unittest.TestCase):
+    def setUp(self):
+        # Volatility regimes: calm and turbulent stretches of 100 bars
+        rng = np.random.default_rng(11)
+        scale = np.repeat(np.tile([0.002, 0.02], 10), 100)
+        self.returns = rng.normal(0, 1, len(scale)) * scale
+
+    def test_block_indices_are_contiguous(self):
+        indices = block_indices(1000, 50, 95, 10, np.random.default_rng(0))
+        self.assertEqual(indices.shape, (50, 95))
+        blocks = indices[:, :90].reshape(50, 9, 10)
+        self.assertTrue((np.diff(blocks, axis=2) == 1).all())
+        self.assertTrue((indices >= 0).all() and (indices < 1000).all())
+
+    def test_stationary_indices_continue_blocks(self):
+        indices = stationary_indices(100, 200, 500, 25, np.random.default_rng(0))
+        steps = (indices[:, 1:] - indices[:, :-1]) % 100
+        # Blocks continue (wrapping around) and restart on average every 25 bars
+        self.assertAlmostEqual((steps != 1).mean(), 1 / 25, delta=0.005)
+
+    def test_block_methods_preserve_volatility_clustering(self):
+        rng = np.random.default_rng(0)
+        iid = ReturnSampler(self.returns, 'iid').sample(200, 1000, rng)
+        block = ReturnSampler(self.returns, 'block', block_length=50).sample(200, 1000, rng)
+        stationary = ReturnSampler(self.returns, 'stationary', block_length=50).sample(200, 1000, rng)
+        self.assertLess(abs(abs_autocorrelation(iid)), 0.05)
+        self.assertGreater(abs_autocorrelation(block), 0.2)
+        self.assertGreater(abs_autocorrelation(stationary), 0.2)
+
+    def test_garch_fit_and_paths(self):
+        true = {'mu': 0.0, 'omega': 2e-6, 'alpha': 0.1, 'beta': 0.85}
+        rng = np.random.default_rng(4)
+        returns = np.empty(5000)
+        h = true['omega'] / (1 - true['alpha'] - true['beta'])
+        for t in range(len(returns)):
+            returns[t] = np.sqrt(h) * rng.standard_normal()
+            h = true['omega'] + true['alpha'] * returns[t] ** 2 + true['beta'] * h
+        fitted = fit_garch(returns)
+        self.assertAlmostEqual(fitted['alpha'], true['alpha'], delta=0.04)
+        self.assertAlmostEqual(fitted['beta'], true['beta'], delta=0.05)
+
+        paths = ReturnSampler(returns, 'garch').sample(100, 2000, np.random.default_rng(0))
+        self.assertAlmostEqual(paths.std() / returns.std(), 1, delta=0.15)
+        self.assertGreater(abs_autocorrelation(paths), 0.05)
+
+    def test_same_generator_state_gives_same_paths(self):
+        for method in ('iid', 'block', 'stationary', 'garch'):
+            sampler = ReturnSampler(self.returns, method)
+            first = sampler.paths(1.0, 10, 300, np.random.default_rng(7))
+            second = sampler.paths(1.0, 10, 300, np.random.default_rng(7))
+            np.testing.assert_array_equal(first, second, err_msg=method)
+        with self.assertRaises(ValueError):
+            ReturnSampler(self.returns, 'jackknife')
+
+class TestEquityBands(unittest.TestCase):
+    def test_percentiles_track_exact_values(self):
+        rng = np.random.default_rng(0)
+        equity = 10000 * np.exp(np.cumsum(rng.normal(0, 0.01, (5000, 50)), axis=1))
+        bands = EquityBands(50, 10000)
+        for chunk in np.array_split(equity, 4):
+            bands.update(chunk)
+        self.assertEqual(bands.n_paths, 5000)
+
+        qs = [5, 50, 95]
+        values = bands.percentiles(qs)
+        self.assertTrue((np.diff(values, axis=0) >= 0).all())
+        np.testing.assert_allclose(values[:, -1], np.percentile(equity[:, -1], qs), rtol=0.01)
+
+    def test_merge(self):
+        rng = np.random.default_rng(1)
+        equity = 10000 * (1 + rng.normal(0, 0.05, (200, 10)))
+        whole, left, right = EquityBands(10, 10000), EquityBands(10, 10000), EquityBands(10, 10000)
+        whole.update(equity)
+        left.update(equity[:120])
+        right.update(equity[120:])
+        left.merge(right)
+        np.testing.assert_array_equal(left.counts, whole.counts)
+        with self.assertRaises(ValueError):
+            left.merge(EquityBands(20, 10000))
+
+class TestSimulationStats(unittest.TestCase):
+    def test_merged_chunks_match_full_sample(self):
+        rng = np.random.default_rng(2)
+        results = {
+            'final_capital': 10000 * (1 + rng.normal(0, 0.1, 1000)),
+            'sharpe_ratio': rng.normal(0, 1, 1000),
+            'max_drawdown': -rng.random(1000),
+            'win_rate': rng.random(1000)
+        }
+        stats = SimulationStats(10000)
+        for part in np.array_split(np.arange(1000), 7):
+            stats.update({key: values[part] for key, values in results.items()})
+
+        summary = stats.summary()
+        final = results['final_capital']
+        self.assertAlmostEqual(summary['mean_final_equity'], np.mean(final), places=8)
+        self.assertAlmostEqual(summary['std_final_equity'], np.std(final), places=8)
+        self.assertEqual(summary['min_final_equity'], np.min(final))
+        self.assertEqual(summary['max_final_equity'], np.max(final))
+        self.assertEqual(summary['probability_of_loss'], np.mean(final < 10000))
+        self.assertAlmostEqual(summary['mean_win_rate'], np.mean(results['win_rate']), places=12)
+
+class TestMonteCarloSimulator(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        data_dir = os.path.join(self.tmp_dir.name, 'historical')
+        data_manager = HistoricalDataManager(data_dir=data_dir, cache_dir=os.path.join(self.tmp_dir.name, 'cache'))
+        generate_price_data(periods=150).to_csv(os.path.join(data_dir, 'EURUSD_1h.csv'))
+        self.simulator = MonteCarloSimulator(BacktestEngine(data_manager))
+        self.params = {'fast_period': 5, 'slow_period': 20}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _simulate(self, strategy, **kwargs):
+        return self.simulator.run_simulation(
+            strategy, 'EURUSD', '2023-01-01', '2023-01-08', '1h', **kwargs
+        )
+
+    def test_reproducible_with_seed(self):
+        strategy = MovingAverageStrategy(params=self.params)
+        first = self._simulate(strategy, n_simulations=300, random_seed=42, chunk_size=64)
+        second = self._simulate(strategy, n_simulations=300, random_seed=42, chunk_size=64)
+        np.testing.assert_array_equal(first['final_equities'], second['final_equities'])
+        self.assertEqual(first['statistics'], second['statistics'])
+
+        bands = first['percentile_bands']
+        self.assertEqual(bands['values'].shape, (5, len(bands['bars'])))
+        self.assertTrue((np.diff(bands['values'], axis=0) >= 0).all())
+        self.assertNotIn('equity_curves', first)
+
+    def test_resampling_methods(self):
+        strategy = MovingAverageStrategy(params=self.params)
+        for method in ('block', 'stationary', 'garch'):
+            first = self._simulate(strategy, n_simulations=50, random_seed=1, method=method, block_length=10)
+            second = self._simulate(strategy, n_simulations=50, random_seed=1, method=method, block_length=10)
+            self.assertEqual(first['method'], method)
+            np.testing.assert_array_equal(first['final_equities'], second['final_equities'])
+
+    def test_identical_for_any_worker_count(self):
+        strategy = MovingAverageStrategy(params=self.params)
+        runs = [
+            self._simulate(strategy, n_simulations=200, random_seed=9, chunk_size=32, method='stationary', n_jobs=n_jobs)
+            for n_jobs in (1, 2, 3)
+        ]
+        for run in runs[1:]:
+            np.testing.assert_array_equal(run['final_equities'], runs[0]['final_equities'])
+            np.testing.assert_array_equal(run['percentile_bands']['values'], runs[0]['percentile_bands']['values'])
+            self.assertEqual(run['statistics'], runs[0]['statistics'])
+
+    def test_fallback_matches_batch(self):
+        batched = self._simulate(MovingAverageStrategy(params=self.params), n_simulations=6, random_seed=5, chunk_size=4)
+        fallback = self._simulate(
+            UnbatchedMovingAverageStrategy(params=self.params), n_simulations=6, random_seed=5, chunk_size=4
+        )
+        np.testing.assert_allclose(batched['final_equities'], fallback['final_equities'], rtol=1e-10)
+        for key, value in batched['statistics'].items():
+            self.assertAlmostEqual(value, fallback['statistics'][key], places=8, msg=key)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,324 @@
+"""
+Tests for strategy optimization and shared-memory data broadcast
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.backtesting.backtest_engine import BacktestEngine
+from src.backtesting.optimization import (
+    StrategyOptimizer, _sample_grid, _window_results, build_strategy, walk_forward_folds
+)
+from src.backtesting.shared_data import SharedFrame
+from src.data.historical_data_manager import HistoricalDataManager
+from src.strategies.kishoka_strategy import KishokaStrategy
+from src.strategies.moving_average_strategy import MovingAverageStrategy
+from src.strategies.rsi_divergence import RSIDivergenceStrategy
+from tests.test_backtest_engine import generate_price_data
+
+class TestSharedFrame(unittest.TestCase):
+    def test_round_trip(self):
+        data = generate_price_data(periods=50)
+        data.index = data.index.tz_localize('Europe/London')
+        data['returns'] = data['close'].pct_change()
+        
+        with SharedFrame(data) as shared:
+            attached, shm = SharedFrame.attach(shared.descriptor)
+            pd.testing.assert_frame_equal(attached, data, check_freq=False)
+            # Columns are read-only views of the segment, not copies
+            segment = np.frombuffer(shm.buf, dtype=np.uint8)
+            self.assertTrue(all(np.shares_memory(attached[c].to_numpy(), segment) for c in attached.columns))
+            self.assertFalse(attached['close'].to_numpy().flags.writeable)
+            del segment
+            del attached
+            shm.close()
+            
+    def test_rejects_non_numeric_columns(self):
+        data = generate_price_data(periods=10).assign(label='x')
+        with self.assertRaises(ValueError):
+            SharedFrame(data)
+
+class TestGridSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        data_dir = os.path.join(self.tmp_dir.name, 'historical')
+        data_manager = HistoricalDataManager(data_dir=data_dir, cache_dir=os.path.join(self.tmp_dir.name, 'cache'))
+        generate_price_data(periods=300).to_csv(os.path.join(data_dir, 'EURUSD_1h.csv'))
+        self.engine = BacktestEngine(data_manager)
+        self.param_grid = {'fast_period': [5, 10], 'slow_period': [20, 30]}
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def _search(self, n_jobs):
+        optimizer = StrategyOptimizer(self.engine)
+        return optimizer.grid_search(
+            MovingAverageStrategy, self.param_grid, 'EURUSD', '2023-01-01', '2023-01-13', '1h', n_jobs=n_jobs
+        )
+        
+    def test_workers_match_in_process_search(self):
+        inline = self._search(n_jobs=1)
+        parallel = self._search(n_jobs=2)
+        self.assertEqual(len(parallel['all_results']), 4)
+        self.assertEqual(inline['best_params'], parallel['best_params'])
+        for a, b in zip(inline['all_results'], parallel['all_results']):
+            self.assertEqual(a['params'], b['params'])
+            np.testing.assert_allclose(a['results']['equity_curve'], b['results']['equity_curve'])
+            
+    def test_streaming_matches_full_search(self):
+        full = self._search(n_jobs=1)
+        progress = []
+        for n_jobs in (1, 2):
+            optimizer = StrategyOptimizer(self.engine)
+            streamed = optimizer.grid_search_streaming(
+                MovingAverageStrategy, self.param_grid, 'EURUSD', '2023-01-01', '2023-01-13', '1h',
+                n_jobs=n_jobs, top_k=2, progress_callback=progress.append
+            )
+            self.assertEqual(streamed['best_params'], full['best_params'])
+            self.assertEqual(streamed['evaluated'], 4)
+            self.assertFalse(streamed['stopped_early'])
+            self.assertEqual(len(streamed['top_results']), 2)
+            self.assertEqual(len(streamed['summaries']), 4)
+            
+            expected = sorted((r['score'] for r in full['all_results']), reverse=True)[:2]
+            self.assertEqual([r['score'] for r in streamed['top_results']], expected)
+        self.assertEqual([p['evaluated'] for p in progress], [1, 2, 3, 4] * 2)
+        
+    def test_streaming_budgets(self):
+        optimizer = StrategyOptimizer(self.engine)
+        limited = optimizer.grid_search_streaming(
+            MovingAverageStrategy, self.param_grid, 'EURUSD', '2023-01-01', '2023-01-13', '1h',
+            n_jobs=2, max_evaluations=3
+        )
+        self.assertEqual(limited['evaluated'], 3)
+        self.assertTrue(limited['stopped_early'])
+        
+        timed_out = optimizer.grid_search_streaming(
+            MovingAverageStrategy, self.param_grid, 'EURUSD', '2023-01-01', '2023-01-13', '1h',
+            n_jobs=1, time_budget=0
+        )
+        self.assertEqual(timed_out['evaluated'], 0)
+        self.assertEqual(timed_out['top_results'], [])
+        
+    def test_build_strategy_conventions(self):
+        self.assertEqual(build_strategy(MovingAverageStrategy, {'fast_period': 7}).params['fast_period'], 7)
+        self.assertEqual(build_strategy(RSIDivergenceStrategy, {'rsi_period': 9}).params['rsi_period'], 9)
+
+class TestBatchGridSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        data_dir = os.path.join(self.tmp_dir.name, 'historical')
+        data_manager = HistoricalDataManager(data_dir=data_dir, cache_dir=os.path.join(self.tmp_dir.name, 'cache'))
+        generate_price_data(periods=300).to_csv(os.path.join(data_dir, 'EURUSD_1h.csv'))
+        self.engine = BacktestEngine(data_manager)
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def test_matches_grid_search(self):
+        for strategy_class, param_grid in (
+            (MovingAverageStrategy, {'fast_period': [3, 5, 10], 'slow_period': [20, 30], 'stop_loss_multiplier': [1.5, 2.0]}),
+            (RSIDivergenceStrategy, {'rsi_period': [5, 7, 14], 'divergence_threshold': [0.1, 0.2]})
+        ):
+            args = (strategy_class, param_grid, 'EURUSD', '2023-01-01', '2023-01-13', '1h')
+            full = StrategyOptimizer(self.engine).grid_search(*args, n_jobs=1)
+            batched = StrategyOptimizer(self.engine).grid_search_batch(*args, batch_size=5)
+            self.assertEqual(batched['best_params'], full['best_params'])
+            self.assertEqual([s['params'] for s in batched['summaries']], [r['params'] for r in full['all_results']])
+            np.testing.assert_allclose(
+                [s['score'] for s in batched['summaries']], [r['score'] for r in full['all_results']], rtol=1e-8
+            )
+            
+    def test_requires_batch_support(self):
+        with self.assertRaises(ValueError):
+            StrategyOptimizer(self.engine).grid_search_batch(
+                KishokaStrategy, {'swing_length': [5, 10]}, 'EURUSD', '2023-01-01', '2023-01-13', '1h'
+            )
+
+class TestWalkForward(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        data_dir = os.path.join(self.tmp_dir.name, 'historical')
+        data_manager = HistoricalDataManager(data_dir=data_dir, cache_dir=os.path.join(self.tmp_dir.name, 'cache'))
+        generate_price_data(periods=300).to_csv(os.path.join(data_dir, 'EURUSD_1h.csv'))
+        self.engine = BacktestEngine(data_manager)
+        self.data = data_manager.preprocess_data(
+            data_manager.load_data('EURUSD', '2023-01-01', '2023-01-13', '1h')
+        )
+        self.param_grid = {'fast_period': [5, 10], 'slow_period': [20, 30]}
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def test_folds(self):
+        rolling = walk_forward_folds(100, 4)
+        self.assertEqual(rolling[0], (slice(0, 20), slice(20, 40)))
+        self.assertEqual(rolling[-1], (slice(60, 80), slice(80, 100)))
+        anchored = walk_forward_folds(100, 4, train_bars=30, test_bars=15, anchored=True)
+        self.assertEqual(anchored[0], (slice(0, 40), slice(40, 55)))
+        self.assertEqual(anchored[-1], (slice(0, 85), slice(85, 100)))
+        with self.assertRaises(ValueError):
+            walk_forward_folds(100, 4, train_bars=50, test_bars=20)
+            
+    def _walk_forward(self, n_jobs, **kwargs):
+        return StrategyOptimizer(self.engine).walk_forward(
+            MovingAverageStrategy, self.param_grid, 'EURUSD', '2023-01-01', '2023-01-13', '1h',
+            n_folds=3, n_jobs=n_jobs, **kwargs
+        )
+        
+    def test_folds_match_grid_search_on_train_window(self):
+        result = self._walk_forward(n_jobs=1)
+        self.assertEqual(len(result['folds']), 3)
+        for fold, (train, test) in zip(result['folds'], walk_forward_folds(len(self.data), 3)):
+            with mock.patch.object(self.engine.data_manager, 'load_data', return_value=self.data.iloc[train]):
+                expected = StrategyOptimizer(self.engine).grid_search(
+                    MovingAverageStrategy, self.param_grid, 'EURUSD', '2023-01-01', '2023-01-13', '1h', n_jobs=1
+                )
+            self.assertEqual(fold['best_params'], expected['best_params'])
+            self.assertEqual(fold['test_start'], self.data.index[test.start])
+            
+    def test_stitched_curve_and_parallel_match(self):
+        inline = self._walk_forward(n_jobs=1, anchored=True)
+        parallel = self._walk_forward(n_jobs=2, anchored=True)
+        
+        curve = inline['oos_equity_curve']
+        self.assertEqual(len(curve), 3 * (len(self.data) // 4))
+        self.assertTrue(curve.index.is_monotonic_increasing)
+        self.assertAlmostEqual(curve.iloc[-1] / self.engine.initial_capital - 1, inline['oos_return'])
+        
+        # Each fold's curve continues from the previous fold's final equity
+        for prev, fold in zip(inline['folds'], inline['folds'][1:]):
+            scale = curve[prev['test_end']] / self.engine.initial_capital
+            self.assertAlmostEqual(curve[fold['test_end']], fold['test_results']['equity_curve'][-1] * scale)
+            
+        pd.testing.assert_series_equal(parallel['oos_equity_curve'], curve)
+        self.assertEqual([f['best_params'] for f in parallel['folds']], [f['best_params'] for f in inline['folds']])
+        
+    def test_test_windows_are_warmed_up_on_the_train_window(self):
+        result = self._walk_forward(n_jobs=1)
+        for fold, (train, test) in zip(result['folds'], walk_forward_folds(len(self.data), 3)):
+            # The test window's results are the tail of a backtest over train + test
+            full = self.engine.run_backtest(
+                MovingAverageStrategy(params=fold['best_params']), 'EURUSD', None, None,
+                data=self.data.iloc[train.start:test.stop]
+            )
+            warmup = test.start - train.start
+            equity = np.asarray(full['equity_curve'])
+            scale = self.engine.initial_capital / equity[warmup - 1]
+            np.testing.assert_allclose(fold['test_results']['equity_curve'], equity[warmup:] * scale)
+            window_trades = [t for t in full['trades'] if t['timestamp'] >= self.data.index[test.start]]
+            self.assertEqual(
+                [t['timestamp'] for t in fold['test_results']['trades']], [t['timestamp'] for t in window_trades]
+            )
+            self.assertEqual(fold['test_results']['start_date'], self.data.index[test.start])
+            
+            # Every trade closed in the window counts, against the capital before its entry
+            trades = full['trades']
+            pnl = [
+                trade['capital'] - (trades[i - 2]['capital'] if i >= 2 else self.engine.initial_capital)
+                for i, trade in enumerate(trades) if trade['type'] == 'sell' and trade in window_trades
+            ]
+            metrics = fold['test_results']['metrics']
+            self.assertAlmostEqual(metrics['expectancy'] * len(pnl), sum(pnl) * scale, places=6)
+            self.assertAlmostEqual(metrics['win_rate'], np.mean(np.array(pnl) > 0) if pnl else 0.0)
+            
+    def test_position_carried_into_the_test_window(self):
+        index = pd.date_range('2024-01-01', periods=6, freq='1h')
+        results = {
+            'trades': [
+                {'timestamp': index[1], 'type': 'buy', 'capital': -1.0},
+                {'timestamp': index[4], 'type': 'sell', 'capital': 10800.0}
+            ],
+            'equity_curve': [10000.0, 9999.0, 10500.0, 11000.0, 10800.0, 10800.0]
+        }
+        window = _window_results(self.engine, results, index, warmup=3)
+        scale = self.engine.initial_capital / 10500.0
+        np.testing.assert_allclose(window['equity_curve'], np.array([11000.0, 10800.0, 10800.0]) * scale)
+        self.assertEqual([t['capital'] for t in window['trades']], [10800.0 * scale])
+        # The sell closes the warm-up entry, so it is a winning trade of the window
+        self.assertEqual(window['metrics']['win_rate'], 1.0)
+        self.assertAlmostEqual(window['metrics']['expectancy'], 800.0 * scale)
+        self.assertAlmostEqual(window['metrics']['exposure'], 1 / 3)
+
+class TestAdaptiveSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        data_dir = os.path.join(self.tmp_dir.name, 'historical')
+        data_manager = HistoricalDataManager(data_dir=data_dir, cache_dir=os.path.join(self.tmp_dir.name, 'cache'))
+        generate_price_data(periods=600).to_csv(os.path.join(data_dir, 'EURUSD_1h.csv'))
+        self.engine = BacktestEngine(data_manager)
+        self.param_grid = {
+            'fast_period': [3, 5, 8, 10, 12, 15],
+            'slow_period': [20, 25, 30, 40, 50, 60],
+            'take_profit_multiplier': [2.0, 3.0]
+        }
+        self.args = (MovingAverageStrategy, self.param_grid, 'EURUSD', '2023-01-01', '2023-01-25', '1h')
+        self.grid = StrategyOptimizer(self.engine).grid_search(*self.args, n_jobs=1)
+        self.scores = {tuple(r['params'].values()): r['score'] for r in self.grid['all_results']}
+        
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        
+    def test_sample_grid(self):
+        rng = np.random.default_rng(0)
+        everything = _sample_grid(self.param_grid, None, rng)
+        self.assertEqual(everything, [r['params'] for r in self.grid['all_results']])
+        sample = _sample_grid(self.param_grid, 10, rng)
+        self.assertEqual(len(sample), 10)
+        self.assertEqual(sample, [p for p in everything if p in sample])
+        
+    def test_successive_halving(self):
+        with mock.patch.object(self.engine, 'run_backtest', wraps=self.engine.run_backtest) as run_backtest:
+            result = StrategyOptimizer(self.engine).successive_halving(
+                *self.args, eta=3, min_bars=60, random_seed=0, n_jobs=1
+            )
+        rounds = result['rounds']
+        # A third of the 72-point grid is sampled, and each round keeps a third
+        self.assertEqual([r['bars'] for r in rounds], [64, 192, 577])
+        self.assertEqual([len(r['results']) for r in rounds], [24, 8, 3])
+        self.assertEqual(run_backtest.call_count, 35)
+        self.assertEqual(result['evaluations'], 35)
+        self.assertEqual(rounds[-1]['bars'], len(self.grid['all_results'][0]['results']['equity_curve']))
+        # Final scores are full-span scores
+        self.assertEqual(result['best_score'], self.scores[tuple(result['best_params'].values())])
+        self.assertLess(result['cost'], len(self.scores) / 5)
+        
+        parallel = StrategyOptimizer(self.engine).successive_halving(
+            *self.args, eta=3, min_bars=60, random_seed=0, n_jobs=2
+        )
+        self.assertEqual(parallel['best_params'], result['best_params'])
+        
+        # The whole grid is searched when asked for
+        everything = StrategyOptimizer(self.engine).successive_halving(
+            *self.args, n_candidates=len(self.scores), eta=3, min_bars=60, n_jobs=1
+        )
+        self.assertEqual([len(r['results']) for r in everything['rounds']], [72, 15, 4])
+        
+    def test_evolutionary_search(self):
+        result = StrategyOptimizer(self.engine).evolutionary_search(
+            *self.args, population_size=8, max_evaluations=24, random_seed=3, n_jobs=1
+        )
+        self.assertLessEqual(result['evaluations'], 24)
+        evaluated = [tuple(r['params'].values()) for r in result['summaries']]
+        self.assertEqual(len(evaluated), len(set(evaluated)))
+        for key, summary in zip(evaluated, result['summaries']):
+            self.assertEqual(summary['score'], self.scores[key])
+        # A third of the backtests still lands in the top tenth of the grid
+        ranked = sorted(self.scores.values(), reverse=True)
+        self.assertGreaterEqual(result['best_score'], ranked[len(ranked) // 10])
+        
+        again = StrategyOptimizer(self.engine).evolutionary_search(
+            *self.args, population_size=8, max_evaluations=24, random_seed=3, n_jobs=2
+        )
+        self.assertEqual(again['summaries'], result['summaries'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Tests for chart pattern detection over extrema arrays
+"""
+import os
+import sys
+import unittest
+import numpy as np
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.strategies.pattern_recognition import (
+    PatternRecognitionStrategy, find_double_bottoms, find_double_tops, find_head_and_shoulders
+)
+from tests.test_backtest_engine import generate_price_data
+
+def between(extrema, start, end):
+    """Reference: extrema strictly between two bar positions"""
+    return [e for e in extrema if start < e['index'] < end]
+
+class TestPatternRecognition(unittest.TestCase):
+    def setUp(self):
+        self.data = generate_price_data(periods=3000, seed=11)
+        self.strategy = PatternRecognitionStrategy(pattern_threshold=0.01)
+        self.peaks, self.troughs = self.strategy.find_local_extrema(self.data)
+        
+    def test_head_and_shoulders_match_scan(self):
+        expected = []
+        for left, head, right in zip(self.peaks, self.peaks[1:], self.peaks[2:]):
+            left_troughs = between(self.troughs, left['index'], head['index'])
+            right_troughs = between(self.troughs, head['index'], right['index'])
+            if (head['price'] > left['price'] and head['price'] > right['price']
+                    and abs(left['price'] - right['price']) < 0.01 * head['price']
+                    and left_troughs and right_troughs):
+                neckline = min(min(t['price'] for t in left_troughs), min(t['price'] for t in right_troughs))
+                expected.append((left['index'], head['index'], right['index'], neckline))
+        self.assertGreater(len(expected), 0)
+        
+        patterns = self.strategy.detect_head_and_shoulders(self.peaks, self.troughs)
+        self.assertEqual(
+            [(p['left_shoulder']['index'], p['head']['index'], p['right_shoulder']['index'], p['neckline']) for p in patterns],
+            expected
+        )
+        
+    def test_double_patterns_match_scan(self):
+        expected = []
+        for first, second in zip(self.peaks, self.peaks[1:]):
+            middle = between(self.troughs, first['index'], second['index'])
+            if abs(first['price'] - second['price']) < 0.01 * first['price'] and middle:
+                expected.append(('double_top', first['index'], second['index'], min(t['price'] for t in middle)))
+        for first, second in zip(self.troughs, self.troughs[1:]):
+            middle = between(self.peaks, first['index'], second['index'])
+            if abs(first['price'] - second['price']) < 0.01 * first['price'] and middle:
+                expected.append(('double_bottom', first['index'], second['index'], max(p['price'] for p in middle)))
+        self.assertEqual({kind for kind, _, _, _ in expected}, {'double_top', 'double_bottom'})
+        
+        patterns = self.strategy.detect_double_top_bottom(self.peaks, self.troughs)
+        found = []
+        for p in patterns:
+            if p['type'] == 'double_top':
+                found.append((p['type'], p['first_top']['index'], p['second_top']['index'], p['trough']['price']))
+            else:
+                found.append((p['type'], p['first_bottom']['index'], p['second_bottom']['index'], p['peak']['price']))
+        self.assertEqual(found, expected)
+        
+    def test_troughs_are_paired_by_position(self):
+        # Two troughs between the first peaks, none between the last two
+        peak_index, peak_price = np.array([10, 20, 30, 40]), np.array([1.0, 1.5, 1.002, 1.001])
+        trough_index, trough_price = np.array([12, 15, 25, 41]), np.array([0.9, 0.8, 0.85, 0.7])
+        patterns = find_head_and_shoulders(peak_index, peak_price, trough_index, trough_price, 0.01)
+        self.assertEqual(patterns.tolist(), [(10, 20, 30, 15, 25, 0.8)])
+        self.assertEqual(len(find_double_tops(peak_index, peak_price, trough_index, trough_price, 0.01)), 0)
+        # 12 and 15 have no peak between them; the highest peak between 25 and 41 is 30
+        bottoms = find_double_bottoms(peak_index, peak_price, trough_index, trough_price, 0.2)
+        self.assertEqual(bottoms.tolist(), [(15, 25, 20), (25, 41, 30)])
+        
+    def test_find_patterns_uses_same_extrema(self):
+        patterns = self.strategy.find_patterns(self.data)
+        self.assertEqual(
+            patterns['head_and_shoulders']['head'].tolist(),
+            [p['head']['index'] for p in self.strategy.detect_head_and_shoulders(self.peaks, self.troughs)]
+        )
+        self.assertEqual(patterns['double_top'].dtype.names, ('first', 'second', 'middle'))
+
+if __name__ == '__main__':
+    unittest.main()
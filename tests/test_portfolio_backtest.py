@@ -0,0 +1,105 @@
+"""
+Tests for the multi-symbol portfolio backtester
+"""
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.backtesting.portfolio_backtest import PortfolioBacktester, align_frames
+from src.data.historical_data_manager import HistoricalDataManager
+from src.strategies.moving_average_strategy import MovingAverageStrategy
+from tests.test_backtest_engine import generate_price_data
+from tests.test_monte_carlo import UnbatchedMovingAverageStrategy
+
+def loop_portfolio(actions, close, initial_capital, commission, max_open, max_size):
+    """Reference: step bar by bar through every symbol, holding cash and units"""
+    n_symbols, n_bars = actions.shape
+    cash = initial_capital
+    units = np.zeros(n_symbols)
+    wants_long = np.zeros(n_symbols, dtype=bool)
+    last = np.full(n_symbols, np.nan)
+    equity = []
+    for t in range(n_bars):
+        last = np.where(np.isnan(close[:, t]), last, close[:, t])
+        was_long = wants_long.copy()
+        wants_long = np.where(actions[:, t] == 1, True, np.where(actions[:, t] == -1, False, wants_long))
+        for s in range(n_symbols):
+            if was_long[s] and not wants_long[s] and units[s] > 0:
+                cash += units[s] * last[s] * (1 - commission)
+                units[s] = 0
+        for s in range(n_symbols):
+            # An entry without a free slot is skipped until the next buy
+            if wants_long[s] and not was_long[s] and (units > 0).sum() < max_open:
+                value = cash + np.nansum(units * last)
+                units[s] = min(max_size * value, cash / (1 + commission)) / last[s]
+                cash -= units[s] * last[s] * (1 + commission)
+        equity.append(cash + np.nansum(units * last))
+    return np.array(equity)
+
+class TestPortfolioBacktester(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        data_manager = HistoricalDataManager(
+            data_dir=os.path.join(self.tmp_dir.name, 'historical'),
+            cache_dir=os.path.join(self.tmp_dir.name, 'cache')
+        )
+        self.data = {f"SYM{seed}": data_manager.preprocess_data(generate_price_data(periods=300, seed=seed)) for seed in range(6)}
+        # One symbol trades on every other bar only
+        self.data['SYM5'] = self.data['SYM5'].iloc[::2]
+        self.backtester = PortfolioBacktester(data_manager, max_open_positions=2, position_fraction=0.4)
+        self.strategy = MovingAverageStrategy(params={'fast_period': 5, 'slow_period': 20})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _run(self, strategy):
+        return self.backtester.run_backtest(strategy, list(self.data), None, None, '1h', data=self.data)
+
+    def test_matches_bar_by_bar_portfolio(self):
+        timestamps, prices, bar_positions = align_frames(self.data)
+        self.assertEqual(len(timestamps), 300)
+        self.assertTrue(np.isnan(prices['close'][5, 1::2]).all())
+
+        results = self._run(self.strategy)
+        actions = np.zeros((len(self.data), len(timestamps)), dtype=np.int8)
+        for k, frame in enumerate(self.data.values()):
+            actions[k, bar_positions[k]] = self.strategy.generate_signal_array(frame)
+        expected = loop_portfolio(actions, prices['close'], 10000.0, 0.001, 2, 0.4)
+        np.testing.assert_allclose(results['equity_curve'].to_numpy(), expected, rtol=1e-10)
+
+        self.assertGreater(results['skipped_entries'], 0)
+        self.assertLessEqual(results['open_positions'].max(), 2)
+        self.assertTrue(results['exposure'].between(0, 1 + 1e-9).all())
+        self.assertAlmostEqual(results['attribution'].sum(), results['final_capital'] - 10000.0, places=6)
+        np.testing.assert_allclose(
+            results['attribution_curve'].sum(axis=1), results['equity_curve'] - 10000.0, atol=1e-6
+        )
+
+    def test_default_sizing_splits_equity_across_slots(self):
+        # Independent of config.MAX_POSITION_SIZE, which is the live risk per trade
+        backtester = PortfolioBacktester(self.backtester.data_manager, max_open_positions=4)
+        self.assertEqual(backtester.position_fraction, 0.25)
+
+    def test_batched_signals_match_per_symbol(self):
+        batched = self._run(self.strategy)
+        per_symbol = self._run(UnbatchedMovingAverageStrategy(params=self.strategy.params))
+        pd.testing.assert_series_equal(batched['equity_curve'], per_symbol['equity_curve'])
+        self.assertEqual(batched['trades'], per_symbol['trades'])
+
+    def test_trades_alternate_per_symbol(self):
+        results = self._run(self.strategy)
+        for symbol in self.data:
+            types = [trade['type'] for trade in results['trades'] if trade['symbol'] == symbol]
+            self.assertEqual(types[::2], ['buy'] * len(types[::2]))
+            self.assertEqual(types[1::2], ['sell'] * len(types[1::2]))
+        self.assertTrue(all(trade['capital'] >= 0 for trade in results['trades']))
+
+if __name__ == '__main__':
+    unittest.main()
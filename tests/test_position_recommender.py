@@ -14,6 +14,7 @@ sys.path.append(project_root)
 from src.utils.yfinance_data_fetcher import YFinanceDataFetcher
 from src.utils.position_recommender import PositionRecommender
 from src.utils.technical_analysis import TechnicalAnalysis
+from tests.test_backtest_engine import generate_price_data
 
 def generate_test_data(symbol, days=100):
     """Generate test data for the position recommender"""
@@ -163,6 +164,79 @@ def test_different_signal_patterns():
     
     print("\n===== All pattern tests completed =====")
 
+def _without_timestamp(recommendation):
+    return {key: value for key, value in recommendation.items() if key != 'timestamp'}
+
+def test_batch_matches_single_symbol():
+    """Scoring a watchlist at once gives the same recommendations as one symbol at a time"""
+    recommender = PositionRecommender()
+    panel = {f"SYM{seed}": generate_price_data(periods=60 + 10 * seed, seed=seed) for seed in range(8)}
+    # Half the watchlist comes with indicators already added
+    for symbol in list(panel)[::2]:
+        panel[symbol] = TechnicalAnalysis.add_all_indicators(panel[symbol])
+    panel['SHORT'] = generate_price_data(periods=5)
+    panel['MISSING'] = None
+    originals = {symbol: df.copy() for symbol, df in panel.items() if df is not None}
+    
+    batch = recommender.recommend_batch(panel, sentiment_scores={'SYM1': 0.5})
+    assert list(batch) == list(panel)
+    for symbol, df in panel.items():
+        single = recommender.analyze_and_recommend(symbol, df, sentiment_score=0.5 if symbol == 'SYM1' else None)
+        assert _without_timestamp(batch[symbol]) == _without_timestamp(single), symbol
+    assert batch['SHORT']['reason'] == "Insufficient data"
+    assert batch['MISSING']['reason'] == "Insufficient data"
+    
+    # The input frames are left untouched
+    for symbol, df in originals.items():
+        pd.testing.assert_frame_equal(panel[symbol], df)
+    
+    # A long frame indexed by (symbol, timestamp) is the same watchlist
+    long_panel = pd.concat({symbol: df[['open', 'high', 'low', 'close']] for symbol, df in originals.items()})
+    raw = recommender.recommend_batch({symbol: df[['open', 'high', 'low', 'close']] for symbol, df in originals.items()})
+    from_long = recommender.recommend_batch(long_panel)
+    for symbol in originals:
+        assert _without_timestamp(from_long[symbol]) == _without_timestamp(raw[symbol]), symbol
+
+def test_supplied_indicators_are_used():
+    """Indicator columns already on the frame take precedence over recomputing them"""
+    recommender = PositionRecommender()
+    df = generate_price_data(periods=80)
+    signals = recommender.analyze_and_recommend('TEST', df.assign(rsi=80.0))['analysis']['signals']
+    assert signals['rsi_overbought'] == -1
+    signals = recommender.analyze_and_recommend('TEST', df.assign(rsi=20.0))['analysis']['signals']
+    assert signals['rsi_oversold'] == 1
+
+def test_partially_supplied_indicators_in_batch():
+    """Symbols supplying different subsets of the Bollinger columns are each scored on their own bars"""
+    recommender = PositionRecommender()
+    panel = {f"SYM{seed}": generate_price_data(periods=80, seed=seed) for seed in range(3)}
+    full = TechnicalAnalysis.add_all_indicators(panel['SYM0'].copy())
+    panel['SYM0'] = panel['SYM0'].assign(bb_middle=full['bb_middle'], bb_upper=full['bb_upper'])
+    
+    batch = recommender.recommend_batch(panel)
+    for symbol, df in panel.items():
+        assert _without_timestamp(batch[symbol]) == _without_timestamp(recommender.analyze_and_recommend(symbol, df)), symbol
+
+def test_rsi_signals_on_raw_frames_match_baseline():
+    """Frames without an rsi column are scored on the recommender's original 14-bar simple RSI"""
+    recommender = PositionRecommender()
+    for seed in range(20):
+        df = generate_price_data(periods=40 + seed, seed=seed)
+        signals = recommender.analyze_and_recommend('TEST', df)['analysis']['signals']
+        
+        # The original computation, verbatim
+        delta = df['close'].diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        rs = gain / loss.where(loss != 0, 1)
+        rsi = 100 - (100 / (1 + rs))
+        
+        last_rsi = rsi.iloc[-1]
+        expected = {'rsi_overbought': -1} if last_rsi > 70 else {'rsi_oversold': 1} if last_rsi < 30 else {'rsi_neutral': 0}
+        expected['rsi_trend'] = int(np.sign(last_rsi - rsi.iloc[-6]))
+        actual = {name: value for name, value in signals.items() if name.startswith('rsi_')}
+        assert actual == expected, seed
+
 if __name__ == "__main__":
     # Force development mode for testing
     os.environ["ENVIRONMENT"] = "development"
@@ -0,0 +1,101 @@
+"""
+Tests for the technical analysis indicator functions
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# Add project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.utils.technical_analysis import TechnicalAnalysis
+from src.utils.streaming_indicators import StreamingIndicators
+
+def generate_ohlc_data(periods=300, seed=11):
+    """Generate a random walk with OHLCV columns"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start='2024-01-01', periods=periods, freq='1h')
+    closes = 100 + np.cumsum(rng.normal(0, 0.5, periods))
+    opens = np.concatenate(([closes[0]], closes[:-1]))
+    spread = np.abs(rng.normal(0, 0.3, periods))
+    return pd.DataFrame({
+        'open': opens,
+        'high': np.maximum(opens, closes) + spread,
+        'low': np.minimum(opens, closes) - spread,
+        'close': closes,
+        'volume': rng.integers(100, 10000, periods)
+    }, index=dates)
+
+class TestStreamingIndicators(unittest.TestCase):
+    def setUp(self):
+        self.data = generate_ohlc_data()
+        self.batch = TechnicalAnalysis.add_all_indicators(self.data.copy())
+        
+    def _assert_matches_batch(self, result, batch):
+        indicator_columns = [c for c in batch.columns if c not in self.data.columns]
+        self.assertEqual(indicator_columns, [c for c in result.columns if c not in self.data.columns])
+        for column in indicator_columns:
+            np.testing.assert_allclose(result[column], batch[column], rtol=1e-9, atol=1e-9, err_msg=column)
+        
+    def test_single_pass_matches_batch(self):
+        """Streaming over a whole frame reproduces add_all_indicators"""
+        result = StreamingIndicators().update(self.data.copy())
+        self._assert_matches_batch(result, self.batch)
+        
+    def test_incremental_polling_matches_batch(self):
+        """A growing frame is extended bar by bar and matches the batch over the same frame"""
+        engine = StreamingIndicators()
+        for end in range(100, len(self.data) + 1, 2):
+            window = self.data.iloc[:end]
+            result = engine.update(window.copy())
+            self._assert_matches_batch(result, TechnicalAnalysis.add_all_indicators(window.copy()))
+        self.assertEqual(engine._count, len(self.data))
+        
+    def test_sliding_window_matches_batch_over_history(self):
+        """Sliding 100-bar windows match add_all_indicators over every bar seen, without rebuilds"""
+        engine = StreamingIndicators()
+        engine.update(self.data.iloc[:100].copy())
+        with mock.patch.object(engine, 'reset', wraps=engine.reset) as reset, \
+                mock.patch.object(engine, '_step', wraps=engine._step) as step:
+            for end in range(101, len(self.data) + 1):
+                window = self.data.iloc[end - 100:end]
+                result = engine.update(window.copy())
+                history = TechnicalAnalysis.add_all_indicators(self.data.iloc[:end].copy())
+                self._assert_matches_batch(result, history.iloc[-100:])
+        # Each poll only stepped its one new bar
+        reset.assert_not_called()
+        self.assertEqual(step.call_count, len(self.data) - 100)
+        self.assertIn('sma_200', result.columns)
+        
+    def test_misaligned_frame_is_rebuilt(self):
+        """A frame that skips bars of the stream is recomputed from its own bars"""
+        engine = StreamingIndicators()
+        engine.update(self.data.iloc[:150].copy())
+        window = self.data.iloc[160:260]
+        result = engine.update(window.copy())
+        self._assert_matches_batch(result, TechnicalAnalysis.add_all_indicators(window.copy()))
+        
+    def test_revised_last_bar(self):
+        """A still-forming last bar can be revised without a rebuild"""
+        engine = StreamingIndicators()
+        provisional = self.data.copy()
+        provisional.iloc[-1, provisional.columns.get_loc('close')] += 5.0
+        engine.update(provisional.iloc[:-1].copy())
+        engine.update(provisional.copy())
+        result = engine.update(self.data.copy())
+        self._assert_matches_batch(result, self.batch)
+        
+    def test_incremental_registry(self):
+        """TechnicalAnalysis keeps one engine per (symbol, timeframe)"""
+        TechnicalAnalysis.reset_streaming_indicators()
+        result = TechnicalAnalysis.add_all_indicators_incremental(self.data.copy(), 'EUR/USD', '1h')
+        self._assert_matches_batch(result, self.batch)
+        self.assertIn(('EUR/USD', '1h'), TechnicalAnalysis._streaming_engines)
+        TechnicalAnalysis.reset_streaming_indicators()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -57,6 +57,7 @@ def test_trading_agent_with_kishoka():
     else:
         cprint("No recommendation generated for the symbol", "yellow")
     
+    trading_agent.shutdown()
     cprint("\nTest completed!", "green")
 
 if __name__ == "__main__":